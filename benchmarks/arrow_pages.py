@@ -0,0 +1,91 @@
+"""Compares yielding dicts with yielding pyarrow pages from `sample_data`.
+
+Dicts go through dlt's per-item normalizer and are loaded from `insert_values` (or `jsonl`)
+files, while pyarrow tables are written to parquet as they are, skipping row by row
+normalization.
+
+    python benchmarks/arrow_pages.py --sizes 100k 1M --page-sizes 10k 100k
+"""
+
+import argparse
+
+from harness import (
+    DESTINATIONS,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from pipelines import run_case
+from utils.data_generator import SyntheticData
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark dict and pyarrow pages yielded by sample_data"
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        default=["4", "5"],
+        help="Tutorial pipelines to run, see benchmarks/pipelines.py (default: 4 5)",
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=list(DESTINATIONS),
+        help="Destinations to load into (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows per run (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--page-sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[10_000, 100_000],
+        help="Rows per pyarrow page (default: 10k 100k)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    variants = {"dicts": 0} | {f"arrow-{size}": size for size in args.page_sizes}
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            for case_name in args.cases:
+                for variant, page_size in variants.items():
+                    print(
+                        f"Running {case_name} {variant} with {rows} rows on {destination}..."
+                    )
+                    synthetic = SyntheticData(rows=rows, arrow_page_size=page_size)
+                    try:
+                        result = run_isolated(
+                            run_case,
+                            case_name,
+                            destination,
+                            synthetic,
+                            "arrow_pages",
+                            variant,
+                        )
+                    except Exception as ex:
+                        print(f"Case {case_name} failed on {destination}: {ex}")
+                        continue
+                    results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,92 @@
+"""Measures the throughput of extracting pipeline 4 from the mock API, by concurrency and latency.
+
+Every combination pages `--rows` records from `utils/mock_api.py` with `--latency` seconds per
+request and `--concurrency` requests in flight, through the async `api_sample_data` resource of
+the script. Only the extract step is timed, since that is where the pages are requested. With one
+request in flight the extract waits `latency` seconds per page; more requests hide that wait until
+the API or the extract itself is the bottleneck. `--failure-rate` makes requests fail and be
+retried.
+
+    python benchmarks/async_api.py --rows 100k --latency 0.01 0.05 0.1 --concurrency 1 4 16 64
+"""
+
+import argparse
+import time
+
+from harness import abort_pending_packages, make_pipeline, parse_rows
+from utils.data_generator import SyntheticData
+from utils.mock_api import DEFAULT_PAGE_SIZE, start_mock_api
+from utils.scripts import load_script
+
+
+def extract_seconds(resource) -> float:
+    pipeline = make_pipeline("benchmark_async_api", "duckdb")
+    start = time.perf_counter()
+    pipeline.extract(resource, table_name="samples")
+    elapsed = time.perf_counter() - start
+    abort_pending_packages(pipeline)
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark async extraction from the mock API by concurrency and latency"
+    )
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        default=100_000,
+        help="Number of rows to extract (default: 100k)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4, 8, 16, 32],
+        help="Requests in flight to compare (default: 1 2 4 8 16 32)",
+    )
+    parser.add_argument(
+        "--latency",
+        nargs="+",
+        type=float,
+        default=[0.01, 0.05, 0.1],
+        help="Seconds per request to compare (default: 0.01 0.05 0.1)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=parse_rows,
+        default=DEFAULT_PAGE_SIZE,
+        help="Records per page (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests that fail and are retried (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    module = load_script("4_sample_pipeline_append.py")
+    synthetic = SyntheticData(rows=args.rows)
+    print(
+        f"{'latency':>8} {'concurrency':>12} {'seconds':>8} {'rows/s':>10} "
+        f"{'speedup':>8} {'requests':>9} {'retried':>8}"
+    )
+    for latency in args.latency:
+        api = start_mock_api(synthetic, latency, args.failure_rate)
+        baseline = None
+        for concurrency in args.concurrency:
+            requests, failures = api.requests, api.failures
+            seconds = extract_seconds(
+                module.api_sample_data(api.url, args.page_size, concurrency)
+            )
+            baseline = baseline or seconds
+            print(
+                f"{latency:>8} {concurrency:>12} {seconds:>8.2f} "
+                f"{args.rows / seconds:>10,.0f} {baseline / seconds:>7.1f}x "
+                f"{api.requests - requests:>9} {api.failures - failures:>8}"
+            )
+        api.shutdown()
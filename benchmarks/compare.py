@@ -0,0 +1,107 @@
+"""Compares stored benchmark results of two commits and flags regressions.
+
+Results of the same benchmark, case, variant, destination and size are matched and their median
+is compared. Exits with status 1 when any metric got worse by more than `--threshold`.
+
+    python benchmarks/compare.py main HEAD --threshold 0.1
+"""
+
+import argparse
+import subprocess
+import sys
+
+from harness import REPO_DIR, RESULTS_TABLE, query_results
+
+# metric -> True when a higher value is better
+METRICS = {
+    "extract_s": False,
+    "normalize_s": False,
+    "load_s": False,
+    "total_s": False,
+    "rows_per_s": True,
+    "peak_rss_mb": False,
+}
+
+
+def resolve_commit(ref: str) -> str:
+    """Resolves branch names, tags and short hashes to a full commit hash"""
+    completed = subprocess.run(
+        ["git", "rev-parse", "--verify", f"{ref}^{{commit}}"],
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        # not known to this clone, but may still be stored in the results
+        return ref
+    return completed.stdout.strip()
+
+
+def medians(commit: str, benchmark: str | None) -> dict[tuple, dict[str, float]]:
+    metric_columns = ", ".join(f"median({metric})" for metric in METRICS)
+    rows = query_results(
+        f"""
+        SELECT benchmark, "case", variant, destination, rows, {metric_columns}
+        FROM {RESULTS_TABLE}
+        WHERE starts_with(commit, ?) AND (? IS NULL OR benchmark = ?)
+        GROUP BY ALL
+        """,
+        [commit, benchmark, benchmark],
+    )
+    return {row[:5]: dict(zip(METRICS, row[5:])) for row in rows}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare benchmark results of two commits"
+    )
+    parser.add_argument("base", help="Baseline commit, branch or tag")
+    parser.add_argument(
+        "head", help="Commit, branch or tag to compare with the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change that counts as a regression (default: %(default)s)",
+    )
+    parser.add_argument("--benchmark", help="Only compare results of this benchmark")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    base = medians(resolve_commit(args.base), args.benchmark)
+    head = medians(resolve_commit(args.head), args.benchmark)
+    common = sorted(set(base) & set(head), key=str)
+    if not common:
+        print(f"No results were recorded for both {args.base} and {args.head}")
+        sys.exit(2)
+
+    regressions = 0
+    for key in common:
+        label = " ".join(str(part) for part in key)
+        for metric, higher_is_better in METRICS.items():
+            before, after = base[key][metric], head[key][metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            regressed = (
+                -change > args.threshold
+                if higher_is_better
+                else change > args.threshold
+            )
+            if regressed:
+                regressions += 1
+            marker = "REGRESSION" if regressed else ""
+            print(
+                f"{label:<45} {metric:<12} {before:>12.3f} {after:>12.3f} {change:>+8.1%} {marker}"
+            )
+
+    missing = sorted(set(base) ^ set(head), key=str)
+    if missing:
+        print(
+            f"{len(missing)} result group(s) were recorded for only one of the commits"
+        )
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
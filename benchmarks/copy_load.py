@@ -0,0 +1,84 @@
+"""Compares loading the append pipelines into Postgres with INSERT statements and with COPY.
+
+`insert_values` files are turned into multi-row INSERT statements, `csv` files are streamed
+with `COPY ... FROM STDIN`. The scripts read the format from `.dlt/config.toml`, here it is
+passed to `pipeline.run` for each variant.
+
+    python benchmarks/copy_load.py --sizes 1M 10M
+"""
+
+import argparse
+
+from harness import parse_rows, print_results, run_isolated, store_results
+from pipelines import run_case
+from utils.data_generator import SyntheticData
+
+FILE_FORMATS = ("insert_values", "csv")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark insert_values and csv (COPY) loads into Postgres"
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=["4", "4b"],
+        default=["4", "4b"],
+        help="Append pipelines to run (default: 4 4b)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[1_000_000, 10_000_000],
+        help="Number of rows per run (default: 1M 10M)",
+    )
+    parser.add_argument(
+        "--file-formats",
+        nargs="+",
+        choices=FILE_FORMATS,
+        default=list(FILE_FORMATS),
+        help="Loader file formats to compare (default: all)",
+    )
+    parser.add_argument(
+        "--arrow-page-size",
+        type=parse_rows,
+        default=0,
+        help="Yield pyarrow tables of this many rows instead of dicts (default: dicts)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for rows in args.sizes:
+        synthetic = SyntheticData(rows=rows, arrow_page_size=args.arrow_page_size)
+        for case_name in args.cases:
+            for file_format in args.file_formats:
+                print(f"Running {case_name} {file_format} with {rows} rows...")
+                try:
+                    result = run_isolated(
+                        run_case,
+                        case_name,
+                        "postgres",
+                        synthetic,
+                        "copy_load",
+                        file_format,
+                        {"loader_file_format": file_format},
+                    )
+                except Exception as ex:
+                    print(f"Case {case_name} failed with {file_format}: {ex}")
+                    continue
+                results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,121 @@
+"""Measures the structures that `--dedup` of pipeline 4 keeps the extracted keys in.
+
+For every size, `sorted` and `bloom` are filled with that many keys, in batches as in the
+extract, and then asked for `--probes` keys they never saw. No pipeline runs, the structures are
+measured on their own:
+
+- `false pos.`: share of the unseen keys reported as seen, which would be dropped by mistake
+- `memory MiB`: size of the structure while the extract runs
+- `state MiB`: size of the compressed structure in the pipeline state
+
+`--keys dense` uses consecutive ids, as the synthetic data does, `random` uses random 62-bit ids,
+which do not compress:
+
+    python benchmarks/dedup.py --sizes 1M 10M 100M --keys dense random
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from harness import parse_rows
+from utils.dedup import KINDS, DropSeenKeys, state_size
+
+KEYS = ("dense", "random")
+
+
+def make_keys(kind: str, rows: int, probes: int, seed: int = 42):
+    """The keys to add and as many unseen keys as `probes`"""
+    if kind == "dense":
+        return np.arange(1, rows + 1, dtype=np.int64), np.arange(
+            rows + 1, rows + probes + 1, dtype=np.int64
+        )
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, 2**62, rows + probes, dtype=np.int64)
+    return keys[:rows], keys[rows:]
+
+
+def measure(dedup: DropSeenKeys, keys: np.ndarray, unseen: np.ndarray) -> dict:
+    seen = dedup.new_structure()
+    start = time.perf_counter()
+    for offset in range(0, len(keys), dedup.batch_size):
+        batch = keys[offset : offset + dedup.batch_size]
+        seen.add(batch[~seen.contains(batch)])
+    add_s = time.perf_counter() - start
+    start = time.perf_counter()
+    false_positives = int(seen.contains(unseen).sum())
+    lookup_s = time.perf_counter() - start
+    start = time.perf_counter()
+    state = seen.to_state()
+    save_s = time.perf_counter() - start
+    return {
+        "add_s": add_s,
+        "lookups_per_s": len(unseen) / lookup_s,
+        "false_positive_rate": false_positives / len(unseen),
+        "memory_mib": seen.nbytes / 2**20,
+        "state_mib": state_size(state) / 2**20,
+        "save_s": save_s,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the sorted keys and Bloom filter of the dedup stage"
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[1_000_000, 10_000_000, 100_000_000],
+        help="Number of keys (default: 1M 10M 100M)",
+    )
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        choices=KINDS,
+        default=list(KINDS),
+        help="Structures to compare (default: all)",
+    )
+    parser.add_argument(
+        "--keys",
+        nargs="+",
+        choices=KEYS,
+        default=["dense"],
+        help="Consecutive or random keys (default: dense)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.001,
+        help="False positive rate the Bloom filters are sized for (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--probes",
+        type=parse_rows,
+        default=1_000_000,
+        help="Unseen keys to look up (default: 1M)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(
+        f"{'keys':<7} {'kind':<7} {'size':>11} {'add s':>7} {'lookups/s':>11} "
+        f"{'false pos.':>10} {'memory MiB':>11} {'state MiB':>10} {'save s':>7}"
+    )
+    for keys_kind in args.keys:
+        for rows in args.sizes:
+            keys, unseen = make_keys(keys_kind, rows, args.probes)
+            for kind in args.kinds:
+                # the filter is sized for the keys it will hold, with no limit on the state
+                dedup = DropSeenKeys(
+                    kind, capacity=rows, error_rate=args.error_rate, max_state_mib=1e9
+                )
+                m = measure(dedup, keys, unseen)
+                print(
+                    f"{keys_kind:<7} {kind:<7} {rows:>11} {m['add_s']:>7.2f} "
+                    f"{m['lookups_per_s']:>11,.0f} {m['false_positive_rate']:>10.5f} "
+                    f"{m['memory_mib']:>11.1f} {m['state_mib']:>10.1f} {m['save_s']:>7.2f}"
+                )
@@ -0,0 +1,104 @@
+"""Measures loading the same data into several destinations, with a pipeline each or fanned out.
+
+`separate` runs a pipeline per destination, which extracts and normalizes the data every time.
+`fan-out` runs `fan_out` of pipeline 3c, which extracts it once, normalizes it once per file
+format and loads every destination at the same time. Destinations are duckdb files, as many as
+`--destinations`, half of them loaded from parquet and half from jsonl with `--formats` set to
+both:
+
+    python benchmarks/fan_out.py --rows 100k 1M --destinations 1 2 4
+"""
+
+import argparse
+import time
+
+from harness import BENCH_DIR, make_destination, make_pipeline, parse_rows
+from utils.data_generator import SyntheticData
+from utils.fanout import Target, fan_out
+from utils.scripts import load_script
+
+
+def targets_for(destinations: int, formats: list[str]) -> list[Target]:
+    return [
+        Target(
+            make_destination("duckdb", f"bench_fan_out_{i}"),
+            formats[i % len(formats)],
+            name=str(i),
+        )
+        for i in range(destinations)
+    ]
+
+
+def separate_seconds(module, synthetic, targets: list[Target]) -> float:
+    start = time.perf_counter()
+    for target in targets:
+        pipeline = make_pipeline(f"bench_separate_{target.name}", "duckdb")
+        pipeline.run(
+            module.sample_source(synthetic),
+            table_name="samples",
+            loader_file_format=target.loader_file_format,
+        )
+    return time.perf_counter() - start
+
+
+def fan_out_seconds(module, synthetic, targets: list[Target]) -> float:
+    start = time.perf_counter()
+    results = fan_out(
+        module.sample_source(synthetic),
+        "bench_fan_out",
+        targets,
+        dataset_name="sample_data",
+        pipelines_dir=str(BENCH_DIR / "pipelines"),
+        table_name="samples",
+    )
+    elapsed = time.perf_counter() - start
+    failed = [name for name, result in results.items() if isinstance(result, Exception)]
+    if failed:
+        raise RuntimeError(f"Loads into {failed} failed")
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark a pipeline per destination against a fan-out load"
+    )
+    parser.add_argument(
+        "--rows",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000],
+        help="Number of rows to load (default: 100k)",
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4],
+        help="Numbers of duckdb destinations (default: 1 2 4)",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=("parquet", "jsonl", "insert_values"),
+        default=["parquet"],
+        help="Loader file formats, given to the destinations in turn (default: parquet)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    module = load_script("3c_sample_pipeline_fan_out.py")
+    print(
+        f"{'rows':>9} {'destinations':>12} {'separate s':>10} {'fan-out s':>10} {'speedup':>8}"
+    )
+    for rows in args.rows:
+        synthetic = SyntheticData(rows=rows)
+        for destinations in args.destinations:
+            targets = targets_for(destinations, args.formats)
+            separate = separate_seconds(module, synthetic, targets)
+            fanned_out = fan_out_seconds(module, synthetic, targets)
+            print(
+                f"{rows:>9} {destinations:>12} {separate:>10.2f} {fanned_out:>10.2f} "
+                f"{separate / fanned_out:>8.2f}"
+            )
@@ -0,0 +1,142 @@
+"""Measures the peak memory of loading large JSONL and CSV files with pipeline 1b.
+
+For every size and format a file of synthetic records is written to `.benchmarks/files` (once,
+it is reused by later runs) and loaded into duckdb by every parser, with and without `--mmap`,
+each in its own process. The files are read in chunks, so the peak RSS of the extract should
+stay flat from the smallest to the largest file and move only with `--chunk-mib`. A JSONL file
+of 20M records is about 5 GB:
+
+    python benchmarks/file_source.py --sizes 1M 20M --formats jsonl --parsers orjson arrow
+"""
+
+import argparse
+
+from harness import (
+    BENCH_DIR,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+from utils.file_source import FILE_FORMATS, PARSERS, write_sample_file
+
+FILES_DIR = BENCH_DIR / "files"
+
+
+def load_file(
+    file_format: str, rows: int, parser: str, use_mmap: bool, chunk_mib: int
+) -> BenchmarkResult:
+    """Loads the file into duckdb. Runs in its own process"""
+    from utils.metrics import ResourceSampler, run_record
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    module = load_script("1b_sample_pipeline_files.py")
+    path = FILES_DIR / f"samples_{rows}.{file_format}"
+    pipeline = make_pipeline("bench_file_source", "duckdb")
+    # the peak RSS of the extract alone, before duckdb reads the files
+    with ResourceSampler() as sampler:
+        load_info = pipeline.run(
+            module.sample_data_from_file(path, chunk_mib, use_mmap, parser),
+            table_name="samples",
+            refresh="drop_sources",
+            loader_file_format="parquet",
+        )
+    variant = f"{file_format}-{parser}" + ("-mmap" if use_mmap else "")
+    result = BenchmarkResult(
+        benchmark="file_source",
+        case="1b",
+        destination="duckdb",
+        rows=rows,
+        variant=variant,
+        extra={"file_mib": path.stat().st_size / 2**20, "chunk_mib": chunk_mib},
+    )
+    stages = run_record(pipeline.last_trace, pipeline, sampler)["stages"]
+    result.extra["extract_peak_mib"] = stages["extract"]["peak_rss_bytes"] / 2**20
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the peak memory of chunked JSONL and CSV loads"
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of records per file (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=FILE_FORMATS,
+        default=list(FILE_FORMATS),
+        help="File formats to compare (default: all)",
+    )
+    parser.add_argument(
+        "--parsers",
+        nargs="+",
+        choices=PARSERS,
+        default=list(PARSERS),
+        help="JSONL parsers to compare, CSV is always read with Arrow (default: all)",
+    )
+    parser.add_argument(
+        "--chunk-mib",
+        type=int,
+        default=64,
+        help="MiB of the file read and parsed at a time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for rows in args.sizes:
+        for file_format in args.formats:
+            path = FILES_DIR / f"samples_{rows}.{file_format}"
+            if not path.exists():
+                print(f"Writing {path}...")
+                write_sample_file(path, SyntheticData(rows=rows))
+            parsers = args.parsers if file_format == "jsonl" else ["arrow"]
+            for parser in parsers:
+                for use_mmap in (False, True):
+                    print(f"Loading {path.name} with {parser}, mmap {use_mmap}...")
+                    try:
+                        result = run_isolated(
+                            load_file,
+                            file_format,
+                            rows,
+                            parser,
+                            use_mmap,
+                            args.chunk_mib,
+                        )
+                    except Exception as ex:
+                        print(f"{path.name} failed with {parser}: {ex}")
+                        continue
+                    results.append(result)
+
+    print_results(results)
+    print()
+    print(
+        f"{'variant':<20} {'rows':>10} {'file MiB':>9} {'extract peak MiB':>17} {'peak MiB':>9}"
+    )
+    for r in results:
+        print(
+            f"{r.variant:<20} {r.rows:>10} {r.extra['file_mib']:>9.0f} "
+            f"{r.extra['extract_peak_mib']:>17.1f} {r.peak_rss_mb:>9.1f}"
+        )
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,107 @@
+"""Measures the cost of the fingerprint of pipeline 4 and what it saves when the data is the same.
+
+Every case loads the same rows into duckdb three times, starting from an empty table:
+
+- `run`: a second `pipeline.run`, which extracts, normalizes and loads all the rows again
+- `changed`: a first run with `run_if_changed`, which also hashes every row
+- `unchanged`: a second run with `run_if_changed`, which ends after the extract
+
+`overhead` is how much longer `changed` takes than a plain run, `speedup` how much faster
+`unchanged` is than `run`. The rows are dicts or, with `--arrow-page-size`, pyarrow tables:
+
+    python benchmarks/fingerprint.py --rows 100k 1M --sources dicts arrow
+"""
+
+import argparse
+import time
+
+from harness import make_pipeline, parse_rows
+from utils.data_generator import SyntheticData
+from utils.fingerprint import Fingerprint, run_if_changed
+from utils.scripts import load_script
+
+SOURCES = ("dicts", "arrow")
+
+
+def name(synthetic: SyntheticData) -> str:
+    return f"{synthetic.rows}_{'arrow' if synthetic.arrow_page_size else 'dicts'}"
+
+
+def run_seconds(module, synthetic, fingerprint) -> float:
+    variant = "unchanged" if fingerprint else "run"
+    pipeline = make_pipeline(f"bench_fingerprint_{name(synthetic)}_{variant}", "duckdb")
+    run_if_changed(
+        pipeline,
+        module.sample_data(synthetic=synthetic),
+        fingerprint,
+        table_name="samples",
+        refresh="drop_sources",
+    )
+    start = time.perf_counter()
+    run_if_changed(
+        pipeline,
+        module.sample_data(synthetic=synthetic),
+        fingerprint,
+        table_name="samples",
+    )
+    return time.perf_counter() - start
+
+
+def changed_seconds(module, synthetic) -> float:
+    pipeline = make_pipeline(f"bench_fingerprint_{name(synthetic)}_changed", "duckdb")
+    start = time.perf_counter()
+    run_if_changed(
+        pipeline,
+        module.sample_data(synthetic=synthetic),
+        Fingerprint(),
+        table_name="samples",
+        refresh="drop_sources",
+    )
+    return time.perf_counter() - start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark skipping the runs whose data did not change"
+    )
+    parser.add_argument(
+        "--rows",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000],
+        help="Number of rows to load (default: 100k)",
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        choices=SOURCES,
+        default=list(SOURCES),
+        help="Sources to compare (default: all)",
+    )
+    parser.add_argument(
+        "--arrow-page-size",
+        type=int,
+        default=10_000,
+        help="Rows in every pyarrow table of the arrow source (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    module = load_script("4_sample_pipeline_append.py")
+    print(
+        f"{'rows':>9} {'source':<6} {'run s':>7} {'changed s':>9} {'unchanged s':>11} "
+        f"{'overhead':>8} {'speedup':>8}"
+    )
+    for rows in args.rows:
+        for source in args.sources:
+            page_size = args.arrow_page_size if source == "arrow" else 0
+            synthetic = SyntheticData(rows=rows, arrow_page_size=page_size)
+            plain = run_seconds(module, synthetic, None)
+            changed = changed_seconds(module, synthetic)
+            unchanged = run_seconds(module, synthetic, Fingerprint())
+            print(
+                f"{rows:>9} {source:<6} {plain:>7.2f} {changed:>9.2f} {unchanged:>11.2f} "
+                f"{changed / plain - 1:>8.1%} {plain / unchanged:>8.2f}"
+            )
@@ -0,0 +1,163 @@
+"""Compares loading and querying the nested `metadata` of pipeline 7 in a child table and flattened.
+
+- `nested`: every row keeps `metadata` in a list, so dlt loads it into a `samples__metadata`
+  child table that is joined back through `_dlt_parent_id`
+- `prefix`: `--flatten prefix`, the fields of `metadata` become `metadata__*` columns
+- `json`: `--flatten json`, `metadata` is kept in a single JSON column
+
+After loading, each layout runs the same query, the number of rows and the latest `ingested_at`,
+`--query-runs` times, and the fastest run is reported as `query_s`, next to the number of tables
+and load jobs of the run. `rows/s` counts the rows of the child table too.
+
+    python benchmarks/flatten.py --sizes 100k 1M
+"""
+
+import argparse
+import time
+
+from harness import (
+    DESTINATIONS,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+LAYOUTS = ("nested", "prefix", "json")
+
+QUERIES = {
+    "nested": (
+        "SELECT count(*), max(m.ingested_at) FROM {samples} AS s "
+        "JOIN {samples__metadata} AS m ON m._dlt_parent_id = s._dlt_id"
+    ),
+    "prefix": "SELECT count(*), max(metadata__ingested_at) FROM {samples}",
+    "json": "SELECT count(*), max(metadata->>'ingested_at') FROM {samples}",
+}
+
+
+def as_child_table(row: dict) -> dict:
+    # dlt moves lists of dicts into child tables, nested dicts are flattened
+    return {**row, "metadata": [row["metadata"]]}
+
+
+def query_seconds(pipeline, layout: str, runs: int) -> float:
+    """Runs the query of `layout` `runs` times and returns the fastest run"""
+    timings = []
+    with pipeline.sql_client() as client:
+        query = QUERIES[layout].format(
+            samples=client.make_qualified_table_name("samples"),
+            samples__metadata=client.make_qualified_table_name("samples__metadata"),
+        )
+        for _ in range(runs):
+            start = time.perf_counter()
+            client.execute_sql(query)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_layout(
+    layout: str, destination: str, synthetic: SyntheticData, query_runs: int
+) -> BenchmarkResult:
+    """Loads the rows with `layout` and queries them. Runs in its own process"""
+    from utils.flatten import flatten_nested
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    module = load_script("7_sample_pipeline_schema.py")
+    resource = module.sample_data(synthetic=synthetic)
+    if layout == "nested":
+        resource.add_map(as_child_table)
+    else:
+        resource = flatten_nested(resource, layout)
+
+    pipeline = make_pipeline(f"bench_flatten_{destination}", destination)
+    load_info = pipeline.run(resource, table_name="samples", refresh="drop_sources")
+
+    jobs = [
+        job
+        for package in load_info.load_packages
+        for job in package.jobs["completed_jobs"]
+        if not job.job_file_info.table_name.startswith("_dlt")
+    ]
+    result = BenchmarkResult(
+        benchmark="flatten",
+        case="7",
+        destination=destination,
+        rows=synthetic.rows,
+        variant=layout,
+        extra={
+            "query_s": round(query_seconds(pipeline, layout, query_runs), 4),
+            "tables": len({job.job_file_info.table_name for job in jobs}),
+            "load_jobs": len(jobs),
+        },
+    )
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark nested metadata in a child table against flattened layouts"
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=list(DESTINATIONS),
+        help="Destinations to load into (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows per run (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--query-runs",
+        type=int,
+        default=5,
+        help="Times the query runs after each load (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            synthetic = SyntheticData(rows=rows)
+            for layout in LAYOUTS:
+                print(f"Running {layout} with {rows} rows on {destination}...")
+                try:
+                    result = run_isolated(
+                        run_layout, layout, destination, synthetic, args.query_runs
+                    )
+                except Exception as ex:
+                    print(f"{layout} failed on {destination}: {ex}")
+                    continue
+                results.append(result)
+
+    print_results(results)
+    print()
+    print(
+        f"{'variant':<10} {'dest':<9} {'rows':>10} {'query s':>8} {'tables':>7} {'jobs':>5}"
+    )
+    for r in results:
+        print(
+            f"{r.variant:<10} {r.destination:<9} {r.rows:>10} {r.extra['query_s']:>8.4f} "
+            f"{r.extra['tables']:>7} {r.extra['load_jobs']:>5}"
+        )
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,116 @@
+"""Compares normalizing the rows of pipeline 7 with type inference and with a frozen schema.
+
+`inferred` runs the script as is: dlt flattens every row and infers and checks the type of each
+value. `frozen` is `--frozen-schema`: pages of rows are converted into arrow tables with the
+coercion plan compiled from `dlt_tutorial/schemas/samples.schema.yaml`, so normalize only has
+to write them out. Each variant runs twice and the second run is reported, so both compare a
+table whose schema is already stored.
+
+    python benchmarks/frozen_schema.py --sizes 100k 1M
+"""
+
+import argparse
+
+from harness import (
+    DESTINATIONS,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+VARIANTS = ("inferred", "frozen")
+
+
+def run_variant(
+    variant: str, destination: str, synthetic: SyntheticData, batch_size: int
+) -> BenchmarkResult:
+    """Loads the rows twice and measures the second run. Runs in its own process"""
+    from utils.frozen_schema import load_plan, with_frozen_schema
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    module = load_script("7_sample_pipeline_schema.py")
+
+    def make_resource():
+        if variant == "inferred":
+            return module.sample_data(synthetic=synthetic)
+        return with_frozen_schema(
+            module.sample_data(synthetic=synthetic, batch_size=batch_size),
+            load_plan("samples"),
+        )
+
+    pipeline = make_pipeline(f"bench_frozen_schema_{destination}", destination)
+    pipeline.run(make_resource(), table_name="samples", refresh="drop_sources")
+    version = pipeline.default_schema.version
+    load_info = pipeline.run(make_resource(), table_name="samples")
+
+    result = BenchmarkResult(
+        benchmark="frozen_schema",
+        case="7",
+        destination=destination,
+        rows=synthetic.rows,
+        variant=variant,
+        extra={"schema_version_changed": pipeline.default_schema.version != version},
+    )
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark normalizing with type inference and with a frozen schema"
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=list(DESTINATIONS),
+        help="Destinations to load into (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows per run (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=parse_rows,
+        default=10_000,
+        help="Rows per page converted by the frozen variant (default: 10k)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            synthetic = SyntheticData(rows=rows)
+            for variant in VARIANTS:
+                print(f"Running {variant} with {rows} rows on {destination}...")
+                try:
+                    result = run_isolated(
+                        run_variant, variant, destination, synthetic, args.batch_size
+                    )
+                except Exception as ex:
+                    print(f"{variant} failed on {destination}: {ex}")
+                    continue
+                results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
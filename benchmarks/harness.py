@@ -0,0 +1,277 @@
+"""Shared helpers for the benchmark scripts: measuring runs and storing their results.
+
+Benchmarks are executed from the repository root, like the tutorial scripts, so dlt picks up
+`.dlt/config.toml` and `.dlt/secrets.toml` (e.g. for the Postgres credentials).
+"""
+
+import datetime as dt
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+TUTORIAL_DIR = REPO_DIR / "dlt_tutorial"
+BENCH_DIR = REPO_DIR / ".benchmarks"
+RESULTS_DB = BENCH_DIR / "results.duckdb"
+RESULTS_TABLE = "results"
+DESTINATIONS = ("duckdb", "postgres")
+
+# make `utils` and the tutorial scripts importable, as when running `python dlt_tutorial/...`
+if str(TUTORIAL_DIR) not in sys.path:
+    sys.path.insert(0, str(TUTORIAL_DIR))
+
+
+@dataclass
+class BenchmarkResult:
+    """One measured run. Stage durations come from the pipeline trace, sizes from the load info"""
+
+    benchmark: str
+    case: str
+    destination: str
+    rows: int
+    variant: str = "default"
+    extract_s: float = 0.0
+    normalize_s: float = 0.0
+    load_s: float = 0.0
+    total_s: float = 0.0
+    rows_loaded: int = 0
+    rows_per_s: float = 0.0
+    bytes_written: int = 0
+    peak_rss_mb: float = 0.0
+    extra: dict = field(default_factory=dict)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process, in MiB"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports KiB, macOS reports bytes
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def make_destination(destination: str, pipeline_name: str) -> Any:
+    """Creates a destination for a benchmark pipeline, keeping duckdb files under `BENCH_DIR`"""
+    import dlt
+
+    if destination == "duckdb":
+        return dlt.destinations.duckdb(str(BENCH_DIR / f"{pipeline_name}.duckdb"))
+    if destination == "postgres":
+        return dlt.destinations.postgres()
+    raise ValueError(
+        f"Unknown destination {destination}, expected one of {DESTINATIONS}"
+    )
+
+
+def abort_pending_packages(pipeline: Any) -> None:
+    """Drops the packages that were extracted or normalized but not loaded"""
+    # `abort_packages` replaces `drop_pending_packages` from dlt 1.30 on
+    abort = getattr(pipeline, "abort_packages", None) or pipeline.drop_pending_packages
+    abort()
+
+
+def make_pipeline(pipeline_name: str, destination: str, **kwargs: Any) -> Any:
+    """Creates a pipeline whose working dir lives in `BENCH_DIR` instead of `~/.dlt`"""
+    import dlt
+
+    # arrow pages get `_dlt_id` and `_dlt_load_id` like in the tutorial pipelines, see
+    # `.dlt/config.toml`
+    for option in ("ADD_DLT_ID", "ADD_DLT_LOAD_ID"):
+        os.environ.setdefault(
+            f"{pipeline_name.upper()}__NORMALIZE__PARQUET_NORMALIZER__{option}", "true"
+        )
+    pipeline = dlt.pipeline(
+        pipeline_name=pipeline_name,
+        destination=make_destination(destination, pipeline_name),
+        dataset_name=kwargs.pop("dataset_name", "sample_data"),
+        pipelines_dir=str(BENCH_DIR / "pipelines"),
+        **kwargs,
+    )
+    # packages left by a failed run would be loaded instead of the data of the next one
+    abort_pending_packages(pipeline)
+    return pipeline
+
+
+def collect_metrics(
+    result: BenchmarkResult, pipeline: Any, load_info: Any
+) -> BenchmarkResult:
+    """Fills `result` from the last trace of `pipeline` and the `load_info` of its run"""
+    trace = pipeline.last_trace
+    for step in trace.steps:
+        duration = (step.finished_at - step.started_at).total_seconds()
+        if step.step in ("extract", "normalize", "load"):
+            setattr(result, f"{step.step}_s", duration)
+        elif step.step == "run":
+            result.total_s = duration
+    if not result.total_s:
+        result.total_s = result.extract_s + result.normalize_s + result.load_s
+
+    normalize_info = trace.last_normalize_info
+    if normalize_info:
+        result.rows_loaded = sum(
+            count
+            for table_name, count in normalize_info.row_counts.items()
+            if not table_name.startswith("_dlt")
+        )
+    if result.total_s:
+        result.rows_per_s = result.rows_loaded / result.total_s
+
+    result.bytes_written = sum(
+        job.file_size
+        for package in load_info.load_packages
+        for job in package.jobs["completed_jobs"]
+    )
+    result.peak_rss_mb = peak_rss_mb()
+    return result
+
+
+def run_isolated(func: Callable[..., BenchmarkResult], *args: Any) -> BenchmarkResult:
+    """Runs `func` in a fresh interpreter so peak RSS and import costs are not shared between runs.
+
+    `func` must be importable (a module level function) and return a `BenchmarkResult`.
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=get_context("spawn")
+    ) as executor:
+        return executor.submit(func, *args).result()
+
+
+def git_commit() -> tuple[str, bool]:
+    """Returns the current commit and whether the working tree has uncommitted changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", True
+    return commit, bool(status)
+
+
+def _connect() -> Any:
+    import duckdb
+
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    connection = duckdb.connect(str(RESULTS_DB))
+    connection.execute(f"""
+        CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+            run_id VARCHAR,
+            recorded_at TIMESTAMP,
+            commit VARCHAR,
+            dirty BOOLEAN,
+            host VARCHAR,
+            python_version VARCHAR,
+            dlt_version VARCHAR,
+            benchmark VARCHAR,
+            "case" VARCHAR,
+            variant VARCHAR,
+            destination VARCHAR,
+            rows BIGINT,
+            extract_s DOUBLE,
+            normalize_s DOUBLE,
+            load_s DOUBLE,
+            total_s DOUBLE,
+            rows_loaded BIGINT,
+            rows_per_s DOUBLE,
+            bytes_written BIGINT,
+            peak_rss_mb DOUBLE,
+            extra JSON
+        )
+        """)
+    return connection
+
+
+def store_results(results: list[BenchmarkResult]) -> str:
+    """Appends `results` to the results table and returns the id shared by all of them"""
+    import dlt
+
+    run_id = uuid.uuid4().hex
+    commit, dirty = git_commit()
+    recorded_at = dt.datetime.now()
+    columns = [f.name for f in fields(BenchmarkResult)]
+    rows = [
+        (
+            run_id,
+            recorded_at,
+            commit,
+            dirty,
+            platform.node(),
+            platform.python_version(),
+            dlt.__version__,
+            *[
+                json.dumps(value) if name == "extra" else value
+                for name, value in asdict(r).items()
+            ],
+        )
+        for r in results
+    ]
+    header = ", ".join(
+        [
+            "run_id",
+            "recorded_at",
+            "commit",
+            "dirty",
+            "host",
+            "python_version",
+            "dlt_version",
+        ]
+        + [f'"{name}"' for name in columns]
+    )
+    placeholders = ", ".join("?" * (7 + len(columns)))
+    with _connect() as connection:
+        connection.executemany(
+            f"INSERT INTO {RESULTS_TABLE} ({header}) VALUES ({placeholders})", rows
+        )
+    return run_id
+
+
+def query_results(sql: str, params: list[Any] | None = None) -> list[tuple]:
+    with _connect() as connection:
+        return connection.execute(sql, params or []).fetchall()
+
+
+def print_results(results: list[BenchmarkResult]) -> None:
+    header = (
+        f"{'benchmark':<12} {'case':<12} {'variant':<10} {'dest':<9} {'rows':>10} "
+        f"{'extract':>8} {'normal.':>8} {'load':>8} {'total':>8} {'rows/s':>10} "
+        f"{'MiB out':>8} {'peak MiB':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.benchmark:<12} {r.case:<12} {r.variant:<10} {r.destination:<9} {r.rows:>10} "
+            f"{r.extract_s:>8.2f} {r.normalize_s:>8.2f} {r.load_s:>8.2f} {r.total_s:>8.2f} "
+            f"{r.rows_per_s:>10.0f} {r.bytes_written / 2**20:>8.1f} {r.peak_rss_mb:>9.1f}"
+        )
+
+
+def parse_rows(value: str) -> int:
+    """argparse type for sizes, also accepts `5_000_000`, `100k` and `10M`"""
+    suffixes = {"k": 1_000, "m": 1_000_000}
+    value = value.strip().lower()
+    if value and value[-1] in suffixes:
+        return int(float(value[:-1]) * suffixes[value[-1]])
+    return int(value)
+
+
+def chdir_to_repo() -> None:
+    """dlt reads `.dlt/` from the current working directory"""
+    os.chdir(REPO_DIR)
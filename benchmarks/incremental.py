@@ -0,0 +1,141 @@
+"""Measures how the upsert pipeline (5) scales with the number of changed rows.
+
+Each run loads the base data set, then times a second run after a share of the rows changed
+(`--changed`). With the `updated_at` cursor (`cursor` variant) the second run only reads and
+merges the changed rows; the `full` variant re-yields the whole table, like the script did
+before it had a cursor, and leaves it to the merge to sort out.
+
+    python benchmarks/incremental.py --sizes 100k 1M --changed 0.001 0.01 0.1
+"""
+
+import argparse
+
+from harness import (
+    DESTINATIONS,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+VARIANTS = ("cursor", "full")
+
+
+def run_changes(
+    variant: str, destination: str, synthetic: SyntheticData
+) -> BenchmarkResult:
+    """Loads the base rows, then measures loading the changes. Runs in its own process"""
+    import dlt
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    module = load_script("5_sample_pipeline_merge_upsert.py")
+    pipeline = make_pipeline(f"bench_incremental_{destination}", destination)
+    pipeline.run(
+        module.sample_data(synthetic=synthetic),
+        table_name="samples",
+        refresh="drop_sources",
+    )
+
+    if variant == "cursor":
+        changes = module.sample_data(use_new_data=True, synthetic=synthetic)
+    else:
+        changes = dlt.resource(
+            synthetic.records_since(None, use_new_data=True),
+            name="sample_data",
+            primary_key="id",
+            write_disposition={"disposition": "merge", "strategy": "upsert"},
+        )
+    load_info = pipeline.run(changes, table_name="samples")
+
+    result = BenchmarkResult(
+        benchmark="incremental",
+        case="5",
+        destination=destination,
+        rows=synthetic.rows,
+        variant=f"{variant}-{synthetic.update_ratio:g}",
+    )
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the updated_at cursor of the upsert pipeline"
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=list(DESTINATIONS),
+        help="Destinations to load into (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows in the table (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--changed",
+        nargs="+",
+        type=float,
+        default=[0.001, 0.01, 0.1],
+        help="Share of the rows changed before the second run (default: 0.001 0.01 0.1)",
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=VARIANTS,
+        default=list(VARIANTS),
+        help="Read only the changes through the cursor, or the full table (default: both)",
+    )
+    parser.add_argument(
+        "--arrow-page-size",
+        type=parse_rows,
+        default=0,
+        help="Yield pyarrow tables of this many rows instead of dicts (default: dicts)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            for changed in args.changed:
+                synthetic = SyntheticData(
+                    rows=rows,
+                    update_ratio=changed,
+                    insert_ratio=0.0,
+                    arrow_page_size=args.arrow_page_size,
+                )
+                for variant in args.variants:
+                    print(
+                        f"Running {variant} with {changed:g} of {rows} rows changed "
+                        f"on {destination}..."
+                    )
+                    try:
+                        result = run_isolated(
+                            run_changes, variant, destination, synthetic
+                        )
+                    except Exception as ex:
+                        print(f"{variant} failed on {destination}: {ex}")
+                        continue
+                    results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,74 @@
+"""Measures the per-row cost of chained ``add_map`` steps, with and without fusing them.
+
+A resource over pre-built dicts is extracted with 0 to N maps, each adding one column. In the
+``chained`` variant every map is its own ``add_map`` step, in the ``fused`` variant they are
+composed by ``utils.map_fusion.fuse`` into a single one. The overhead is the extract time above
+the run without maps, divided by the number of rows.
+
+    python benchmarks/map_fusion.py --rows 100k --maps 1 2 5 10 20
+"""
+
+import argparse
+import time
+
+import dlt
+from harness import abort_pending_packages, make_pipeline, parse_rows
+from utils.map_fusion import AddColumn, fuse
+
+
+def make_records(rows: int) -> list[dict]:
+    return [{"id": x, "name": f"Mr. {x}"} for x in range(rows)]
+
+
+def extract_seconds(rows: int, maps: int, fused: bool) -> float:
+    steps = [AddColumn(f"field_{i}", str.upper, source="name") for i in range(maps)]
+    resource = dlt.resource(make_records(rows), name="samples")
+    if fused and steps:
+        resource.add_map(fuse(*steps))
+    else:
+        for step in steps:
+            resource.add_map(fuse(step))
+
+    pipeline = make_pipeline("benchmark_map_fusion", "duckdb")
+    start = time.perf_counter()
+    pipeline.extract(resource)
+    elapsed = time.perf_counter() - start
+    abort_pending_packages(pipeline)
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark chained and fused add_map steps"
+    )
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        default=100_000,
+        help="Number of rows to extract (default: 100k)",
+    )
+    parser.add_argument(
+        "--maps",
+        nargs="+",
+        type=int,
+        default=[1, 2, 5, 10, 20],
+        help="Lengths of the map chains (default: 1 2 5 10 20)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    baseline = extract_seconds(args.rows, 0, fused=False)
+    print(f"Extracting {args.rows} rows without maps took {baseline:.2f}s")
+    print(
+        f"{'maps':>5} {'chained':>9} {'fused':>9} {'us/row ch.':>11} {'us/row fu.':>11}"
+    )
+    for maps in args.maps:
+        chained = extract_seconds(args.rows, maps, fused=False)
+        fused = extract_seconds(args.rows, maps, fused=True)
+        chained_us = (chained - baseline) / args.rows * 1e6
+        fused_us = (fused - baseline) / args.rows * 1e6
+        print(
+            f"{maps:>5} {chained:>9.2f} {fused:>9.2f} {chained_us:>11.2f} {fused_us:>11.2f}"
+        )
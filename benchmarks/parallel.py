@@ -0,0 +1,129 @@
+"""Measures extract throughput of a CPU-heavy transformation on process and thread pools.
+
+Two transformations are compared: one in pure Python, which holds the GIL and only scales with
+processes, and one based on ``hashlib.pbkdf2_hmac``, which releases it and scales with threads
+too. ``inline`` runs them in a regular ``@dlt.transformer``.
+
+    python benchmarks/parallel.py --rows 100k --workers 1 2 4 8
+"""
+
+import argparse
+import functools
+import hashlib
+import time
+
+import dlt
+from harness import abort_pending_packages, make_pipeline, parse_rows
+from utils.parallel import EXECUTORS, parallel_resource
+
+
+def python_checksum(record: dict, rounds: int) -> dict:
+    checksum = 0
+    for i in range(rounds):
+        checksum = (
+            checksum * 31 + ord(record["name"][i % len(record["name"])])
+        ) % 2**32
+    record["checksum"] = checksum
+    return record
+
+
+def pbkdf2_checksum(record: dict, rounds: int) -> dict:
+    record["checksum"] = hashlib.pbkdf2_hmac(
+        "sha256", record["name"].encode(), b"salt", rounds
+    ).hex()
+    return record
+
+
+TRANSFORMS = {"python": python_checksum, "pbkdf2": pbkdf2_checksum}
+
+
+@dlt.resource(name="samples")
+def records(rows: int):
+    for x in range(rows):
+        yield {"id": x, "name": f"Mr. {x}"}
+
+
+def extract_seconds(
+    rows: int, func, workers: int, executor: str, batch_size: int, ordered: bool
+) -> float:
+    if workers:
+        resource = parallel_resource(
+            func,
+            records(rows),
+            name="samples",
+            workers=workers,
+            executor=executor,
+            batch_size=batch_size,
+            ordered=ordered,
+        )
+    else:
+        resource = records(rows).add_map(lambda record: func(record))
+
+    pipeline = make_pipeline("benchmark_parallel", "duckdb")
+    start = time.perf_counter()
+    pipeline.extract(resource)
+    elapsed = time.perf_counter() - start
+    abort_pending_packages(pipeline)
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark transformations on process and thread pools"
+    )
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        default=100_000,
+        help="Number of rows to extract (default: 100k)",
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4, 8],
+        help="Worker counts to try (default: 1 2 4 8)",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=1000,
+        help="Work per record, in loop iterations or pbkdf2 rounds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=parse_rows,
+        default=1000,
+        help="Records sent to a worker at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Yield batches as soon as they are done",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(
+        f"{'transform':<10} {'executor':<8} {'workers':>7} {'seconds':>8} {'rows/s':>9}"
+    )
+    for transform_name, transform in TRANSFORMS.items():
+        func = functools.partial(transform, rounds=args.rounds)
+        runs = [("inline", 0)] + [
+            (executor, workers) for executor in EXECUTORS for workers in args.workers
+        ]
+        for executor, workers in runs:
+            seconds = extract_seconds(
+                args.rows,
+                func,
+                workers,
+                executor,
+                args.batch_size,
+                not args.unordered,
+            )
+            print(
+                f"{transform_name:<10} {executor:<8} {workers:>7} {seconds:>8.2f} "
+                f"{args.rows / seconds:>9.0f}"
+            )
@@ -0,0 +1,86 @@
+"""Compares loading the duckdb pipelines (0, 1 and 2) from insert_values and parquet files.
+
+`insert_values` files are executed as INSERT statements with every value written as text.
+`parquet` files are read by duckdb itself with `INSERT ... SELECT * FROM read_parquet(...)`,
+column by column. Load time and peak RSS of each run are stored.
+
+    python benchmarks/parquet_load.py --sizes 100k 1M
+    python benchmarks/parquet_load.py --sizes 1M --arrow-page-size 100k
+"""
+
+import argparse
+
+from harness import parse_rows, print_results, run_isolated, store_results
+from pipelines import run_case
+from utils.data_generator import SyntheticData
+
+FILE_FORMATS = ("insert_values", "parquet")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark insert_values and parquet loads into duckdb"
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=["0", "1", "2"],
+        default=["0", "1", "2"],
+        help="Pipelines to run (default: 0 1 2)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows per run (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--file-formats",
+        nargs="+",
+        choices=FILE_FORMATS,
+        default=list(FILE_FORMATS),
+        help="Loader file formats to compare (default: all)",
+    )
+    parser.add_argument(
+        "--arrow-page-size",
+        type=parse_rows,
+        default=0,
+        help="Yield pyarrow tables of this many rows instead of dicts (default: dicts)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for rows in args.sizes:
+        synthetic = SyntheticData(rows=rows, arrow_page_size=args.arrow_page_size)
+        pages = f"-arrow-{args.arrow_page_size}" if args.arrow_page_size else ""
+        for case_name in args.cases:
+            for file_format in args.file_formats:
+                print(f"Running {case_name} {file_format} with {rows} rows...")
+                try:
+                    result = run_isolated(
+                        run_case,
+                        case_name,
+                        "duckdb",
+                        synthetic,
+                        "parquet_load",
+                        file_format + pages,
+                        {"loader_file_format": file_format},
+                    )
+                except Exception as ex:
+                    print(f"Case {case_name} failed with {file_format}: {ex}")
+                    continue
+                results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
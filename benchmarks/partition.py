@@ -0,0 +1,130 @@
+"""Measures how the extract of pipeline 4b scales with the number of partitions.
+
+The `sample_data` resource of the script is extracted with `--partitions` set to every worker
+count, on threads and on processes. Three sources are compared:
+
+- `dicts`: the synthetic records as dicts, built in Python while holding the GIL
+- `arrow`: the same records as pyarrow pages, mostly built by numpy
+- `io`: pyarrow pages that each wait `--latency` seconds first, like the pages of an API
+
+`speedup` is relative to the first worker count (one partition) on the same executor and
+`efficiency` is the speedup divided by the number of workers, 1.0 being perfect scaling.
+`sequential` is the resource without partitions, which also yields dicts one at a time instead of
+in lists. Processes only help with more than one core, threads only when the generators wait:
+
+    python benchmarks/partition.py --rows 1M --workers 1 2 4 8 16
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+
+import dlt
+from harness import abort_pending_packages, make_pipeline, parse_rows
+from utils.data_generator import SyntheticData
+from utils.parallel import EXECUTORS
+from utils.partition import Partitioning
+from utils.scripts import load_script
+
+SOURCES = ("dicts", "arrow", "io")
+
+
+@dataclass(frozen=True)
+class SlowSyntheticData(SyntheticData):
+    """Synthetic data whose pages take `latency` seconds to arrive"""
+
+    latency: float = 0.0
+
+    def records(self, *args, **kwargs):
+        for page in super().records(*args, **kwargs):
+            time.sleep(self.latency)
+            yield page
+
+
+def make_synthetic(source: str, rows: int, latency: float) -> SyntheticData:
+    if source == "dicts":
+        return SyntheticData(rows=rows)
+    if source == "arrow":
+        return SyntheticData(rows=rows, arrow_page_size=10_000)
+    return SlowSyntheticData(rows=rows, arrow_page_size=10_000, latency=latency)
+
+
+def extract_seconds(module, synthetic, partitioning) -> float:
+    pipeline = make_pipeline("benchmark_partition", "duckdb")
+    resource = module.sample_data(
+        synthetic=synthetic, partitioning=partitioning
+    ).apply_hints(incremental=dlt.sources.incremental("id"))
+    start = time.perf_counter()
+    pipeline.extract(resource, table_name="samples")
+    elapsed = time.perf_counter() - start
+    abort_pending_packages(pipeline)
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the scaling of partitioned extraction by number of workers"
+    )
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        default=200_000,
+        help="Number of rows to extract (default: 200k)",
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=[1, 2, 4, 8, 16],
+        help="Worker counts to try (default: 1 2 4 8 16)",
+    )
+    parser.add_argument(
+        "--sources",
+        nargs="+",
+        choices=SOURCES,
+        default=list(SOURCES),
+        help="Sources to compare (default: all)",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds every page of the io source waits (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--partition-by",
+        choices=("id", "created_at"),
+        default="id",
+        help="Key whose range is split (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    module = load_script("4b_sample_pipeline_append_pk.py")
+    print(
+        f"{'source':<6} {'executor':<10} {'workers':>7} {'seconds':>8} {'rows/s':>9} "
+        f"{'speedup':>7} {'efficiency':>10}"
+    )
+    for source in args.sources:
+        synthetic = make_synthetic(source, args.rows, args.latency)
+        seconds = extract_seconds(module, synthetic, None)
+        print(
+            f"{source:<6} {'sequential':<10} {1:>7} {seconds:>8.2f} "
+            f"{args.rows / seconds:>9.0f}"
+        )
+        for executor in EXECUTORS:
+            first = None
+            for workers in args.workers:
+                partitioning = Partitioning(
+                    by=args.partition_by, partitions=workers, executor=executor
+                )
+                seconds = extract_seconds(module, synthetic, partitioning)
+                first = first or (workers, seconds)
+                speedup = first[1] / seconds
+                efficiency = speedup * first[0] / workers
+                print(
+                    f"{source:<6} {executor:<10} {workers:>7} {seconds:>8.2f} "
+                    f"{args.rows / seconds:>9.0f} {speedup:>7.2f} {efficiency:>10.2f}"
+                )
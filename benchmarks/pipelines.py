@@ -0,0 +1,205 @@
+"""End-to-end benchmark of the tutorial pipelines.
+
+Runs each numbered script (and the legacy transform scripts) with a synthetic data set of
+several sizes against duckdb and Postgres, and stores extract/normalize/load times, throughput,
+bytes written and peak RSS in `.benchmarks/results.duckdb`.
+
+    python benchmarks/pipelines.py --sizes 10k 100k 1M --destinations duckdb
+    python benchmarks/compare.py <base commit> <head commit>
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from harness import (
+    DESTINATIONS,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+
+@dataclass(frozen=True)
+class PipelineCase:
+    """How to run one tutorial script: which data it produces and how its `__main__` runs it"""
+
+    script: str
+    data: Callable[[Any, Any], Any]
+    run_kwargs: dict = field(default_factory=dict)
+
+
+REPLACE = {"write_disposition": {"disposition": "replace"}}
+
+
+def _with_incremental_id(module: Any, synthetic: Any) -> Any:
+    import dlt
+
+    return module.sample_data(synthetic=synthetic).apply_hints(
+        incremental=dlt.sources.incremental("id")
+    )
+
+
+CASES: dict[str, PipelineCase] = {
+    "0": PipelineCase("0_sample_pipeline_basic.py", lambda m, s: s.records(), REPLACE),
+    "1": PipelineCase(
+        "1_sample_pipeline_basic.py",
+        lambda m, s: m.sample_data(synthetic=s),
+        REPLACE,
+    ),
+    # the sources in 2 and 2b only wrap `sample_data`, which is what we parametrize
+    "2": PipelineCase(
+        "2_sample_pipeline_sources_resources.py",
+        lambda m, s: m.sample_data(synthetic=s),
+        REPLACE,
+    ),
+    "2b": PipelineCase(
+        "2b_sample_pipeline_sources_resources_with_config.py",
+        lambda m, s: m.sample_data(synthetic=s),
+        REPLACE,
+    ),
+    "3": PipelineCase(
+        "3_sample_pipeline_postgres_config.py", lambda m, s: m.sample_data(synthetic=s)
+    ),
+    "4": PipelineCase(
+        "4_sample_pipeline_append.py", lambda m, s: m.sample_data(synthetic=s)
+    ),
+    "4b": PipelineCase("4b_sample_pipeline_append_pk.py", _with_incremental_id),
+    "5": PipelineCase(
+        "5_sample_pipeline_merge_upsert.py", lambda m, s: m.sample_data(synthetic=s)
+    ),
+    "6": PipelineCase(
+        "6_sample_pipeline_merge_scd2.py", lambda m, s: m.sample_data(synthetic=s)
+    ),
+    "7": PipelineCase(
+        "7_sample_pipeline_schema.py", lambda m, s: m.sample_data(synthetic=s)
+    ),
+    "8": PipelineCase(
+        "8_sample_pipeline_schema_with_pydantic.py",
+        lambda m, s: m.sample_data(synthetic=s),
+    ),
+    "legacy/7": PipelineCase(
+        "legacy/7_sample_pipeline_transform_before.py",
+        lambda m, s: m.transform_data(m.sample_data(rows=s.rows)),
+        REPLACE,
+    ),
+    "legacy/8": PipelineCase(
+        "legacy/8_sample_pipeline_transform_add_map.py",
+        lambda m, s: m.sample_source(rows=s.rows, page_size=s.arrow_page_size),
+        REPLACE,
+    ),
+    "legacy/9": PipelineCase(
+        "legacy/9_sample_pipeline_transform_remove_column.py",
+        lambda m, s: m.sample_source(rows=s.rows, page_size=s.arrow_page_size),
+        REPLACE,
+    ),
+    "legacy/10": PipelineCase(
+        "legacy/10_sample_pipeline_transform_with_transformer.py",
+        lambda m, s: m.sample_source(rows=s.rows, page_size=s.arrow_page_size),
+        REPLACE,
+    ),
+}
+
+
+def run_case(
+    case_name: str,
+    destination: str,
+    synthetic: SyntheticData,
+    benchmark: str = "pipelines",
+    variant: str = "default",
+    run_kwargs: dict | None = None,
+) -> BenchmarkResult:
+    """Runs a single case from scratch. Executed in its own process by `run_isolated`.
+
+    `run_kwargs` are passed to `pipeline.run` on top of the ones of the case.
+    """
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    case = CASES[case_name]
+    module = load_script(case.script)
+
+    pipeline_name = "bench_" + case_name.replace("/", "_") + f"_{destination}"
+    pipeline = make_pipeline(pipeline_name, destination)
+    load_info = pipeline.run(
+        case.data(module, synthetic),
+        table_name="samples",
+        refresh="drop_sources",
+        **(case.run_kwargs | (run_kwargs or {})),
+    )
+    result = BenchmarkResult(
+        benchmark=benchmark,
+        case=case_name,
+        destination=destination,
+        rows=synthetic.rows,
+        variant=variant,
+    )
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the tutorial pipelines")
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=list(CASES),
+        default=list(CASES),
+        help="Pipelines to run (default: all)",
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=list(DESTINATIONS),
+        help="Destinations to load into (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[1_000, 100_000],
+        help="Number of rows per run, e.g. 10k 1M (default: 1000 100000)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Runs per case, size and destination (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Data set seed")
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            for case_name in args.cases:
+                for _ in range(args.repeat):
+                    print(f"Running {case_name} with {rows} rows on {destination}...")
+                    try:
+                        synthetic = SyntheticData(rows=rows, seed=args.seed)
+                        result = run_isolated(
+                            run_case, case_name, destination, synthetic
+                        )
+                    except Exception as ex:
+                        print(f"Case {case_name} failed on {destination}: {ex}")
+                        continue
+                    results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
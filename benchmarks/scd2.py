@@ -0,0 +1,179 @@
+"""Measures how the SCD2 merge of pipeline 6 scales with the depth of the history.
+
+Each run loads the base data set, then adds `depth - 1` retired versions of every row straight in
+SQL, so a table with 100 versions per id does not take 100 pipeline runs to build. The timed run
+loads the same rows again. The `row_hash` variant is the script as is: a hash computed at
+extraction, without the ingestion time, plus `create_scd2_indexes`, so the merge only compares the
+current rows and changes none. `dlt` is the plain `scd2` strategy, with the hash dlt computes
+during normalization over the whole row, ingestion time included, and no indexes, so it retires
+and inserts every row.
+
+    python benchmarks/scd2.py --sizes 10k 100k --depths 1 10 100
+"""
+
+import argparse
+
+from harness import (
+    DESTINATIONS,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+VARIANTS = ("row_hash", "dlt")
+
+
+def add_history(pipeline, table_name: str, depth: int) -> None:
+    """Inserts `depth - 1` retired copies of every current row, one day apart"""
+    with pipeline.sql_client() as client:
+        table = pipeline.default_schema.get_table(table_name)
+        escape = client.escape_column_name
+        columns, values = [], []
+        for name in table["columns"]:
+            column = escape(name)
+            columns.append(column)
+            if name == "_dlt_id":
+                value = f"md5({column} || CAST(g.v AS VARCHAR))"
+            elif name == "_dlt_valid_from":
+                value = f"{column} - g.v * INTERVAL '1 day'"
+            elif name == "_dlt_valid_to":
+                value = f"{escape('_dlt_valid_from')} - (g.v - 1) * INTERVAL '1 day'"
+            else:
+                value = column
+            values.append(value)
+        client.execute_sql(f"""
+            INSERT INTO {client.make_qualified_table_name(table_name)} ({", ".join(columns)})
+            SELECT {", ".join(values)}
+            FROM {client.make_qualified_table_name(table_name)}
+            CROSS JOIN generate_series(1, {depth - 1}) AS g(v)
+            WHERE {escape('_dlt_valid_to')} IS NULL
+        """)
+
+
+def make_resource(module, variant: str, synthetic: SyntheticData):
+    if variant == "row_hash":
+        return module.sample_data(synthetic=synthetic)
+
+    import dlt
+
+    return dlt.resource(
+        synthetic.records(),
+        name="sample_data",
+        primary_key="id",
+        write_disposition={"disposition": "merge", "strategy": "scd2"},
+    )
+
+
+def run_depth(
+    variant: str, depth: int, destination: str, synthetic: SyntheticData
+) -> BenchmarkResult:
+    """Builds a history `depth` versions deep and measures one more load, in its own process"""
+    from utils.scd2 import create_scd2_indexes
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    module = load_script("6_sample_pipeline_merge_scd2.py")
+    pipeline = make_pipeline(f"bench_scd2_{destination}", destination)
+    pipeline.run(
+        make_resource(module, variant, synthetic),
+        table_name="samples",
+        refresh="drop_sources",
+    )
+    if depth > 1:
+        add_history(pipeline, "samples", depth)
+    if variant == "row_hash":
+        create_scd2_indexes(pipeline, "samples")
+
+    load_info = pipeline.run(
+        make_resource(module, variant, synthetic),
+        table_name="samples",
+    )
+
+    result = BenchmarkResult(
+        benchmark="scd2",
+        case="6",
+        destination=destination,
+        rows=synthetic.rows,
+        variant=f"{variant}-{depth}",
+        extra={"history_rows": synthetic.rows * (depth + 1)},
+    )
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SCD2 merge against the depth of the history"
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=list(DESTINATIONS),
+        help="Destinations to load into (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[10_000, 100_000],
+        help="Number of ids in the table (default: 10k 100k)",
+    )
+    parser.add_argument(
+        "--depths",
+        nargs="+",
+        type=int,
+        default=[1, 10, 100],
+        help="Versions per id before the measured load (default: 1 10 100)",
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=VARIANTS,
+        default=list(VARIANTS),
+        help="Row hash and indexes of the script, or plain scd2 (default: both)",
+    )
+    parser.add_argument(
+        "--arrow-page-size",
+        type=parse_rows,
+        default=0,
+        help="Yield pyarrow tables of this many rows instead of dicts (default: dicts)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            synthetic = SyntheticData(rows=rows, arrow_page_size=args.arrow_page_size)
+            for depth in args.depths:
+                for variant in args.variants:
+                    print(
+                        f"Running {variant} with {depth} versions of {rows} ids "
+                        f"on {destination}..."
+                    )
+                    try:
+                        result = run_isolated(
+                            run_depth, variant, depth, destination, synthetic
+                        )
+                    except Exception as ex:
+                        print(f"{variant} failed on {destination}: {ex}")
+                        continue
+                    results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
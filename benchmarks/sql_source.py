@@ -0,0 +1,160 @@
+"""Measures the peak memory of copying a table with the chunked `sql_table` of pipeline 3b.
+
+For every size, a `samples` table is first filled in the source, Postgres or a sqlite file, and
+then copied into duckdb once per backend, each run in its own process so that its peak RSS is
+its own. With a server-side cursor the peak RSS of the extract should not grow with the number of
+rows, only with `--chunk-size`. It is printed next to the peak of the whole run, which also
+includes duckdb reading the parquet files:
+
+    python benchmarks/sql_source.py --sizes 100k 1M 10M --source postgres
+    python benchmarks/sql_source.py --sizes 100k 1M --source sqlite --chunk-sizes 10k 100k
+"""
+
+import argparse
+
+from harness import (
+    BENCH_DIR,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+SOURCES = ("postgres", "sqlite")
+BACKENDS = ("pyarrow", "pandas", "sqlalchemy")
+SOURCE_SCHEMA = "bench_sql_source"
+
+
+def fill_source(source: str, rows: int) -> tuple[str, str]:
+    """Loads `rows` synthetic records into the source. Returns its URL and schema"""
+    import dlt
+
+    chdir_to_repo()
+    if source == "sqlite":
+        url = f"sqlite:///{BENCH_DIR / 'sql_source.db'}"
+        destination, schema = dlt.destinations.sqlalchemy(url), "main"
+    else:
+        destination, schema = dlt.destinations.postgres(), SOURCE_SCHEMA
+    pipeline = dlt.pipeline(
+        pipeline_name=f"bench_sql_source_fill_{source}",
+        destination=destination,
+        dataset_name=schema,
+        pipelines_dir=str(BENCH_DIR / "pipelines"),
+    )
+    pipeline.run(
+        SyntheticData(rows=rows, arrow_page_size=100_000).records(),
+        table_name="samples",
+        refresh="drop_sources",
+    )
+    if source == "postgres":
+        credentials = pipeline.destination_client().config.credentials
+        url = credentials.to_native_representation()
+    return url, schema
+
+
+def copy_table(
+    source: str, url: str, schema: str, rows: int, backend: str, chunk_size: int
+) -> BenchmarkResult:
+    """Copies the source table into duckdb. Runs in its own process"""
+    from utils.metrics import ResourceSampler, run_record
+    from utils.scripts import load_script
+
+    chdir_to_repo()
+    module = load_script("3b_sample_pipeline_postgres_source.py")
+    pipeline = make_pipeline("bench_sql_source", "duckdb")
+    # the peak RSS of the extract alone, before duckdb reads the files
+    with ResourceSampler() as sampler:
+        load_info = pipeline.run(
+            module.samples_table(url, chunk_size, backend, schema),
+            table_name="samples",
+            refresh="drop_sources",
+            loader_file_format="parquet",
+        )
+    result = BenchmarkResult(
+        benchmark="sql_source",
+        case="3b",
+        destination="duckdb",
+        rows=rows,
+        variant=f"{backend}-{chunk_size}",
+        extra={"source": source, "backend": backend, "chunk_size": chunk_size},
+    )
+    stages = run_record(pipeline.last_trace, pipeline, sampler)["stages"]
+    result.extra["extract_peak_mib"] = stages["extract"]["peak_rss_bytes"] / 2**20
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the peak memory of chunked sql_table copies"
+    )
+    parser.add_argument(
+        "--source",
+        choices=SOURCES,
+        default="postgres",
+        help="Database the table is read from (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows per run (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=["pyarrow", "pandas"],
+        help="Backends to compare (default: pyarrow pandas)",
+    )
+    parser.add_argument(
+        "--chunk-sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[50_000],
+        help="Rows fetched from the cursor at a time (default: 50k)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for rows in args.sizes:
+        print(f"Filling {args.source} with {rows} rows...")
+        url, schema = run_isolated(fill_source, args.source, rows)
+        for backend in args.backends:
+            for chunk_size in args.chunk_sizes:
+                print(
+                    f"Copying {rows} rows with {backend} in chunks of {chunk_size}..."
+                )
+                try:
+                    result = run_isolated(
+                        copy_table, args.source, url, schema, rows, backend, chunk_size
+                    )
+                except Exception as ex:
+                    print(f"{backend} failed with {rows} rows: {ex}")
+                    continue
+                results.append(result)
+
+    print_results(results)
+    print()
+    print(f"{'variant':<20} {'rows':>10} {'extract peak MiB':>17} {'peak MiB':>9}")
+    for r in results:
+        print(
+            f"{r.variant:<20} {r.rows:>10} {r.extra['extract_peak_mib']:>17.1f} "
+            f"{r.peak_rss_mb:>9.1f}"
+        )
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,79 @@
+"""Compares the per-record ``transform_data`` of the legacy scripts with its vectorized version.
+
+Only the transformation itself is timed, over names drawn from the synthetic data set (plus a
+few non-ascii ones to exercise the fallback), and the outputs are checked to be identical. Use
+``arrow_pages.py --cases legacy/8 legacy/10`` to measure whole pipeline runs.
+
+    python benchmarks/transforms.py --sizes 100k 1M
+"""
+
+import argparse
+import time
+
+import pyarrow as pa
+from harness import parse_rows
+from utils.data_generator import NAMES
+from utils.transforms import add_transformed_field, normalize_name
+
+EXTRA_NAMES = ("Mr. Ñandú", "Ms. İnci", "Mr. ß.Straße")
+
+
+def make_names(rows: int, non_ascii: bool) -> list[str]:
+    names = NAMES + EXTRA_NAMES if non_ascii else NAMES
+    return [names[x % len(names)] for x in range(rows)]
+
+
+def per_record(names: list[str]) -> tuple[float, list[str]]:
+    records = [{"name": name} for name in names]
+    start = time.perf_counter()
+    for record in records:
+        record["my_transformed_field"] = normalize_name(record["name"])
+    elapsed = time.perf_counter() - start
+    return elapsed, [record["my_transformed_field"] for record in records]
+
+
+def vectorized(names: list[str], page_size: int) -> tuple[float, list[str]]:
+    pages = [
+        pa.table({"name": names[start : start + page_size]})
+        for start in range(0, len(names), page_size)
+    ]
+    start = time.perf_counter()
+    pages = [add_transformed_field(page) for page in pages]
+    elapsed = time.perf_counter() - start
+    return elapsed, pa.concat_tables(pages).column("my_transformed_field").to_pylist()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the per-record and vectorized legacy transformations"
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000],
+        help="Number of rows to transform (default: 100k 1M)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=parse_rows,
+        default=50_000,
+        help="Rows per pyarrow page (default: 50k)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"{'rows':>10} {'names':<10} {'per row':>9} {'vector.':>9} {'speedup':>8}")
+    for rows in args.sizes:
+        for non_ascii in (False, True):
+            names = make_names(rows, non_ascii)
+            row_s, expected = per_record(names)
+            vector_s, actual = vectorized(names, args.page_size)
+            if actual != expected:
+                raise SystemExit(f"Vectorized output differs with {rows} rows")
+            label = "non-ascii" if non_ascii else "ascii"
+            print(
+                f"{rows:>10} {label:<10} {row_s:>9.3f} {vector_s:>9.3f} {row_s / vector_s:>7.1f}x"
+            )
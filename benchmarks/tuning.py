@@ -0,0 +1,110 @@
+"""Sweeps a pipeline over a grid of workers and data writer sizes and reports the fastest one.
+
+Every combination of the values given below runs the case of `pipelines.py` from scratch in its
+own process, with the settings applied as `--normalize-workers` and friends would in the
+scripts (see `utils/tuning.py`). The fastest combination depends on the machine and on the
+number of rows, so run it with the sizes you expect:
+
+    python benchmarks/tuning.py --case 4 --rows 1M --normalize-workers 1 2 4 --file-max-items 100k 1M
+"""
+
+import argparse
+import itertools
+
+from harness import DESTINATIONS, parse_rows, print_results, run_isolated, store_results
+from pipelines import CASES, run_case
+from utils.data_generator import SyntheticData
+from utils.tuning import TUNING_OPTIONS
+
+
+def run_setting(
+    case_name: str, destination: str, synthetic: SyntheticData, setting: dict
+):
+    """Runs the case with `setting` applied. Runs in its own process"""
+    from utils.tuning import apply_tuning
+
+    pipeline_name = "bench_" + case_name.replace("/", "_") + f"_{destination}"
+    apply_tuning(pipeline_name, setting)
+    result = run_case(
+        case_name, destination, synthetic, "tuning", variant=label(setting)
+    )
+    result.extra = dict(setting)
+    return result
+
+
+def label(setting: dict) -> str:
+    return (
+        " ".join(
+            f"{option}={value}"
+            for option, value in setting.items()
+            if value is not None
+        )
+        or "default"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Find the fastest workers and data writer sizes for a pipeline"
+    )
+    parser.add_argument(
+        "--case",
+        choices=list(CASES),
+        default="4",
+        help="Pipeline to run (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--destination",
+        choices=DESTINATIONS,
+        default="duckdb",
+        help="Destination to load into (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        default=100_000,
+        help="Number of rows per run (default: 100k)",
+    )
+    for option in TUNING_OPTIONS:
+        parser.add_argument(
+            f"--{option.replace('_', '-')}",
+            nargs="+",
+            type=parse_rows,
+            default=[None],
+            help="Values to try (default: the config of the pipeline)",
+        )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    synthetic = SyntheticData(rows=args.rows)
+    grid = [getattr(args, option) for option in TUNING_OPTIONS]
+    results = []
+    for values in itertools.product(*grid):
+        setting = dict(zip(TUNING_OPTIONS, values))
+        print(f"Running {args.case} with {label(setting)}...")
+        try:
+            result = run_isolated(
+                run_setting, args.case, args.destination, synthetic, setting
+            )
+        except Exception as ex:
+            print(f"{label(setting)} failed: {ex}")
+            continue
+        results.append(result)
+
+    print_results(results)
+    if results:
+        fastest = min(results, key=lambda result: result.total_s)
+        print(
+            f"\nFastest for {args.rows} rows of {args.case} on {args.destination}: "
+            f"{fastest.variant} ({fastest.total_s:.2f}s)"
+        )
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
@@ -0,0 +1,135 @@
+"""Measures how merging a fixed batch of changes with the upsert pipeline (5) scales with the
+size of the target table.
+
+Each run loads a target of `--sizes` rows, then times merging `--changed` changed rows into it
+through the `updated_at` cursor. The `index` variant is the script as is, with the unique index
+of `create_primary_key_index`; `no_index` leaves the target without one, so Postgres has to scan
+it on every merge.
+
+    python benchmarks/upsert.py --sizes 100k 1M 10M --changed 10k
+"""
+
+import argparse
+
+from harness import (
+    DESTINATIONS,
+    BenchmarkResult,
+    chdir_to_repo,
+    collect_metrics,
+    make_pipeline,
+    parse_rows,
+    print_results,
+    run_isolated,
+    store_results,
+)
+from utils.data_generator import SyntheticData
+
+VARIANTS = ("index", "no_index")
+
+
+def run_upsert(
+    variant: str, destination: str, synthetic: SyntheticData
+) -> BenchmarkResult:
+    """Loads the target, then measures merging the changes. Runs in its own process"""
+    from utils.scripts import load_script
+    from utils.upsert import create_primary_key_index
+
+    chdir_to_repo()
+    module = load_script("5_sample_pipeline_merge_upsert.py")
+    pipeline = make_pipeline(f"bench_upsert_{destination}", destination)
+    pipeline.run(
+        module.sample_data(synthetic=synthetic),
+        table_name="samples_upsert",
+        refresh="drop_sources",
+    )
+    if variant == "index":
+        create_primary_key_index(pipeline, "samples_upsert")
+
+    load_info = pipeline.run(
+        module.sample_data(use_new_data=True, synthetic=synthetic),
+        table_name="samples_upsert",
+    )
+
+    result = BenchmarkResult(
+        benchmark="upsert",
+        case="5",
+        destination=destination,
+        rows=synthetic.rows,
+        variant=variant,
+        extra={"changed_rows": round(synthetic.rows * synthetic.update_ratio)},
+    )
+    return collect_metrics(result, pipeline, load_info)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark upsert merges of a fixed batch into growing targets"
+    )
+    parser.add_argument(
+        "--destinations",
+        nargs="+",
+        choices=DESTINATIONS,
+        default=["postgres"],
+        help="Destinations to load into (default: postgres)",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=parse_rows,
+        default=[100_000, 1_000_000, 10_000_000],
+        help="Number of rows in the target table (default: 100k 1M 10M)",
+    )
+    parser.add_argument(
+        "--changed",
+        type=parse_rows,
+        default=10_000,
+        help="Number of rows changed before the measured run (default: 10k)",
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=VARIANTS,
+        default=list(VARIANTS),
+        help="With or without the unique index on the primary key (default: both)",
+    )
+    parser.add_argument(
+        "--arrow-page-size",
+        type=parse_rows,
+        default=100_000,
+        help="Yield pyarrow tables of this many rows, 0 for dicts (default: 100k)",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="Print the results without storing them in the results database",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = []
+    for destination in args.destinations:
+        for rows in args.sizes:
+            synthetic = SyntheticData(
+                rows=rows,
+                update_ratio=min(args.changed / rows, 1.0),
+                insert_ratio=0.0,
+                arrow_page_size=args.arrow_page_size,
+            )
+            for variant in args.variants:
+                print(
+                    f"Running {variant} with {args.changed} changes into {rows} rows "
+                    f"on {destination}..."
+                )
+                try:
+                    result = run_isolated(run_upsert, variant, destination, synthetic)
+                except Exception as ex:
+                    print(f"{variant} failed on {destination}: {ex}")
+                    continue
+                results.append(result)
+
+    print_results(results)
+    if not args.no_store:
+        run_id = store_results(results)
+        print(f"Stored {len(results)} results with run id {run_id}")
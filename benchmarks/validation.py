@@ -0,0 +1,129 @@
+"""Measures the cost of validating rows with the Pydantic model of pipeline 8, per million rows.
+
+Only the extract step is timed, since that is where validation runs. `none` extracts pages of
+rows without any validator and is the baseline the other variants are compared against:
+
+- `row`: dlt validates every row with the model, as in the script by default
+- `dlt_batch`: pages of `--batch-size` rows go through the same dlt validator
+- `batch`: pages are validated with one cached `TypeAdapter` call (`--batch-size` in the script)
+- `trusted`: like `batch`, but only `--trusted-sample` rows of each page are checked
+
+    python benchmarks/validation.py --rows 1M --contracts freeze evolve discard_row
+"""
+
+import argparse
+import time
+
+from harness import abort_pending_packages, make_pipeline, parse_rows
+from utils.data_generator import SyntheticData
+from utils.scripts import load_script
+from utils.validation import CONTRACT_MODES, model_columns, validate_in_batches
+
+VARIANTS = ("none", "row", "dlt_batch", "batch", "trusted")
+
+
+def make_resource(
+    module,
+    variant: str,
+    contract: str,
+    synthetic: SyntheticData,
+    batch_size: int,
+    trusted_sample: int,
+):
+    if variant == "row":
+        batch_size = 0
+    resource = module.sample_data(synthetic=synthetic, batch_size=batch_size)
+    schema_contract = {"columns": contract, "data_type": contract}
+    if variant == "none":
+        # plain columns do not create a validator
+        resource.apply_hints(
+            columns=model_columns(module.SampleDataModel),
+            schema_contract=schema_contract,
+        )
+        resource.validator = None
+        return resource
+    if variant in ("row", "dlt_batch"):
+        # recreates the dlt validator with the contract
+        return resource.apply_hints(schema_contract=schema_contract)
+    sample = trusted_sample if variant == "trusted" else 0
+    return validate_in_batches(resource, module.SampleDataModel, contract, sample)
+
+
+def extract_seconds(resource) -> float:
+    pipeline = make_pipeline("benchmark_validation", "duckdb")
+    start = time.perf_counter()
+    pipeline.extract(resource, table_name="samples")
+    elapsed = time.perf_counter() - start
+    abort_pending_packages(pipeline)
+    return elapsed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark row and batch validation with a Pydantic model"
+    )
+    parser.add_argument(
+        "--rows",
+        type=parse_rows,
+        default=100_000,
+        help="Number of rows to extract (default: 100k)",
+    )
+    parser.add_argument(
+        "--contracts",
+        nargs="+",
+        choices=CONTRACT_MODES,
+        default=list(CONTRACT_MODES),
+        help="Contract modes for columns and data types (default: all)",
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=VARIANTS,
+        default=list(VARIANTS),
+        help="Validation variants to compare (default: all)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=parse_rows,
+        default=10_000,
+        help="Rows per validated page (default: 10k)",
+    )
+    parser.add_argument(
+        "--trusted-sample",
+        type=int,
+        default=100,
+        help="Rows checked per page by the trusted variant (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    module = load_script("8_sample_pipeline_schema_with_pydantic.py")
+    synthetic = SyntheticData(rows=args.rows)
+    print(
+        f"{'contract':<12} {'variant':<10} {'seconds':>8} {'s/1M rows':>10} {'overhead':>9}"
+    )
+    for contract in args.contracts:
+        baseline = None
+        for variant in args.variants:
+            resource = make_resource(
+                module,
+                variant,
+                contract,
+                synthetic,
+                args.batch_size,
+                args.trusted_sample,
+            )
+            seconds = extract_seconds(resource)
+            per_million = seconds / args.rows * 1_000_000
+            if variant == "none":
+                baseline = per_million
+            overhead = (
+                f"{per_million - baseline:>9.2f}"
+                if baseline is not None
+                else f"{'-':>9}"
+            )
+            print(
+                f"{contract:<12} {variant:<10} {seconds:>8.2f} {per_million:>10.2f} {overhead}"
+            )
@@ -46,6 +46,7 @@ if __name__ == "__main__":
         write_disposition={
             "disposition": "replace",
         },
+        loader_file_format="parquet",
     )
     # --8<-- [end:pipeline]
 
@@ -4,9 +4,11 @@ from typing import Generator
 
 import dlt
 
+from utils.data_generator import SyntheticData
+
 
 # --8<-- [start:sample_data]
-def sample_data() -> Generator[dict, None, None]:
+def sample_data(synthetic: SyntheticData | None = None) -> Generator[dict, None, None]:
     data = [
         {
             "id": 1,
@@ -31,7 +33,8 @@ def sample_data() -> Generator[dict, None, None]:
             },
         },
     ]
-    for item in data:
+    records = synthetic.records() if synthetic else data
+    for item in records:
         yield item
 
 
@@ -54,6 +57,7 @@ if __name__ == "__main__":
         write_disposition={
             "disposition": "replace",
         },
+        loader_file_format="parquet",
     )
 
     # --8<-- [end:pipeline]
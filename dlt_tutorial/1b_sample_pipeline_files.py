@@ -0,0 +1,76 @@
+import argparse
+from pathlib import Path
+from typing import Any, Iterator
+
+import dlt
+
+from utils.data_generator import SyntheticData
+from utils.file_source import PARSERS, read_file, write_sample_file
+
+
+# --8<-- [start:sample_data]
+@dlt.resource(name="sample_data")
+def sample_data_from_file(
+    path: Path, chunk_mib: int = 64, use_mmap: bool = False, parser: str = "orjson"
+) -> Iterator[Any]:
+    # one chunk of the file is in memory at a time, however large the file is
+    yield from read_file(path, chunk_mib * 2**20, use_mmap, parser)
+
+
+# --8<-- [end:sample_data]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load a JSONL or CSV file into duckdb in chunks"
+    )
+    parser.add_argument("path", type=Path, help="A .jsonl or .csv file")
+    parser.add_argument(
+        "--chunk-mib",
+        type=int,
+        default=64,
+        help="MiB of the file read and parsed at a time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Memory-map the file instead of reading it into a buffer",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=PARSERS,
+        default="orjson",
+        help="Parse JSONL into dicts or pyarrow tables, CSV is always read with Arrow "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--generate",
+        type=int,
+        default=0,
+        metavar="ROWS",
+        help="Write this many synthetic records to the file first",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.generate:
+        size = write_sample_file(args.path, SyntheticData(rows=args.generate))
+        print(f"Wrote {args.generate} records to {args.path} ({size / 2**20:.0f} MiB)")
+    # --8<-- [start:pipeline]
+    pipeline = dlt.pipeline(
+        pipeline_name="sample_pipeline_files",
+        destination=dlt.destinations.duckdb,
+        dataset_name="sample_data",
+    )
+
+    print(f"Loading {args.path}...")
+    load_info = pipeline.run(
+        sample_data_from_file(args.path, args.chunk_mib, args.mmap, args.parser),
+        table_name="samples",
+        refresh="drop_sources",
+        loader_file_format="parquet",
+    )
+    # --8<-- [end:pipeline]
+    print(load_info)
@@ -4,10 +4,12 @@ from typing import Generator
 
 import dlt
 
+from utils.data_generator import SyntheticData
+
 
 # --8<-- [start:sample_data]
 @dlt.resource
-def sample_data() -> Generator[dict, None, None]:
+def sample_data(synthetic: SyntheticData | None = None) -> Generator[dict, None, None]:
     my_data = [
         {
             "id": 1,
@@ -32,7 +34,8 @@ def sample_data() -> Generator[dict, None, None]:
             },
         },
     ]
-    for item in my_data:
+    records = synthetic.records() if synthetic else my_data
+    for item in records:
         yield item
 
 
@@ -4,6 +4,8 @@ from typing import Generator
 
 import dlt
 
+from utils.data_generator import SyntheticData
+
 
 # --8<-- [start:resource]
 @dlt.resource(
@@ -12,7 +14,7 @@ import dlt
         "disposition": "replace",
     },
 )
-def sample_data() -> Generator[dict, None, None]:
+def sample_data(synthetic: SyntheticData | None = None) -> Generator[dict, None, None]:
     my_data = [
         {
             "id": 1,
@@ -37,7 +39,8 @@ def sample_data() -> Generator[dict, None, None]:
             },
         },
     ]
-    for item in my_data:
+    records = synthetic.records() if synthetic else my_data
+    for item in records:
         yield item
 
 
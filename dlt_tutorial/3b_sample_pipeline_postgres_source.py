@@ -0,0 +1,80 @@
+import argparse
+
+import dlt
+from dlt.sources.sql_database import sql_table
+
+BACKENDS = ("pyarrow", "pandas", "sqlalchemy")
+
+
+# --8<-- [start:resource]
+def samples_table(
+    credentials: str | None = None,
+    chunk_size: int = 50_000,
+    backend: str = "pyarrow",
+    schema: str = "sample_data",
+    table: str = "samples",
+):
+    """Reads ``schema.table`` in chunks of ``chunk_size`` rows through a server-side cursor"""
+    return sql_table(
+        credentials=credentials or dlt.secrets.value,
+        schema=schema,
+        table=table,
+        chunk_size=chunk_size,
+        backend=backend,
+        reflection_level="full_with_precision",
+        # the columns dlt added when it loaded the table are added again by this pipeline
+        excluded_columns=["_dlt_load_id", "_dlt_id"],
+    )
+
+
+# --8<-- [end:resource]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Copy the samples table from Postgres into duckdb"
+    )
+    parser.add_argument(
+        "--credentials",
+        help="SQLAlchemy URL of the source (default: sources.sql_database.credentials)",
+    )
+    parser.add_argument(
+        "--schema",
+        default="sample_data",
+        help="Schema of the samples table in the source (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50_000,
+        help="Rows fetched from the cursor at a time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="pyarrow",
+        help="Yield chunks as pyarrow tables, pandas frames or dicts (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # --8<-- [start:pipeline]
+    pipeline = dlt.pipeline(
+        pipeline_name="sample_pipeline_postgres_source",
+        destination=dlt.destinations.duckdb,
+        dataset_name="sample_data",
+    )
+
+    print(f"Copying {args.schema}.samples...")
+    # arrow tables and pandas frames are written to parquet as they are, without normalizing
+    # them row by row, and duckdb reads the parquet files itself
+    load_info = pipeline.run(
+        samples_table(args.credentials, args.chunk_size, args.backend, args.schema),
+        table_name="samples",
+        refresh="drop_sources",
+        loader_file_format="parquet",
+    )
+    # --8<-- [end:pipeline]
+    print(load_info)
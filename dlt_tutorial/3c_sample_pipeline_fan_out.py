@@ -0,0 +1,83 @@
+import argparse
+import datetime as dt
+from pathlib import Path
+from typing import Generator
+
+import dlt
+
+from utils.data_generator import SyntheticData, add_synthetic_data_arguments
+from utils.fanout import add_fan_out_arguments, fan_out
+
+
+# --8<-- [start:sample_source]
+@dlt.resource(
+    name="sample_data",
+    write_disposition={
+        "disposition": "replace",
+    },
+)
+def sample_data(synthetic: SyntheticData | None = None) -> Generator[dict, None, None]:
+    my_data = [
+        {
+            "id": 1,
+            "name": "Mr. Mario",
+            "uuid": "a6d7b6dd-bcdb-422e-83eb-f53b2eb4f2cc",
+            "created_at": "2025-10-09 14:40:00",
+            "updated_at": "2025-10-09 14:50:00",
+            "metadata": {
+                "ingested_at": dt.datetime.now().isoformat(),
+                "script_name": Path(__file__).name,
+            },
+        },
+        {
+            "id": 2,
+            "name": "Mr. Luigi",
+            "uuid": "8c804ede-f8ae-409e-964d-9e355a3094e0",
+            "created_at": "2025-10-08 16:15:00",
+            "updated_at": "2025-10-08 16:50:00",
+            "metadata": {
+                "ingested_at": dt.datetime.now().isoformat(),
+                "script_name": Path(__file__).name,
+            },
+        },
+    ]
+    records = synthetic.records() if synthetic else my_data
+    for item in records:
+        yield item
+
+
+@dlt.source
+def sample_source(synthetic: SyntheticData | None = None):
+    yield sample_data(synthetic)
+
+
+# --8<-- [end:sample_source]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Extract the sample source once and load it into several destinations"
+    )
+    add_synthetic_data_arguments(parser)
+    add_fan_out_arguments(parser)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    synthetic = SyntheticData.from_args(args)
+    # --8<-- [start:fan_out]
+    # one extract, a normalize per file format and a load per destination, all at the same time
+    results = fan_out(
+        sample_source(synthetic),
+        pipeline_name="sample_pipeline_fan_out",
+        targets=args.targets,
+        dataset_name="sample_data",
+        retries=args.load_retries,
+        backoff=args.retry_backoff,
+        table_name="samples",
+    )
+    # --8<-- [end:fan_out]
+    for name, result in results.items():
+        print(f"{name}:")
+        print(result)
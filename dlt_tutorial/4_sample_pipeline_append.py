@@ -1,16 +1,27 @@
-import argparse
 import datetime as dt
 from pathlib import Path
-from typing import Generator
+from typing import AsyncIterator, Generator
 
 import dlt
 from dlt.pipeline import TRefreshMode
 
+from utils.cli import pipeline_parser
+from utils.data_generator import SyntheticData
+from utils.dedup import DropSeenKeys, add_dedup_arguments
+from utils.fingerprint import Fingerprint, add_fingerprint_arguments, run_if_changed
+from utils.mock_api import add_mock_api_arguments, start_mock_api
+from utils.paginate import paginate
+from utils.tuning import apply_tuning
+
 
 # --8<-- [start:resource]
 @dlt.resource(primary_key="id", write_disposition="append")
 # --8<-- [start:new_data]
-def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
+def sample_data(
+    use_new_data: bool = False,
+    synthetic: SyntheticData | None = None,
+    dedup: DropSeenKeys | None = None,
+) -> Generator[dict, None, None]:
     my_data = [
         {
             "id": 1,
@@ -62,7 +73,12 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
                 },
             },
         ]
-    for item in my_data:
+    records = synthetic.records(use_new_data) if synthetic else my_data
+    if dedup:
+        # without a cursor every run extracts every row again, the ones whose id an earlier
+        # run extracted are dropped before they reach the destination
+        records = dedup.drop_seen(records, key="id")
+    for item in records:
         yield item
 
 
@@ -70,37 +86,59 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
 # --8<-- [end:resource]
 
 
+@dlt.resource(name="sample_data", primary_key="id", write_disposition="append")
+async def api_sample_data(
+    base_url: str, page_size: int = 1000, concurrency: int = 8
+) -> AsyncIterator[list[dict]]:
+    # dlt extracts the pages that arrived while the next ones are still in flight
+    async for page in paginate(base_url, page_size=page_size, concurrency=concurrency):
+        yield page
+
+
 # --8<-- [start:parse_args]
 def parse_args():
-    parser = argparse.ArgumentParser(description="Sample DLT Pipeline with Append")
-    parser.add_argument(
-        "--refresh",
-        action="store_true",
-        help="Refresh the data in the destination (if applicable)",
-    )
+    parser = pipeline_parser("Sample DLT Pipeline with Append")
+    add_mock_api_arguments(parser)
+    add_fingerprint_arguments(parser)
+    add_dedup_arguments(parser)
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = parse_args()
     should_refresh = args.refresh
+    synthetic = SyntheticData.from_args(args)
     pipeline = dlt.pipeline(
         pipeline_name="sample_pipeline_postgres",
-        destination=dlt.destinations.postgres,
+        destination=args.destination,
         dataset_name="sample_data",
     )
+    apply_tuning(pipeline.pipeline_name, args)
     print("Running pipeline...")
     refresh_mode: TRefreshMode = "drop_sources"
 
     if should_refresh:
         print("Refreshing data in the destination.")
 
-    load_info = pipeline.run(
-        sample_data,
+    # "csv" files are loaded with COPY ... FROM STDIN instead of INSERT statements
+    file_format = dlt.config.get("sample_pipeline_postgres.append.loader_file_format")
+    data = sample_data(synthetic=synthetic, dedup=DropSeenKeys.from_args(args))
+    if args.mock_api:
+        api = start_mock_api(
+            synthetic or SyntheticData(rows=2), args.api_latency, args.api_failure_rate
+        )
+        data = api_sample_data(api.url, args.page_size, args.concurrency)
+    load_info = run_if_changed(
+        pipeline,
+        data,
+        Fingerprint.from_args(args),
         table_name="samples",
         refresh=refresh_mode if should_refresh else None,
+        loader_file_format=file_format,
     )
     # --8<-- [end:parse_args]
+    if args.mock_api:
+        api.shutdown()
 
     print(load_info)
     print("Done")
@@ -1,16 +1,26 @@
-import argparse
 import datetime as dt
+import functools
 from pathlib import Path
 from typing import Generator
 
 import dlt
 from dlt.pipeline import TRefreshMode
 
+from utils.cli import pipeline_parser
+from utils.data_generator import SyntheticData
+from utils.partition import Partitioning, add_partition_arguments
+from utils.tuning import apply_tuning
+
 
 # --8<-- [start:resource_decorator]
 # --8<-- [start:resource]
 @dlt.resource(primary_key="id", write_disposition="append")
-def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
+def sample_data(
+    use_new_data: bool = False,
+    synthetic: SyntheticData | None = None,
+    partitioning: Partitioning | None = None,
+    cursor: dlt.sources.incremental[int] | None = None,
+) -> Generator[dict, None, None]:
     # --8<-- [end:resource_decorator]
     my_data = [
         {
@@ -66,7 +76,22 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
             },
         ]
         # --8<-- [end:new_data]
-    for item in my_data:
+    records = synthetic.records(use_new_data) if synthetic else my_data
+    if synthetic and partitioning:
+        # ranges start after the last id loaded, the rows before it would be filtered out anyway
+        first_id = cursor.start_value + 1 if cursor and cursor.start_value else 1
+        start, end = first_id, synthetic.last_id(use_new_data) + 1
+        if partitioning.by == "created_at":
+            start, end = (
+                dt.datetime.fromtimestamp(synthetic.created_at(id_), dt.timezone.utc)
+                for id_ in (start, end)
+            )
+        records = partitioning.run(
+            functools.partial(synthetic.records_between, use_new_data=use_new_data),
+            start,
+            end,
+        )
+    for item in records:
         yield item
 
 
@@ -75,12 +100,8 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
 
 # --8<-- [start:parse_args]
 def parse_args():
-    parser = argparse.ArgumentParser(description="Sample DLT Pipeline with Append")
-    parser.add_argument(
-        "--refresh",
-        action="store_true",
-        help="Refresh the data in the destination (if applicable)",
-    )
+    parser = pipeline_parser("Sample DLT Pipeline with Append")
+    add_partition_arguments(parser)
 
     return parser.parse_args()
 
@@ -88,24 +109,35 @@ def parse_args():
 if __name__ == "__main__":
     args = parse_args()
     should_refresh = args.refresh
+    synthetic = SyntheticData.from_args(args)
     pipeline = dlt.pipeline(
         pipeline_name="sample_pipeline_postgres",
-        destination=dlt.destinations.postgres,
+        destination=args.destination,
         dataset_name="sample_data",
     )
+    apply_tuning(pipeline.pipeline_name, args)
     print("Running pipeline...")
     refresh_mode: TRefreshMode = "drop_sources"
 
     if should_refresh:
         print("Refreshing data in the destination.")
+
+    # "csv" files are loaded with COPY ... FROM STDIN instead of INSERT statements
+    file_format = dlt.config.get(
+        "sample_pipeline_postgres.append_pk.loader_file_format"
+    )
+    partitioning = Partitioning.from_args(args)
     # --8<-- [start:apply_hints]
     # add unique and incremental primary key on "id" column
-    hinted_data = sample_data.apply_hints(incremental=dlt.sources.incremental("id"))
+    hinted_data = sample_data(
+        synthetic=synthetic, partitioning=partitioning
+    ).apply_hints(incremental=dlt.sources.incremental("id"))
 
     load_info = pipeline.run(
         hinted_data,
         table_name="samples",
         refresh=refresh_mode if should_refresh else None,
+        loader_file_format=file_format,
     )
     # --8<-- [end:apply_hints]
     # --8<-- [end:parse_args]
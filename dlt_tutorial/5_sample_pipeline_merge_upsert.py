@@ -1,4 +1,3 @@
-import argparse
 import datetime as dt
 import logging
 from pathlib import Path
@@ -7,6 +6,17 @@ from typing import Generator
 import dlt
 from dlt.pipeline import TRefreshMode
 
+from utils.cli import pipeline_parser
+from utils.data_generator import SyntheticData
+from utils.fingerprint import (
+    Fingerprint,
+    Unchanged,
+    add_fingerprint_arguments,
+    run_if_changed,
+)
+from utils.tuning import apply_tuning
+from utils.upsert import create_primary_key_index
+
 # Create a logger
 logger = logging.getLogger("dlt")
 
@@ -21,7 +31,11 @@ logger.setLevel(logging.INFO)
     primary_key="id",
     write_disposition={"disposition": "merge", "strategy": "upsert"},
 )
-def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
+def sample_data(
+    use_new_data: bool = False,
+    synthetic: SyntheticData | None = None,
+    updated_at=dlt.sources.incremental("updated_at"),
+) -> Generator[dict, None, None]:
     # --8<-- [end:resource_decorator]
     my_data = [
         {
@@ -77,7 +91,16 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
             },
         ]
         # --8<-- [end:new_data]
-    for item in my_data:
+    # read only the rows changed since the last run, `updated_at.last_value` is None on the
+    # first run. The synthetic data set looks them up in an index, like a database would
+    since = updated_at.last_value
+    if synthetic:
+        records = synthetic.records_since(since, use_new_data)
+    else:
+        records = [
+            item for item in my_data if since is None or item["updated_at"] >= since
+        ]
+    for item in records:
         yield item
 
 
@@ -86,12 +109,12 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
 
 # --8<-- [start:parse_args]
 def parse_args():
-    parser = argparse.ArgumentParser(description="Sample DLT Pipeline with Append")
-    parser.add_argument(
-        "--refresh",
-        action="store_true",
-        help="Refresh the data in the destination (if applicable)",
+    parser = pipeline_parser(
+        "Sample DLT Pipeline with Append",
+        refresh_help="Refresh the data in the destination (if applicable) and reset the "
+        "updated_at cursor",
     )
+    add_fingerprint_arguments(parser)
 
     return parser.parse_args()
 
@@ -99,11 +122,13 @@ def parse_args():
 if __name__ == "__main__":
     args = parse_args()
     should_refresh = args.refresh
+    synthetic = SyntheticData.from_args(args)
     pipeline = dlt.pipeline(
         pipeline_name="sample_pipeline_postgres",
-        destination=dlt.destinations.postgres,
+        destination=args.destination,
         dataset_name="sample_data",
     )
+    apply_tuning(pipeline.pipeline_name, args)
     print("Running pipeline...")
     refresh_mode: TRefreshMode = "drop_sources"
 
@@ -111,13 +136,19 @@ if __name__ == "__main__":
         print("Refreshing data in the destination.")
 
     # --8<-- [start:pipeline_run]
-    load_info = pipeline.run(
-        sample_data,
+    load_info = run_if_changed(
+        pipeline,
+        sample_data(synthetic=synthetic),
+        Fingerprint.from_args(args),
         refresh=refresh_mode if should_refresh else None,
-        table_name="samples",
+        # the unique index below would refuse the duplicate ids of the append pipelines
+        table_name="samples_upsert",
     )
     # --8<-- [end:pipeline_run]
     # --8<-- [end:parse_args]
+    # a unique index on `id` lets the next merges look up the changed rows
+    if not isinstance(load_info, Unchanged):
+        create_primary_key_index(pipeline, "samples_upsert")
 
     print(load_info)
     print("Done")
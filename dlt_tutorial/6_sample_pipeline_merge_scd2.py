@@ -1,4 +1,3 @@
-import argparse
 import datetime as dt
 import logging
 from pathlib import Path
@@ -7,6 +6,17 @@ from typing import Generator
 import dlt
 from dlt.pipeline import TRefreshMode
 
+from utils.cli import pipeline_parser
+from utils.data_generator import SyntheticData
+from utils.fingerprint import (
+    Fingerprint,
+    Unchanged,
+    add_fingerprint_arguments,
+    run_if_changed,
+)
+from utils.scd2 import ROW_HASH_COLUMN, add_row_hash, create_scd2_indexes
+from utils.tuning import apply_tuning
+
 # Create a logger
 logger = logging.getLogger("dlt")
 
@@ -19,9 +29,16 @@ logger.setLevel(logging.INFO)
 @dlt.resource(
     name="sample_data",
     primary_key="id",
-    write_disposition={"disposition": "merge", "strategy": "scd2"},
+    write_disposition={
+        "disposition": "merge",
+        "strategy": "scd2",
+        # detect changes with the hash computed below instead of hashing whole rows
+        "row_version_column_name": ROW_HASH_COLUMN,
+    },
 )
-def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
+def sample_data(
+    use_new_data: bool = False, synthetic: SyntheticData | None = None
+) -> Generator[dict, None, None]:
     # --8<-- [end:resource_decorator]
     my_data = [
         {
@@ -77,8 +94,10 @@ def sample_data(use_new_data: bool = False) -> Generator[dict, None, None]:
             },
         ]
         # --8<-- [end:new_data]
-    for item in my_data:
-        yield item
+    records = synthetic.records(use_new_data) if synthetic else my_data
+    for item in records:
+        # hash every field but the primary key and the ingestion time and script in `metadata`
+        yield add_row_hash(item)
 
 
 # --8<-- [end:resource]
@@ -95,12 +114,8 @@ def sample_source():
 
 # --8<-- [start:parse_args]
 def parse_args():
-    parser = argparse.ArgumentParser(description="Sample DLT Pipeline with Append")
-    parser.add_argument(
-        "--refresh",
-        action="store_true",
-        help="Refresh the data in the destination (if applicable)",
-    )
+    parser = pipeline_parser("Sample DLT Pipeline with Append")
+    add_fingerprint_arguments(parser)
 
     return parser.parse_args()
 
@@ -108,11 +123,13 @@ def parse_args():
 if __name__ == "__main__":
     args = parse_args()
     should_refresh = args.refresh
+    synthetic = SyntheticData.from_args(args)
     pipeline = dlt.pipeline(
         pipeline_name="sample_pipeline_postgres",
-        destination=dlt.destinations.postgres,
+        destination=args.destination,
         dataset_name="sample_data",
     )
+    apply_tuning(pipeline.pipeline_name, args)
     print("Running pipeline...")
     refresh_mode: TRefreshMode = "drop_sources"
 
@@ -120,13 +137,18 @@ if __name__ == "__main__":
         print("Refreshing data in the destination.")
 
     # --8<-- [start:pipeline_run]
-    load_info = pipeline.run(
-        sample_data,
+    load_info = run_if_changed(
+        pipeline,
+        sample_data(synthetic=synthetic),
+        Fingerprint.from_args(args),
         refresh=refresh_mode if should_refresh else None,
         table_name="samples",
     )
     # --8<-- [end:pipeline_run]
     # --8<-- [end:parse_args]
+    # index the current rows, so the next merge does not scan the whole history
+    if not isinstance(load_info, Unchanged):
+        create_scd2_indexes(pipeline, "samples")
 
     print(load_info)
     print("Done")
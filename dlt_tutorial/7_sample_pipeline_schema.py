@@ -1,5 +1,5 @@
-import argparse
 import datetime as dt
+import itertools
 import logging
 from pathlib import Path
 
@@ -7,6 +7,11 @@ import dlt
 from dlt.pipeline import TRefreshMode
 from dlt.common.typing import TDataItems
 
+from utils.cli import pipeline_parser
+from utils.data_generator import SyntheticData
+from utils.flatten import FLATTEN_MODES, flatten_nested
+from utils.tuning import apply_tuning
+
 # Create a logger
 logger = logging.getLogger("dlt")
 
@@ -49,7 +54,9 @@ logger.setLevel(logging.INFO)
         "data_type": "evolve",
     },
 )
-def sample_data() -> TDataItems:
+def sample_data(
+    synthetic: SyntheticData | None = None, batch_size: int = 0
+) -> TDataItems:
     # --8<-- [end:resource_decorator]
     # --8<-- [start:my_data]
     my_data = [
@@ -78,8 +85,13 @@ def sample_data() -> TDataItems:
     ]
     # --8<-- [end:my_data]
 
-    for item in my_data:
-        yield item
+    records = synthetic.records() if synthetic else my_data
+    if not batch_size or (synthetic and synthetic.arrow_page_size):
+        yield from records
+        return
+    # pages of rows, to convert them at once with `with_frozen_schema`
+    for page in itertools.batched(records, batch_size):
+        yield list(page)
 
 
 # --8<-- [end:resource]
@@ -87,11 +99,28 @@ def sample_data() -> TDataItems:
 
 # --8<-- [start:parse_args]
 def parse_args():
-    parser = argparse.ArgumentParser(description="Sample DLT Pipeline with Append")
+    parser = pipeline_parser("Sample DLT Pipeline with Append")
     parser.add_argument(
-        "--refresh",
+        "--frozen-schema",
         action="store_true",
-        help="Refresh the data in the destination (if applicable)",
+        help="Convert the rows to the reviewed schema in schemas/samples.schema.yaml",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Rows per page converted with --frozen-schema (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--flatten",
+        choices=FLATTEN_MODES,
+        help="Fold nested dicts into prefixed columns or a JSON column while extracting",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Nesting levels folded by --flatten prefix, the rest is stored as JSON",
     )
 
     return parser.parse_args()
@@ -100,20 +129,36 @@ def parse_args():
 if __name__ == "__main__":
     args = parse_args()
     should_refresh = args.refresh
+    synthetic = SyntheticData.from_args(args)
     pipeline = dlt.pipeline(
         pipeline_name="sample_pipeline_postgres",
-        destination=dlt.destinations.postgres,
+        destination=args.destination,
         dataset_name="sample_data",
     )
+    apply_tuning(pipeline.pipeline_name, args)
     print("Running pipeline...")
     refresh_mode: TRefreshMode = "drop_sources"
 
     if should_refresh:
         print("Refreshing data in the destination.")
 
+    data = sample_data(synthetic=synthetic)
+    if args.frozen_schema:
+        # imports pyarrow, so only when it is used
+        from utils.frozen_schema import load_plan, with_frozen_schema
+
+        # pages of rows become arrow tables, which skip type inference in normalize
+        data = with_frozen_schema(
+            sample_data(synthetic=synthetic, batch_size=args.batch_size),
+            load_plan("samples"),
+        )
+    if args.flatten:
+        # one table and no child tables, whatever the nesting of the rows
+        data = flatten_nested(data, args.flatten, args.max_depth)
+
     # --8<-- [start:pipeline_run]
     load_info = pipeline.run(
-        sample_data,
+        data,
         refresh=refresh_mode if should_refresh else None,
         table_name="samples",
     )
@@ -1,5 +1,5 @@
-import argparse
 import datetime as dt
+import itertools
 import string
 from typing import Generator
 from uuid import UUID, uuid4
@@ -10,6 +10,11 @@ from dlt.common.typing import TDataItems
 from pydantic import BaseModel
 from pathlib import Path
 
+from utils.cli import pipeline_parser
+from utils.data_generator import SyntheticData
+from utils.tuning import apply_tuning
+from utils.validation import validate_in_batches
+
 
 # --8<-- [start:pydantic_models]
 class SampleDataMetadataModel(BaseModel):
@@ -44,7 +49,9 @@ class SampleDataModel(BaseModel):
         "data_type": "freeze",
     },
 )
-def sample_data() -> TDataItems:
+def sample_data(
+    synthetic: SyntheticData | None = None, batch_size: int = 0
+) -> TDataItems:
     # --8<-- [end:resource_decorator]
     my_data = [
         {
@@ -71,8 +78,14 @@ def sample_data() -> TDataItems:
         },
     ]
 
-    for item in my_data:
-        yield item
+    # the model declares `metadata` as a single nested field, keep it nested in arrow pages too
+    records = synthetic.records(metadata_as_struct=True) if synthetic else my_data
+    if not batch_size or (synthetic and synthetic.arrow_page_size):
+        yield from records
+        return
+    # pages of rows, to validate them at once with `batch_validator`
+    for page in itertools.batched(records, batch_size):
+        yield list(page)
 
 
 # --8<-- [end:resource]
@@ -80,11 +93,18 @@ def sample_data() -> TDataItems:
 
 # --8<-- [start:parse_args]
 def parse_args():
-    parser = argparse.ArgumentParser(description="Sample DLT Pipeline with Append")
+    parser = pipeline_parser("Sample DLT Pipeline with Append")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="Validate pages of this many rows at once instead of one model per row",
+    )
     parser.add_argument(
-        "--refresh",
-        action="store_true",
-        help="Refresh the data in the destination (if applicable)",
+        "--trusted-sample",
+        type=int,
+        default=0,
+        help="With --batch-size, validate only this many rows of each page",
     )
 
     return parser.parse_args()
@@ -93,20 +113,27 @@ def parse_args():
 if __name__ == "__main__":
     args = parse_args()
     should_refresh = args.refresh
+    synthetic = SyntheticData.from_args(args)
     pipeline = dlt.pipeline(
         pipeline_name="sample_pipeline_postgres",
-        destination=dlt.destinations.postgres,
+        destination=args.destination,
         dataset_name="sample_data",
     )
+    apply_tuning(pipeline.pipeline_name, args)
     print("Running pipeline...")
     refresh_mode: TRefreshMode = "drop_sources"
 
     if should_refresh:
         print("Refreshing data in the destination.")
 
+    data = sample_data(synthetic=synthetic, batch_size=args.batch_size)
+    if args.batch_size:
+        # validate whole pages with one call instead of one model per row
+        data = validate_in_batches(data, SampleDataModel, "freeze", args.trusted_sample)
+
     # --8<-- [start:pipeline_run]
     load_info = pipeline.run(
-        sample_data,
+        data,
         refresh=refresh_mode if should_refresh else None,
         table_name="samples",
     )
@@ -0,0 +1,12 @@
+"""``python -m dlt_tutorial``, see ``utils/runner.py``"""
+
+import sys
+from pathlib import Path
+
+# the scripts import the helpers as ``utils``, like when they are executed directly
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.runner import main
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,60 @@
 import argparse
-import string
 from typing import Generator
-from uuid import uuid4
 
 import dlt
+from dlt.common.typing import TDataItems
 from dlt.pipeline import TRefreshMode
 
+from common import sample_data
+from utils.parallel import EXECUTORS, parallel_resource
+from utils.transforms import add_transformed_field
 
-@dlt.resource(
-    primary_key="id",
-)
-def sample_data() -> Generator[dict, None, None]:
-    for x in range(2):
-        yield {
-            "id": x,
-            "name": "Mr. " + string.ascii_letters[x],
-            "random_field": uuid4(),
-        }
 
-
-@dlt.transformer(data_from=sample_data)
-def transform_data(record: dict) -> Generator[dict, None, None]:
+def transform_record(record: dict) -> dict:
     record["my_transformed_field"] = (
         record["name"].lower().replace(".", "_").replace(" ", "_")
     )
-    yield record
+    return record
+
+
+@dlt.transformer(data_from=sample_data)
+def transform_data(record: dict) -> Generator[dict, None, None]:
+    yield transform_record(record)
+
+
+@dlt.transformer(name="transform_data")
+def transform_pages(items: TDataItems) -> Generator[TDataItems, None, None]:
+    # whole pages are transformed at once with pyarrow.compute
+    yield add_transformed_field(items)
 
 
 @dlt.source
-def sample_source(my_custom_parameter: str = "foo"):
+def sample_source(
+    my_custom_parameter: str = "foo",
+    rows: int = 2,
+    page_size: int = 0,
+    workers: int = 0,
+    executor: str = "process",
+    batch_size: int = 1000,
+    ordered: bool = True,
+):
     print(f"Custom parameter value: {my_custom_parameter}")
-    yield transform_data
+    data = sample_data(rows=rows, page_size=page_size)
+    if page_size:
+        yield data | transform_pages
+    elif workers:
+        # records are sent in batches to a pool of processes (or threads)
+        yield parallel_resource(
+            transform_record,
+            data,
+            name="transform_data",
+            workers=workers,
+            executor=executor,
+            batch_size=batch_size,
+            ordered=ordered,
+        )
+    else:
+        yield data | transform_data
 
 
 def parse_args():
@@ -40,6 +64,42 @@ def parse_args():
         action="store_true",
         help="Refresh the data in the destination (if applicable)",
     )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=2,
+        help="Number of rows to generate (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=0,
+        help="Yield pyarrow tables of this many rows and transform them in bulk "
+        "(default: one dict per row)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Transform the records on this many workers (default: inline)",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=EXECUTORS,
+        default="process",
+        help="Run the workers as processes or threads (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Records sent to a worker at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Yield batches as soon as they are done instead of in input order",
+    )
     return parser.parse_args()
 
 
@@ -54,7 +114,14 @@ if __name__ == "__main__":
 
     refresh_mode: TRefreshMode = "drop_sources"
     load_info = pipeline.run(
-        sample_source,
+        sample_source(
+            rows=args.rows,
+            page_size=args.page_size,
+            workers=args.workers,
+            executor=args.executor,
+            batch_size=args.batch_size,
+            ordered=not args.unordered,
+        ),
         table_name="samples",
         refresh=refresh_mode if should_refresh else None,
         write_disposition={
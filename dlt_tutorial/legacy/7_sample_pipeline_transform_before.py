@@ -10,11 +10,11 @@ from dlt.pipeline import TRefreshMode
 @dlt.resource(
     primary_key="id",
 )
-def sample_data() -> Generator[dict, None, None]:
-    for x in range(2):
+def sample_data(rows: int = 2) -> Generator[dict, None, None]:
+    for x in range(rows):
         yield {
             "id": x,
-            "name": "Mr. " + string.ascii_letters[x],
+            "name": "Mr. " + string.ascii_letters[x % len(string.ascii_letters)],
             "random_field": uuid4(),
         }
 
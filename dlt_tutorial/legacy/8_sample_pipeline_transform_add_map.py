@@ -1,22 +1,10 @@
 import argparse
-import string
-from typing import Generator
-from uuid import uuid4
 
 import dlt
 from dlt.pipeline import TRefreshMode
 
-
-@dlt.resource(
-    primary_key="id",
-)
-def sample_data() -> Generator[dict, None, None]:
-    for x in range(2):
-        yield {
-            "id": x,
-            "name": "Mr. " + string.ascii_letters[x],
-            "random_field": uuid4(),
-        }
+from common import sample_data
+from utils.transforms import add_transformed_field
 
 
 def transform_data(record: dict) -> dict:
@@ -27,9 +15,14 @@ def transform_data(record: dict) -> dict:
 
 
 @dlt.source
-def sample_source(my_custom_parameter: str = "foo"):
+def sample_source(my_custom_parameter: str = "foo", rows: int = 2, page_size: int = 0):
     print(f"Custom parameter value: {my_custom_parameter}")
-    yield sample_data.add_map(transform_data)
+    data = sample_data(rows=rows, page_size=page_size)
+    if page_size:
+        # whole pages are transformed at once with pyarrow.compute
+        yield data.add_map(add_transformed_field)
+    else:
+        yield data.add_map(transform_data)
 
 
 def parse_args():
@@ -39,6 +32,19 @@ def parse_args():
         action="store_true",
         help="Refresh the data in the destination (if applicable)",
     )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=2,
+        help="Number of rows to generate (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=0,
+        help="Yield pyarrow tables of this many rows and transform them in bulk "
+        "(default: one dict per row)",
+    )
     return parser.parse_args()
 
 
@@ -53,7 +59,7 @@ if __name__ == "__main__":
 
     refresh_mode: TRefreshMode = "drop_sources"
     load_info = pipeline.run(
-        sample_source,
+        sample_source(rows=args.rows, page_size=args.page_size),
         table_name="samples",
         refresh=refresh_mode if should_refresh else None,
         write_disposition={
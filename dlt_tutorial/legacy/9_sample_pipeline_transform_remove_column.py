@@ -1,22 +1,11 @@
 import argparse
-import string
-from typing import Generator
-from uuid import uuid4
 
 import dlt
 from dlt.pipeline import TRefreshMode
 
-
-@dlt.resource(
-    primary_key="id",
-)
-def sample_data() -> Generator[dict, None, None]:
-    for x in range(2):
-        yield {
-            "id": x,
-            "name": "Mr. " + string.ascii_letters[x],
-            "random_field": uuid4(),
-        }
+from common import sample_data
+from utils.map_fusion import AddColumn, Drop, fuse
+from utils.transforms import normalize_name, normalize_names
 
 
 def transform_data(record: dict) -> dict:
@@ -32,9 +21,29 @@ def remove_random_field(record: dict) -> dict:
 
 
 @dlt.source
-def sample_source(my_custom_parameter: str = "foo"):
+def sample_source(
+    my_custom_parameter: str = "foo",
+    rows: int = 2,
+    page_size: int = 0,
+    fused: bool = False,
+):
     print(f"Custom parameter value: {my_custom_parameter}")
-    yield sample_data.add_map(transform_data).add_map(remove_random_field)
+    data = sample_data(rows=rows, page_size=page_size)
+    if fused or page_size:
+        # both maps in a single pass, with random_field dropped before the transformation
+        yield data.add_map(
+            fuse(
+                AddColumn(
+                    "my_transformed_field",
+                    normalize_name,
+                    source="name",
+                    vectorized=normalize_names,
+                ),
+                Drop("random_field"),
+            )
+        )
+    else:
+        yield data.add_map(transform_data).add_map(remove_random_field)
 
 
 def parse_args():
@@ -44,6 +53,24 @@ def parse_args():
         action="store_true",
         help="Refresh the data in the destination (if applicable)",
     )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=2,
+        help="Number of rows to generate (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=0,
+        help="Yield pyarrow tables of this many rows and transform them in bulk "
+        "(default: one dict per row)",
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="Run both maps as a single step (always the case with --page-size)",
+    )
     return parser.parse_args()
 
 
@@ -58,7 +85,7 @@ if __name__ == "__main__":
 
     refresh_mode: TRefreshMode = "drop_sources"
     load_info = pipeline.run(
-        sample_source,
+        sample_source(rows=args.rows, page_size=args.page_size, fused=args.fused),
         table_name="samples",
         refresh=refresh_mode if should_refresh else None,
         write_disposition={
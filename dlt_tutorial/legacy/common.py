@@ -0,0 +1,49 @@
+"""Shared parts of the legacy transform scripts (8, 9 and 10).
+
+The legacy scripts run from this folder (``python dlt_tutorial/legacy/<script>.py``), so only this
+folder is on ``sys.path``. Importing this module first also makes the shared ``utils`` package
+importable, as for the numbered scripts one folder up.
+"""
+
+import string
+import sys
+from pathlib import Path
+from typing import Generator
+from uuid import uuid4
+
+import dlt
+import pyarrow as pa
+
+TUTORIAL_DIR = str(Path(__file__).resolve().parents[1])
+if TUTORIAL_DIR not in sys.path:
+    sys.path.insert(0, TUTORIAL_DIR)
+
+
+@dlt.resource(
+    primary_key="id",
+)
+def sample_data(
+    rows: int = 2, page_size: int = 0
+) -> Generator[dict | pa.Table, None, None]:
+    if page_size:
+        # the same rows, as pyarrow tables of `page_size` rows each
+        for start in range(0, rows, page_size):
+            ids = range(start, min(start + page_size, rows))
+            yield pa.table(
+                {
+                    "id": pa.array(ids, pa.int64()),
+                    "name": [
+                        "Mr. " + string.ascii_letters[x % len(string.ascii_letters)]
+                        for x in ids
+                    ],
+                    "random_field": [str(uuid4()) for _ in ids],
+                }
+            )
+        return
+
+    for x in range(rows):
+        yield {
+            "id": x,
+            "name": "Mr. " + string.ascii_letters[x % len(string.ascii_letters)],
+            "random_field": uuid4(),
+        }
@@ -0,0 +1,5 @@
+"""Shared helpers for the tutorial pipelines.
+
+The numbered scripts are executed directly (``python dlt_tutorial/<script>.py``), which puts
+``dlt_tutorial/`` on ``sys.path``; this package is therefore imported as ``utils``.
+"""
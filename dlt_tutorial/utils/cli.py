@@ -0,0 +1,38 @@
+"""The command line of the pipeline scripts (4 to 8), shared instead of repeated in each of them.
+
+``pipeline_parser`` returns a parser with ``--refresh``, ``--destination`` and the synthetic data
+and tuning options; a script adds its own options to it and calls ``parse_args``. The default of
+``--destination`` is the destination of the script, unless the ``DLT_TUTORIAL_DESTINATION``
+environment variable sets another one, which is how ``python -m dlt_tutorial run --destination``
+selects it.
+"""
+
+import argparse
+import os
+
+from utils.data_generator import add_synthetic_data_arguments
+from utils.tuning import add_tuning_arguments
+
+DESTINATIONS = ("duckdb", "postgres")
+DESTINATION_ENV = "DLT_TUTORIAL_DESTINATION"
+
+
+# --8<-- [start:pipeline_parser]
+def pipeline_parser(
+    description: str,
+    destination: str = "postgres",
+    refresh_help: str = "Refresh the data in the destination (if applicable)",
+) -> argparse.ArgumentParser:
+    """The parser of every pipeline script, which loads into ``destination`` by default"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--refresh", action="store_true", help=refresh_help)
+    parser.add_argument(
+        "--destination",
+        choices=DESTINATIONS,
+        default=os.environ.get(DESTINATION_ENV, destination),
+        help="Destination to load into (default: %(default)s)",
+    )
+    add_synthetic_data_arguments(parser)
+    add_tuning_arguments(parser)
+    return parser
+    # --8<-- [end:pipeline_parser]
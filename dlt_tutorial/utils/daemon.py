@@ -0,0 +1,160 @@
+"""Resident mode for the tutorial scripts: one process, one pipeline, many runs.
+
+    python -m dlt_tutorial serve 4 --interval 60 -- --rows 100000
+    python -m dlt_tutorial serve 4 --socket /tmp/dlt_tutorial.sock
+    python -m dlt_tutorial trigger /tmp/dlt_tutorial.sock
+
+Every new process imports dlt again, restores the pipeline from its working directory, reads its
+schemas and opens new connections before loading anything. ``serve`` does that once and then runs
+the ``__main__`` block of the script every time it is triggered: on an ``--interval`` of seconds,
+on every connection to a Unix ``--socket`` (``trigger`` connects and prints the latency of the
+run), or whenever a ``--watch`` file is touched.
+
+``keep_pipelines`` makes ``dlt.pipeline`` return the pipeline it created the first time for the
+same name, so its state and schemas stay in memory. duckdb destinations get a connection to the
+database dlt resolves from its config, opened once and borrowed by dlt on every run. Postgres
+connections are not pooled: the postgres destination of dlt takes credentials rather than a
+connection, so it still opens one for every load.
+
+The latency of each run is printed, with the median of the steady state, the runs after the first
+one, and a summary when the daemon stops.
+"""
+
+import functools
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from utils.scripts import run_script
+
+
+def keep_pipelines() -> dict[str, Any]:
+    """Makes ``dlt.pipeline`` create each pipeline once and return it from then on"""
+    import dlt
+
+    create = dlt.pipeline
+    pipelines: dict[str, Any] = {}
+
+    @functools.wraps(create)
+    def resident_pipeline(pipeline_name: str | None = None, **kwargs: Any) -> Any:
+        if pipeline_name in pipelines:
+            return pipelines[pipeline_name]
+        # the destination may also come from the config, or be given later to ``run``
+        pipeline = create(pipeline_name, **kwargs)
+        if pipeline.destination and pipeline.destination.destination_name == "duckdb":
+            import duckdb
+
+            credentials = pipeline.destination_client().config.credentials
+            # dlt does not close a connection it was given, so every run reuses it
+            connection = duckdb.connect(credentials.database)
+            kwargs["destination"] = dlt.destinations.duckdb(connection)
+            pipeline = create(pipeline_name, **kwargs)
+        pipelines[pipeline_name] = pipeline
+        return pipeline
+
+    dlt.pipeline = resident_pipeline
+    return pipelines
+
+
+def every(interval: float) -> Iterator[None]:
+    """Triggers every ``interval`` seconds, counted from the start of the previous run"""
+    while True:
+        started = time.monotonic()
+        yield
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+def on_change(path: Path, poll: float = 0.5) -> Iterator[None]:
+    """Triggers once at start and then whenever the modification time of ``path`` changes"""
+    path.touch()
+    seen = None
+    while True:
+        mtime = path.stat().st_mtime_ns
+        if mtime != seen:
+            seen = mtime
+            yield
+        else:
+            time.sleep(poll)
+
+
+def on_connection(path: Path) -> Iterator[socket.socket]:
+    """Triggers on every connection to the Unix socket ``path``, yielding the connection"""
+    path.unlink(missing_ok=True)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+        try:
+            while True:
+                connection, _ = server.accept()
+                with connection:
+                    yield connection
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def trigger(path: Path) -> str:
+    """Triggers a run of the daemon listening on ``path`` and waits for its result"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(path))
+        return client.makefile().readline().strip()
+
+
+def serve(
+    script: Path,
+    argv: list[str],
+    triggers: Iterator[Any],
+    runs: int = 0,
+    metrics: bool = False,
+) -> list[float]:
+    """Runs ``script`` as ``__main__`` on every trigger and returns the latency of each run"""
+    keep_pipelines()
+    latencies: list[float] = []
+    try:
+        for triggered in triggers:
+            started = time.perf_counter()
+            try:
+                run_script(script, argv, metrics)
+                result = "ok"
+            except Exception as ex:
+                # a failed run is reported, the next trigger runs it again
+                result = f"failed: {ex}"
+            latencies.append(time.perf_counter() - started)
+            summary = f"run {len(latencies)} {result} in {latencies[-1]:.3f}s"
+            if len(latencies) > 1:
+                summary += (
+                    f", steady state median {statistics.median(latencies[1:]):.3f}s"
+                )
+            print(summary, file=sys.stderr, flush=True)
+            if isinstance(triggered, socket.socket):
+                triggered.sendall(f"{summary}\n".encode())
+            if runs and len(latencies) >= runs:
+                break
+    except KeyboardInterrupt:
+        pass
+    print_latencies(latencies)
+    return latencies
+
+
+def print_latencies(latencies: list[float]) -> None:
+    if not latencies:
+        return
+    print(f"first run: {latencies[0]:.3f}s", file=sys.stderr)
+    steady = sorted(latencies[1:])
+    if steady:
+        p95 = steady[min(len(steady) - 1, int(len(steady) * 0.95))]
+        print(
+            f"steady state ({len(steady)} runs): min {steady[0]:.3f}s, "
+            f"median {statistics.median(steady):.3f}s, p95 {p95:.3f}s",
+            file=sys.stderr,
+        )
+
+
+def triggers_from_args(args: Any) -> Iterator[Any]:
+    if args.socket:
+        return on_connection(Path(args.socket))
+    if args.watch:
+        return on_change(Path(args.watch))
+    return every(args.interval)
@@ -0,0 +1,495 @@
+"""Seeded, streaming generator of synthetic ``sample_data`` records.
+
+Records have the same shape as the hardcoded Mario/Luigi examples (``id``, ``name``, ``uuid``,
+``created_at``, ``updated_at`` and a nested ``metadata`` dict), but any number of them can be
+produced. Every value is derived from ``(seed, id)``, so nothing is kept in memory between rows
+and the same ``id`` always gets the same ``uuid`` and ``created_at`` across runs.
+
+``use_new_data`` plays the same role as in the tutorial scripts: instead of the base rows, it
+yields a change set made of updated base rows (``update_ratio``) and brand new rows
+(``insert_ratio``), the way "Jumpman" and "Ms. Peach" replace Mario and Luigi.
+
+With ``arrow_page_size`` the same records are yielded as pyarrow tables, built column by column
+with numpy, so dlt can take its Arrow fast path and write parquet without normalizing every row.
+The nested ``metadata`` dict becomes the ``metadata__ingested_at`` and ``metadata__script_name``
+columns, which is how dlt flattens it in the dict path, or a struct column on request.
+"""
+
+import argparse
+import bisect
+import calendar
+import datetime as dt
+import functools
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Generator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+NAMES = (
+    "Mr. Mario",
+    "Mr. Luigi",
+    "Ms. Peach",
+    "Ms. Daisy",
+    "Mr. Toad",
+    "Mr. Yoshi",
+    "Mr. Bowser",
+    "Mr. Wario",
+    "Mr. Waluigi",
+    "Mr. Donkey Kong",
+)
+UPDATED_NAMES = (
+    "Jumpman",
+    "Mr. Green",
+    "Princess Peach",
+    "Princess Daisy",
+    "Captain Toad",
+    "T. Yoshisaur",
+    "King Koopa",
+    "Mr. Wario Ware",
+    "Mr. Waluigi Time",
+    "Mr. DK",
+)
+
+# first record is created at 2025-10-01 00:00:00 UTC, one new record per minute after that
+START_TIMESTAMP = int(dt.datetime(2025, 10, 1, tzinfo=dt.timezone.utc).timestamp())
+SECONDS_PER_ROW = 60
+# records are updated within the hour after they are created. The records inserted by a "new
+# data" run are created after the last update of the base ones and the updates happen a day
+# after that, so an `updated_at` cursor on the base rows sees all of the changes
+MAX_UPDATE_SECONDS = 3600
+UPDATE_DELAY_SECONDS = 24 * 60 * 60
+
+_MASK_64 = (1 << 64) - 1
+_UPDATE_SALT = 0x5DEECE66D
+# positions of the 32 hex digits in the 36 characters of a formatted uuid
+_UUID_DIGIT_POSITIONS = [i for i in range(36) if i not in (8, 13, 18, 23)]
+
+
+def _mix(seed: int, value: int) -> int:
+    """splitmix64 finalizer: a cheap, well distributed 64 bit hash of ``(seed, value)``"""
+    z = (seed * 0x9E3779B97F4A7C15 + value) & _MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return z ^ (z >> 31)
+
+
+def _mix_array(seed: "int | np.ndarray", values: "np.ndarray") -> "np.ndarray":
+    """`_mix` over numpy uint64 arrays, relying on wrap around instead of masking"""
+    import numpy as np
+
+    if isinstance(seed, int):
+        z = np.uint64((seed * 0x9E3779B97F4A7C15) & _MASK_64) + values
+    else:
+        z = seed * np.uint64(0x9E3779B97F4A7C15) + values
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _format_uuid(high: int, low: int) -> str:
+    """Formats a version 4 uuid, same as `str(uuid.UUID(int=high << 64 | low, version=4))`"""
+    high = (high & ~0xF000) | 0x4000
+    low = (low & 0x3FFFFFFFFFFFFFFF) | 0x8000000000000000
+    return (
+        f"{high >> 32:08x}-{(high >> 16) & 0xFFFF:04x}-{high & 0xFFFF:04x}"
+        f"-{low >> 48:04x}-{low & 0xFFFFFFFFFFFF:012x}"
+    )
+
+
+def _format_uuid_array(high: "np.ndarray", low: "np.ndarray") -> Any:
+    """`_format_uuid` over numpy uint64 arrays, returning a pyarrow string array"""
+    import numpy as np
+    import pyarrow as pa
+
+    high = (high & ~np.uint64(0xF000)) | np.uint64(0x4000)
+    low = (low & np.uint64(0x3FFFFFFFFFFFFFFF)) | np.uint64(0x8000000000000000)
+    hex_digits = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+    raw = np.stack([high, low], axis=1).astype(">u8").view(np.uint8).reshape(-1, 16)
+    digits = np.empty((len(raw), 32), dtype=np.uint8)
+    digits[:, 0::2] = hex_digits[raw >> 4]
+    digits[:, 1::2] = hex_digits[raw & 0x0F]
+    chars = np.full((len(raw), 36), ord("-"), dtype=np.uint8)
+    chars[:, _UUID_DIGIT_POSITIONS] = digits
+    fixed = pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(36), len(raw), [None, pa.py_buffer(chars.tobytes())]
+    )
+    return fixed.cast(pa.binary()).cast(pa.string())
+
+
+def _format_timestamp(timestamp: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+
+
+def _parse_timestamp(value: Any) -> int:
+    """Seconds since the epoch of an ``updated_at`` value, as a string or a datetime"""
+    if isinstance(value, str):
+        return calendar.timegm(time.strptime(value, "%Y-%m-%d %H:%M:%S"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return int(value.timestamp())
+
+
+@dataclass(frozen=True)
+class SyntheticData:
+    """Describes a synthetic data set: its size, its seed and how a "new data" run changes it."""
+
+    rows: int
+    seed: int = 42
+    update_ratio: float = 0.1
+    insert_ratio: float = 0.1
+    arrow_page_size: int = 0
+    # ``updated_at_index`` by ``use_new_data``, kept on the instance so it is freed with it
+    _indexes: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if self.rows < 0:
+            raise ValueError(f"rows must be a positive number, got {self.rows}")
+        if self.arrow_page_size < 0:
+            raise ValueError(
+                f"arrow_page_size must be a positive number, got {self.arrow_page_size}"
+            )
+        for ratio_name in ("update_ratio", "insert_ratio"):
+            ratio = getattr(self, ratio_name)
+            if not 0.0 <= ratio <= 1.0:
+                raise ValueError(f"{ratio_name} must be between 0 and 1, got {ratio}")
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "SyntheticData | None":
+        """Returns the data set requested on the command line or None if `--rows` was not passed"""
+        if not args.rows:
+            return None
+        return cls(
+            rows=args.rows,
+            seed=args.seed,
+            update_ratio=args.update_ratio,
+            insert_ratio=args.insert_ratio,
+            arrow_page_size=args.arrow_page_size,
+        )
+
+    @property
+    def inserted_rows(self) -> int:
+        return round(self.rows * self.insert_ratio)
+
+    @property
+    def updates_start(self) -> int:
+        """Timestamp after which the updates of a "new data" run happen"""
+        last_id = self.last_id(use_new_data=True)
+        return (
+            START_TIMESTAMP
+            + last_id * SECONDS_PER_ROW
+            + 2 * MAX_UPDATE_SECONDS
+            + UPDATE_DELAY_SECONDS
+        )
+
+    def last_id(self, use_new_data: bool = False) -> int:
+        return self.rows + (self.inserted_rows if use_new_data else 0)
+
+    def created_at(self, id_: int) -> int:
+        """Timestamp at which `id_` is created, which grows with the id"""
+        created_at = START_TIMESTAMP + id_ * SECONDS_PER_ROW
+        if id_ > self.rows:
+            created_at += MAX_UPDATE_SECONDS
+        return created_at
+
+    def record(self, id_: int, updated: bool = False) -> dict:
+        """Builds the record for `id_`, optionally in its updated version"""
+        h = _mix(self.seed, id_)
+        created_at = self.created_at(id_)
+        if updated:
+            name = UPDATED_NAMES[h % len(UPDATED_NAMES)]
+            updated_at = self.updates_start + (h >> 16) % MAX_UPDATE_SECONDS
+        else:
+            name = NAMES[h % len(NAMES)]
+            updated_at = created_at + (h >> 16) % MAX_UPDATE_SECONDS
+        return {
+            "id": id_,
+            "name": name,
+            "uuid": _format_uuid(_mix(h, id_), h),
+            "created_at": _format_timestamp(created_at),
+            "updated_at": _format_timestamp(updated_at),
+        }
+
+    def records(
+        self,
+        use_new_data: bool = False,
+        metadata_as_struct: bool = False,
+        ids: range | None = None,
+    ) -> Generator[Any, None, None]:
+        """Yields the base rows or, with `use_new_data`, the updated and inserted rows.
+
+        Rows are dicts or, if `arrow_page_size` is set, pyarrow tables of that many rows. Memory
+        use does not depend on `rows`: records are built one at a time (or page) from their id.
+        `metadata_as_struct` only applies to pyarrow tables, see `arrow_pages`. `ids` limits
+        the rows to the ones whose id is in that range.
+        """
+        if self.arrow_page_size:
+            yield from self.arrow_pages(use_new_data, metadata_as_struct, ids)
+            return
+
+        metadata = self._metadata()
+        base_ids, inserted_ids = self._id_ranges(ids)
+
+        if not use_new_data:
+            for id_ in base_ids:
+                yield {**self.record(id_), "metadata": dict(metadata)}
+            return
+
+        # select updated ids by hashing instead of sampling so no set of ids is ever held
+        threshold = int(self.update_ratio * _MASK_64)
+        for id_ in base_ids:
+            if _mix(self.seed ^ _UPDATE_SALT, id_) < threshold:
+                yield {**self.record(id_, updated=True), "metadata": dict(metadata)}
+
+        for id_ in inserted_ids:
+            yield {**self.record(id_), "metadata": dict(metadata)}
+
+    def records_between(
+        self, start: Any, end: Any, use_new_data: bool = False
+    ) -> Generator[Any, None, None]:
+        """The `records` whose id (integers) or `created_at` (datetimes) is in `start..end`.
+
+        `end` is excluded. Both keys grow together, so a range of `created_at` is found as a
+        range of ids with a binary search.
+        """
+        if isinstance(start, int):
+            ids = range(start, end)
+        else:
+            # ids whose created_at is not lower than the bound, up to the last one plus one
+            candidates = range(1, self.last_id(use_new_data=True) + 2)
+            ids = range(
+                bisect.bisect_left(
+                    candidates, _parse_timestamp(start), key=self.created_at
+                )
+                + 1,
+                bisect.bisect_left(
+                    candidates, _parse_timestamp(end), key=self.created_at
+                )
+                + 1,
+            )
+        yield from self.records(use_new_data, ids=ids)
+
+    def arrow_pages(
+        self,
+        use_new_data: bool = False,
+        metadata_as_struct: bool = False,
+        ids: range | None = None,
+    ) -> Generator[Any, None, None]:
+        """Yields the same records as `records` as pyarrow tables of `arrow_page_size` rows.
+
+        `metadata` is flattened into `metadata__*` columns, like dlt does with nested dicts,
+        unless `metadata_as_struct` is set for tables that declare it as a single json column.
+        """
+        import numpy as np
+
+        page_size = self.arrow_page_size or 100_000
+        make_page = self._page_maker(metadata_as_struct)
+        base_ids, inserted_ids = self._id_ranges(ids)
+
+        def pages(id_range: range) -> Generator["np.ndarray", None, None]:
+            for start in range(id_range.start, id_range.stop, page_size):
+                yield np.arange(
+                    start, min(start + page_size, id_range.stop), dtype=np.uint64
+                )
+
+        if not use_new_data:
+            for page_ids in pages(base_ids):
+                yield make_page(page_ids, updated=False)
+            return
+
+        threshold = np.uint64(int(self.update_ratio * _MASK_64))
+        for page_ids in pages(base_ids):
+            updated_ids = page_ids[
+                _mix_array(self.seed ^ _UPDATE_SALT, page_ids) < threshold
+            ]
+            if len(updated_ids):
+                yield make_page(updated_ids, updated=True)
+
+        for page_ids in pages(inserted_ids):
+            yield make_page(page_ids, updated=False)
+
+    def _id_ranges(self, ids: range | None) -> tuple[range, range]:
+        """The base and inserted ids, within `ids` if given"""
+        base_ids = range(1, self.rows + 1)
+        inserted_ids = range(self.rows + 1, self.last_id(use_new_data=True) + 1)
+        if ids is None:
+            return base_ids, inserted_ids
+        return (
+            range(max(ids.start, base_ids.start), min(ids.stop, base_ids.stop)),
+            range(max(ids.start, inserted_ids.start), min(ids.stop, inserted_ids.stop)),
+        )
+
+    def updated_at_index(
+        self, use_new_data: bool = False
+    ) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Ids, ``updated_at`` and "is updated" flags of the source table, by ``updated_at``.
+
+        Plays the role of an index on ``updated_at`` in a source database: it is built once,
+        with numpy, and then ``records_since`` only looks up the rows newer than a cursor. With
+        ``use_new_data`` the table holds the base rows, with the updated ones replaced, and the
+        inserted rows. Unlike ``records``, it takes memory proportional to the table (17 bytes
+        per row).
+        """
+        if use_new_data not in self._indexes:
+            self._indexes[use_new_data] = self._build_updated_at_index(use_new_data)
+        return self._indexes[use_new_data]
+
+    def _build_updated_at_index(
+        self, use_new_data: bool
+    ) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        import numpy as np
+
+        ids = np.arange(1, self.last_id(use_new_data) + 1, dtype=np.uint64)
+        updated = np.zeros(len(ids), dtype=bool)
+        if use_new_data:
+            threshold = np.uint64(int(self.update_ratio * _MASK_64))
+            base_ids = ids[: self.rows]
+            updated[: self.rows] = (
+                _mix_array(self.seed ^ _UPDATE_SALT, base_ids) < threshold
+            )
+        created_at, updated_at = self._timestamps(ids, updated=False)
+        updated_at = np.where(
+            updated, updated_at - created_at + self.updates_start, updated_at
+        )
+        order = np.argsort(updated_at, kind="stable")
+        return ids[order], updated_at[order], updated[order]
+
+    def records_since(
+        self,
+        since: Any = None,
+        use_new_data: bool = False,
+        metadata_as_struct: bool = False,
+    ) -> Generator[Any, None, None]:
+        """Yields the rows of the source table updated at or after ``since``.
+
+        ``since`` is the last value of an ``updated_at`` cursor, as a string or a datetime, or
+        None for the whole table. The first row is found with a binary search in
+        ``updated_at_index``, so the cost depends on the number of changed rows and not on the
+        size of the table. Rows come in ``updated_at`` order, as dicts or pyarrow pages.
+        """
+        import numpy as np
+
+        ids, updated_at, updated = self.updated_at_index(use_new_data)
+        if since is not None:
+            start = np.searchsorted(updated_at, _parse_timestamp(since), side="left")
+            ids, updated = ids[start:], updated[start:]
+
+        if self.arrow_page_size:
+            make_page = self._page_maker(metadata_as_struct)
+            for start in range(0, len(ids), self.arrow_page_size):
+                page_ids = ids[start : start + self.arrow_page_size]
+                page_updated = updated[start : start + self.arrow_page_size]
+                for is_updated in (False, True):
+                    selected = page_ids[page_updated == is_updated]
+                    if len(selected):
+                        yield make_page(selected, updated=is_updated)
+            return
+
+        metadata = self._metadata()
+        for id_, is_updated in zip(ids.tolist(), updated.tolist()):
+            yield {**self.record(id_, is_updated), "metadata": dict(metadata)}
+
+    def _metadata(self) -> dict:
+        return {
+            "ingested_at": dt.datetime.now().isoformat(),
+            "script_name": Path(sys.argv[0]).name,
+        }
+
+    def _page_maker(self, metadata_as_struct: bool) -> Callable[..., Any]:
+        return functools.partial(
+            self._arrow_page,
+            ingested_at=dt.datetime.now(dt.timezone.utc),
+            script_name=Path(sys.argv[0]).name,
+            metadata_as_struct=metadata_as_struct,
+        )
+
+    def _timestamps(
+        self, ids: "np.ndarray", updated: bool, h: "np.ndarray | None" = None
+    ) -> tuple["np.ndarray", "np.ndarray"]:
+        """``created_at`` and ``updated_at`` of ``ids``, like in ``record``"""
+        import numpy as np
+
+        if h is None:
+            h = _mix_array(self.seed, ids)
+        created_at = START_TIMESTAMP + ids.astype(np.int64) * SECONDS_PER_ROW
+        created_at[ids > self.rows] += MAX_UPDATE_SECONDS
+        jitter = ((h >> np.uint64(16)) % np.uint64(MAX_UPDATE_SECONDS)).astype(np.int64)
+        updated_at = (self.updates_start if updated else created_at) + jitter
+        return created_at, updated_at
+
+    def _arrow_page(
+        self,
+        ids: "np.ndarray",
+        updated: bool,
+        ingested_at: dt.datetime,
+        script_name: str,
+        metadata_as_struct: bool,
+    ) -> Any:
+        import numpy as np
+        import pyarrow as pa
+
+        h = _mix_array(self.seed, ids)
+        created_at, updated_at = self._timestamps(ids, updated, h)
+        names = np.array(UPDATED_NAMES if updated else NAMES)
+
+        timestamp = pa.timestamp("us", tz="UTC")
+        ingested_at_us = int(ingested_at.timestamp() * 1_000_000)
+        metadata = {
+            "ingested_at": pa.array(np.full(len(ids), ingested_at_us), timestamp),
+            "script_name": pa.array(np.full(len(ids), script_name), pa.string()),
+        }
+        columns = {
+            "id": pa.array(ids.astype(np.int64)),
+            "name": pa.array(names[(h % np.uint64(len(names))).astype(np.intp)]),
+            "uuid": _format_uuid_array(_mix_array(h, ids), h),
+            "created_at": pa.array(created_at * 1_000_000, timestamp),
+            "updated_at": pa.array(updated_at * 1_000_000, timestamp),
+        }
+        if metadata_as_struct:
+            columns["metadata"] = pa.StructArray.from_arrays(
+                list(metadata.values()), names=list(metadata)
+            )
+        else:
+            columns |= {f"metadata__{name}": array for name, array in metadata.items()}
+        return pa.table(columns)
+
+
+def add_synthetic_data_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options that replace the hardcoded records with a synthetic data set"""
+    group = parser.add_argument_group(
+        "synthetic data",
+        "Replace the hardcoded records with a seeded, generated data set",
+    )
+    group.add_argument(
+        "--rows",
+        type=int,
+        default=0,
+        help="Number of records to generate, e.g. 5_000_000 (default: use hardcoded records)",
+    )
+    group.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Seed of the generated data set (default: %(default)s)",
+    )
+    group.add_argument(
+        "--update-ratio",
+        type=float,
+        default=0.1,
+        help="Share of records updated when using new data (default: %(default)s)",
+    )
+    group.add_argument(
+        "--insert-ratio",
+        type=float,
+        default=0.1,
+        help="Records inserted when using new data, relative to --rows (default: %(default)s)",
+    )
+    group.add_argument(
+        "--arrow-page-size",
+        type=int,
+        default=0,
+        help="Yield pyarrow tables of this many rows instead of dicts (default: dicts)",
+    )
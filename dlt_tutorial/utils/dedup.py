@@ -0,0 +1,353 @@
+"""Drops rows whose primary key was already extracted by a previous run, before they are normalized.
+
+An append load with a ``primary_key`` still ships every row it is given to the destination, even
+if the same key was loaded the day before. ``DropSeenKeys`` keeps the keys it let through in the
+state of the resource and drops the rows whose key it has seen, in batches, with numpy:
+
+    records = DropSeenKeys("bloom", capacity=1_000_000).drop_seen(records, key="id")
+
+Two structures are available:
+
+- ``sorted``: a sorted array of the integer keys. Exact, 8 bytes per key in memory, and much less
+  in the state when keys are dense, since they are stored as compressed deltas.
+- ``bloom``: a Bloom filter sized for ``capacity`` keys with a false positive rate of
+  ``error_rate``, about 1.2 bytes per key at 1%. It never lets a seen key through, but drops a
+  share of new keys as if they were seen, and more of them once it holds more than ``capacity``.
+
+The structure is compressed into the state at the end of the extract, which dlt also stores in
+the destination and reads back on every run, so it is kept small: 8 MiB by default. A ``sorted``
+array that grows past ``max_state_mib`` is turned into a Bloom filter of the same keys; a Bloom
+filter whose size already exceeds it is refused.
+
+Only pipelines without a cursor need it: an incremental hint on the key already drops the rows
+whose key is not above the last one loaded, before the ones it keeps reach the destination.
+"""
+
+import argparse
+import base64
+import math
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+KINDS = ("sorted", "bloom")
+STATE_KEY = "seen_keys"
+
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def _encode(array: "np.ndarray") -> str:
+    return base64.b64encode(zlib.compress(array.tobytes(), 1)).decode()
+
+
+def _decode(data: str, dtype: Any) -> "np.ndarray":
+    import numpy as np
+
+    return np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=dtype).copy()
+
+
+def _in_sorted(sorted_keys: "np.ndarray", keys: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[positions] == keys
+
+
+def _merge(sorted_keys: "np.ndarray", keys: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    keys = np.sort(keys)
+    return np.insert(sorted_keys, np.searchsorted(sorted_keys, keys), keys)
+
+
+class SortedKeys:
+    """An exact set of integer keys, kept as a sorted array"""
+
+    kind = "sorted"
+
+    def __init__(self, keys: "np.ndarray | None" = None) -> None:
+        import numpy as np
+
+        self.keys = np.empty(0, dtype=np.int64) if keys is None else keys
+        # merging every batch into a large array would copy it every time, so new keys are
+        # merged into a smaller one first
+        self.recent = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.recent)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.recent.nbytes
+
+    def contains(self, keys: "np.ndarray") -> "np.ndarray":
+        return _in_sorted(self.keys, keys) | _in_sorted(self.recent, keys)
+
+    def add(self, keys: "np.ndarray") -> None:
+        """Adds ``keys``, which must not be in the set yet"""
+        self.recent = _merge(self.recent, keys)
+        if len(self.recent) > max(len(self.keys) // 16, 1 << 20):
+            self.flush()
+
+    def flush(self) -> None:
+        import numpy as np
+
+        self.keys = _merge(self.keys, self.recent)
+        self.recent = np.empty(0, dtype=np.int64)
+
+    def to_state(self) -> dict:
+        import numpy as np
+
+        self.flush()
+        # dense keys have small deltas, which compress to almost nothing
+        deltas = np.diff(self.keys, prepend=np.int64(0))
+        return {"kind": self.kind, "count": len(self), "keys": _encode(deltas)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "SortedKeys":
+        import numpy as np
+
+        return cls(np.cumsum(_decode(state["keys"], np.int64)))
+
+
+class BloomFilter:
+    """A set of integer keys that answers "maybe" for keys it has not seen, at ``error_rate``"""
+
+    kind = "bloom"
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        bits: "np.ndarray | None" = None,
+        count: int = 0,
+    ) -> None:
+        import numpy as np
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = (
+            np.zeros(-(-self.size // 8), dtype=np.uint8) if bits is None else bits
+        )
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    @property
+    def expected_error_rate(self) -> float:
+        """The false positive rate for the keys it holds now"""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def _positions(self, keys: "np.ndarray") -> "Iterator[np.ndarray]":
+        import numpy as np
+
+        # double hashing with two splitmix64 hashes of the key
+        with np.errstate(over="ignore"):
+            first = _splitmix64(keys.astype(np.uint64))
+            second = _splitmix64(first ^ np.uint64(_GOLDEN)) | np.uint64(1)
+            for i in range(self.hashes):
+                yield (first + np.uint64(i) * second) % np.uint64(self.size)
+
+    def contains(self, keys: "np.ndarray") -> "np.ndarray":
+        import numpy as np
+
+        found = np.ones(len(keys), dtype=bool)
+        for positions in self._positions(keys):
+            found &= (
+                self.bits[positions >> np.uint64(3)]
+                >> (positions & np.uint64(7)).astype(np.uint8)
+            ) & 1 == 1
+        return found
+
+    def add(self, keys: "np.ndarray") -> None:
+        import numpy as np
+
+        for positions in self._positions(keys):
+            np.bitwise_or.at(
+                self.bits,
+                positions >> np.uint64(3),
+                np.left_shift(1, positions & np.uint64(7)).astype(np.uint8),
+            )
+        self.count += len(keys)
+
+    def to_state(self) -> dict:
+        return {
+            "kind": self.kind,
+            "count": self.count,
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "bits": _encode(self.bits),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "BloomFilter":
+        import numpy as np
+
+        bits = _decode(state["bits"], np.uint8)
+        return cls(state["capacity"], state["error_rate"], bits, state["count"])
+
+
+def _splitmix64(x: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    x = x + np.uint64(_GOLDEN)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def state_size(state: dict) -> int:
+    """Bytes the structure takes in the pipeline state"""
+    return sum(len(value) for value in state.values() if isinstance(value, str))
+
+
+@dataclass(frozen=True)
+class DropSeenKeys:
+    """How to drop the rows whose key was extracted before"""
+
+    kind: str = "bloom"
+    capacity: int = 1_000_000
+    error_rate: float = 0.001
+    max_state_mib: float = 8.0
+    batch_size: int = 100_000
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "DropSeenKeys | None":
+        """Returns the options given on the command line or None if ``--dedup`` was not passed"""
+        if not args.dedup:
+            return None
+        return cls(
+            kind=args.dedup,
+            capacity=args.dedup_capacity,
+            error_rate=args.dedup_error_rate,
+            max_state_mib=args.dedup_max_state_mib,
+        )
+
+    def new_structure(self) -> SortedKeys | BloomFilter:
+        if self.kind == "sorted":
+            return SortedKeys()
+        if self.kind != "bloom":
+            raise ValueError(f"Unknown kind {self.kind}, expected one of {KINDS}")
+        return self.new_bloom(self.capacity)
+
+    def new_bloom(self, capacity: int) -> BloomFilter:
+        """A Bloom filter for ``capacity`` keys, if its state fits in ``max_state_mib``"""
+        bloom = BloomFilter(capacity, self.error_rate)
+        # random bits do not compress, so the state is the size of the filter, in base64
+        if bloom.nbytes * 4 / 3 > self.max_state_mib * 2**20:
+            raise ValueError(
+                f"A Bloom filter for {capacity} keys at {self.error_rate} takes "
+                f"{bloom.nbytes / 2**20:.1f} MiB, more than --dedup-max-state-mib"
+            )
+        return bloom
+
+    def load(self, state: dict | None) -> SortedKeys | BloomFilter:
+        if not state:
+            return self.new_structure()
+        if state["kind"] == "sorted":
+            return SortedKeys.from_state(state)
+        return BloomFilter.from_state(state)
+
+    def save(self, seen: SortedKeys | BloomFilter) -> dict:
+        """The state of ``seen``, as a Bloom filter if the sorted keys do not fit in the limit"""
+        state = seen.to_state()
+        if state_size(state) <= self.max_state_mib * 2**20 or seen.kind == "bloom":
+            return state
+        bloom = self.new_bloom(max(self.capacity, 2 * len(seen)))
+        print(
+            f"{len(seen)} sorted keys take {state_size(state) / 2**20:.0f} MiB of state, "
+            f"more than {self.max_state_mib} MiB, storing them in a Bloom filter instead"
+        )
+        for start in range(0, len(seen), self.batch_size):
+            bloom.add(seen.keys[start : start + self.batch_size])
+        return bloom.to_state()
+
+    def drop_seen(self, items: Any, key: str = "id") -> Iterator[Any]:
+        """Yields ``items`` (rows or pyarrow tables) without the rows whose ``key`` was seen"""
+        import numpy as np
+        import dlt
+
+        resource_state = dlt.current.resource_state()
+        seen = self.load(resource_state.get(STATE_KEY))
+        dropped = 0
+        for batch, keys in _batches(items, key, self.batch_size):
+            new = ~seen.contains(keys)
+            # the first of the rows that share a key within the batch
+            first = np.zeros(len(keys), dtype=bool)
+            first[np.unique(keys, return_index=True)[1]] = True
+            new &= first
+            seen.add(keys[new])
+            dropped += len(keys) - int(new.sum())
+            if isinstance(batch, list):
+                yield [row for row, keep in zip(batch, new) if keep]
+            else:
+                yield batch.filter(new)
+        resource_state[STATE_KEY] = self.save(seen)
+        print(f"Dropped {dropped} rows whose {key} was already extracted")
+
+
+def _batches(
+    items: Any, key: str, batch_size: int
+) -> "Iterator[tuple[Any, np.ndarray]]":
+    """Groups rows into lists of ``batch_size``, pyarrow tables are passed as they are"""
+    import numpy as np
+
+    rows: list = []
+    for item in items:
+        if isinstance(item, dict):
+            rows.append(item)
+        elif isinstance(item, list):
+            rows.extend(item)
+        else:
+            yield item, item[key].to_numpy().astype(np.int64)
+            continue
+        if len(rows) >= batch_size:
+            yield rows, np.fromiter((row[key] for row in rows), np.int64, len(rows))
+            rows = []
+    if rows:
+        yield rows, np.fromiter((row[key] for row in rows), np.int64, len(rows))
+
+
+def add_dedup_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options that drop the rows whose key was extracted before"""
+    group = parser.add_argument_group(
+        "deduplication",
+        "Drop the rows whose primary key was extracted by a previous run",
+    )
+    group.add_argument(
+        "--dedup",
+        choices=KINDS,
+        help="Remember the keys in a sorted array (exact) or a Bloom filter (compact)",
+    )
+    group.add_argument(
+        "--dedup-capacity",
+        type=int,
+        default=1_000_000,
+        help="Keys the Bloom filter is sized for (default: %(default)s)",
+    )
+    group.add_argument(
+        "--dedup-error-rate",
+        type=float,
+        default=0.001,
+        help="False positive rate of the Bloom filter (default: %(default)s)",
+    )
+    group.add_argument(
+        "--dedup-max-state-mib",
+        type=float,
+        default=8.0,
+        help="Largest size of the keys in the pipeline state (default: %(default)s)",
+    )
@@ -0,0 +1,303 @@
+"""Loads one extract into several destinations, normalizing it once per loader file format.
+
+Running the same source into duckdb and Postgres with two pipelines extracts and normalizes it
+twice. ``fan_out`` runs a pipeline per destination (``<pipeline_name>_<name>``). The first of them
+extracts the data, and the others import the files of its package with
+``dlt.mark.with_file_import`` instead of extracting them again:
+
+    targets = [Target("duckdb", "parquet"), Target("postgres", "insert_values")]
+    results = fan_out(sample_source(), "sample_pipeline_fan_out", targets, table_name="samples")
+
+The destinations that use the same file format share the normalize step: the first of them
+normalizes its package, and the others import its normalized files, which dlt links into their
+packages as they are. ``insert_values`` files are SQL for one dialect, so they are only shared
+between destinations of the same type. Normalizing uses the capabilities of the first destination
+of a group, which the others should share (naming convention, length of identifiers).
+
+The normalized files hold the load id of the pipeline that wrote them, so ``_dlt_load_id`` is
+rewritten in the files of every other pipeline of the group, and the rows match the ``_dlt_loads``
+of their own destination. Every pipeline takes the state of the source from the first one and
+writes it to its destination under its own name, so ``dlt.pipeline(...).sync_destination()``
+restores it from there.
+
+The normalize steps of the groups and the loads of the destinations run at the same time, in
+threads. A destination that fails does not hold up the others: its load is retried ``retries``
+times with exponential backoff, and if it still fails, its package stays pending in its pipeline
+and is loaded first by the next run.
+"""
+
+import argparse
+import gzip
+import importlib
+import os
+import time
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import dlt
+from dlt.common.schema.typing import C_DLT_LOAD_ID, PIPELINE_STATE_TABLE_NAME
+from dlt.pipeline.exceptions import PipelineStepFailed
+
+from utils.parallel import make_executor
+
+
+@dataclass(frozen=True)
+class Target:
+    """A destination and the file format of its loads, parsed from ``[name=]duckdb[:parquet]``"""
+
+    # a destination name or a destination factory such as ``dlt.destinations.duckdb(...)``
+    destination: Any
+    loader_file_format: str | None = None
+    # tells apart two targets of the same destination type
+    name: str | None = None
+
+    @classmethod
+    def parse(cls, value: str) -> "Target":
+        name, _, value = value.rpartition("=")
+        destination, _, file_format = value.partition(":")
+        return cls(destination, file_format or None, name or None)
+
+    @property
+    def destination_name(self) -> str:
+        return getattr(self.destination, "destination_name", self.destination)
+
+    @property
+    def pipeline_suffix(self) -> str:
+        return self.name or self.destination_name
+
+    @property
+    def normalize_group(self) -> tuple[str | None, str | None]:
+        """Targets with the same group can load the same normalized files"""
+        if self.loader_file_format in (None, "insert_values"):
+            # the preferred format of a destination is not known before it is created
+            return self.loader_file_format, self.destination_name
+        return self.loader_file_format, None
+
+
+def _package_files(
+    source: dlt.Pipeline, load_ids: list[str], loader_file_format: str | None
+) -> Iterator[Any]:
+    """Yields the files of the extracted or normalized packages of ``source``, to be imported by
+    another pipeline"""
+    schema = source.default_schema
+    # the state of the source goes with the files, the pipeline state row is left out since
+    # every pipeline writes its own
+    source_state = source.state.get("sources", {}).get(schema.name, {})
+    dlt.current.source_state().update(source_state)
+    for load_id in load_ids:
+        for job in source.get_load_package_info(load_id).jobs["new_jobs"]:
+            table_name = job.job_file_info.table_name
+            if table_name == PIPELINE_STATE_TABLE_NAME:
+                continue
+            table = schema.get_table(table_name)
+            yield dlt.mark.with_file_import(
+                job.file_path,
+                job.job_file_info.file_format,
+                hints=dlt.mark.make_hints(
+                    table_name=table_name,
+                    write_disposition=table.get("write_disposition"),
+                    columns=table.get("columns"),
+                    # and not the file format of the extractor, which is in its schema
+                    file_format=loader_file_format or "preferred",
+                ),
+            )
+
+
+_imported = dlt.resource(_package_files, name="fan_out")
+
+
+def _replace_load_id(
+    path: str, file_format: str, old_load_ids: list[str], load_id: str
+) -> None:
+    """Replaces ``old_load_ids`` with ``load_id`` in a normalized file.
+
+    The file is written next to the old one and moved over it, so the file it was linked to keeps
+    its own load id. Text files are rewritten in blocks of whole lines: a load id is the time of
+    its extract down to the microsecond, and it is not expected anywhere else in the rows. They
+    are only read by the loader, so they are compressed again with the fastest level instead of
+    dlt's default.
+    """
+    temp_path = f"{path}.{load_id}"
+    if file_format == "parquet":
+        import pyarrow as pa
+        from pyarrow import parquet as pq
+
+        table = pq.read_table(path)
+        index = table.schema.get_field_index(C_DLT_LOAD_ID)
+        if index == -1:
+            return
+        column = pa.repeat(load_id, len(table)).cast(table.schema.field(index).type)
+        pq.write_table(table.set_column(index, C_DLT_LOAD_ID, column), temp_path)
+    else:
+        with open(path, "rb") as f:
+            compressed = f.read(2) == b"\x1f\x8b"
+        open_file = gzip.open if compressed else open
+        level = {"compresslevel": 1} if compressed else {}
+        with open_file(path, "rb") as src, open_file(temp_path, "wb", **level) as dst:
+            # whole lines, so that a load id is never split between two of them
+            while lines := src.readlines(1 << 20):
+                chunk = b"".join(lines)
+                for old_load_id in old_load_ids:
+                    chunk = chunk.replace(old_load_id.encode(), load_id.encode())
+                dst.write(chunk)
+    os.replace(temp_path, path)
+
+
+def normalize_group(
+    leader: dlt.Pipeline,
+    followers: list[dlt.Pipeline],
+    loader_file_format: str | None,
+) -> None:
+    """Normalizes the extracted packages of ``leader`` and hands its normalized files to
+    ``followers``, with their own load id"""
+    load_ids = leader.normalize().loads_ids
+    for follower in followers:
+        follower.extract(
+            _imported(leader, load_ids, loader_file_format),
+            schema=leader.default_schema.clone(),
+        )
+        # the clone of a schema that was saved already is not modified, and would not be saved
+        follower.schemas.save_schema(follower.default_schema)
+        # the imported files are linked as they are, only the state of the follower is normalized
+        for load_id in follower.normalize().loads_ids:
+            for job in follower.get_load_package_info(load_id).jobs["new_jobs"]:
+                if job.job_file_info.table_name != PIPELINE_STATE_TABLE_NAME:
+                    _replace_load_id(
+                        job.file_path, job.job_file_info.file_format, load_ids, load_id
+                    )
+
+
+def load_with_retries(
+    pipeline: dlt.Pipeline, retries: int = 3, backoff: float = 1.0
+) -> Any:
+    """Loads the pending packages of ``pipeline``, retrying with exponential backoff"""
+    for attempt in range(retries + 1):
+        try:
+            return pipeline.load()
+        except PipelineStepFailed as ex:
+            if attempt == retries:
+                raise
+            delay = backoff * 2**attempt
+            print(
+                f"Load into {pipeline.destination.destination_name} failed ({ex.exception}), "
+                f"retrying in {delay:.1f}s"
+            )
+            time.sleep(delay)
+
+
+def fan_out(
+    data: Any,
+    pipeline_name: str,
+    targets: list[Target],
+    dataset_name: str | None = None,
+    retries: int = 3,
+    backoff: float = 1.0,
+    pipelines_dir: str | None = None,
+    **extract_kwargs: Any,
+) -> dict[str, Any]:
+    """Extracts ``data`` once and loads it into every target, with a pipeline each.
+
+    ``extract_kwargs`` are passed to ``extract`` (``table_name``, ``write_disposition``...).
+    Returns the load info of every target, or the exception of the ones that failed.
+    """
+    suffixes = [target.pipeline_suffix for target in targets]
+    if len(set(suffixes)) != len(suffixes):
+        raise ValueError(f"Targets must have different names, got {suffixes}")
+
+    pipelines = {
+        target.pipeline_suffix: dlt.pipeline(
+            pipeline_name=f"{pipeline_name}_{target.pipeline_suffix}",
+            destination=target.destination,
+            dataset_name=dataset_name,
+            pipelines_dir=pipelines_dir,
+        )
+        for target in targets
+    }
+    groups: dict[tuple, list[Target]] = {}
+    for target in targets:
+        groups.setdefault(target.normalize_group, []).append(target)
+
+    extractor = pipelines[targets[0].pipeline_suffix]
+    load_ids = extractor.extract(
+        data, loader_file_format=targets[0].loader_file_format, **extract_kwargs
+    ).loads_ids
+    # the files are hard links or copies, so they stay when the extractor normalizes its package
+    for leader, *_ in groups.values():
+        pipeline = pipelines[leader.pipeline_suffix]
+        if pipeline is not extractor:
+            pipeline.extract(
+                _imported(extractor, load_ids, leader.loader_file_format),
+                schema=extractor.default_schema.clone(),
+            )
+
+    # dlt imports them on first use, which is not safe to do from two threads at once
+    for module in ("pyarrow", "pandas"):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    results: dict[str, Any] = {}
+    loads: dict[str, Future] = {}
+    with make_executor("thread", len(pipelines)) as pool:
+        normalized: dict[Future, list[Target]] = {
+            pool.submit(
+                normalize_group,
+                pipelines[group[0].pipeline_suffix],
+                [pipelines[target.pipeline_suffix] for target in group[1:]],
+                group[0].loader_file_format,
+            ): group
+            for group in groups.values()
+        }
+        # a group starts loading as soon as it is normalized
+        for future in as_completed(normalized):
+            group = normalized[future]
+            try:
+                future.result()
+            except Exception as ex:
+                results.update((target.pipeline_suffix, ex) for target in group)
+                continue
+            for target in group:
+                loads[target.pipeline_suffix] = pool.submit(
+                    load_with_retries,
+                    pipelines[target.pipeline_suffix],
+                    retries,
+                    backoff,
+                )
+        for suffix, future in loads.items():
+            try:
+                results[suffix] = future.result()
+            except Exception as ex:
+                # missing credentials are raised before the load starts
+                results[suffix] = ex
+    return {suffix: results[suffix] for suffix in pipelines}
+
+
+def add_fan_out_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options that choose the destinations of a fan-out load"""
+    group = parser.add_argument_group(
+        "fan-out", "Extract once and load into several destinations at the same time"
+    )
+    group.add_argument(
+        "--targets",
+        nargs="+",
+        type=Target.parse,
+        default=[Target("duckdb", "parquet"), Target("postgres", "insert_values")],
+        metavar="[NAME=]DESTINATION[:FORMAT]",
+        help="Destinations and the file format of their loads, NAME tells apart two of the same "
+        "type (default: duckdb:parquet postgres:insert_values)",
+    )
+    group.add_argument(
+        "--load-retries",
+        type=int,
+        default=3,
+        help="Times a failed load is retried before its package is left pending "
+        "(default: %(default)s)",
+    )
+    group.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=1.0,
+        help="Seconds before the first retry, doubled for every other one (default: %(default)s)",
+    )
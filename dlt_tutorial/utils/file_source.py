@@ -0,0 +1,224 @@
+"""Reads newline-delimited JSON and CSV files in chunks of bounded size.
+
+A file is read ``chunk_bytes`` at a time, cut at the last complete line, and every chunk is
+parsed on its own, so memory depends on the chunk size and not on the size of the file:
+
+    for page in read_file(Path("samples.jsonl"), chunk_bytes=64 * 2**20, parser="arrow"):
+        ...  # a list of dicts (orjson) or a pyarrow table (arrow)
+
+JSONL chunks are parsed line by line with ``orjson`` into dicts, which dlt normalizes like any
+other rows, or all at once with the JSON reader of Arrow into tables, which dlt writes to parquet
+as they are. CSV chunks are always parsed by Arrow. The types Arrow inferred from the previous
+chunks are used for the next one, except for the columns that were only nulls so far. A chunk
+that does not fit them, such as a float in an integer column, is parsed again without them, and
+every chunk is cast to the types of all the chunks so far, widened where they differ (null to
+any type, integer to float). Fields must not contain newlines, which is the case for the files
+written by ``write_sample_file``.
+
+With ``use_mmap`` the file is memory-mapped instead of read into a buffer, and the pages of every
+chunk are released once it is parsed, otherwise the mapped file would count towards the resident
+memory of the process as it is read.
+"""
+
+import csv
+import mmap
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator
+
+from utils.data_generator import SyntheticData
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+FILE_FORMATS = ("jsonl", "csv")
+PARSERS = ("orjson", "arrow")
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+
+
+def file_format_of(path: Path) -> str:
+    file_format = path.suffix.lstrip(".").lower()
+    if file_format == "ndjson":
+        return "jsonl"
+    if file_format not in FILE_FORMATS:
+        raise ValueError(
+            f"Unknown file format of {path}, expected one of {FILE_FORMATS}"
+        )
+    return file_format
+
+
+def read_chunks(
+    path: Path,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    use_mmap: bool = False,
+    offset: int = 0,
+) -> Iterator[bytes]:
+    """Yields the lines of ``path`` from ``offset`` in chunks of about ``chunk_bytes``"""
+    with open(path, "rb") as f:
+        if not use_mmap:
+            f.seek(offset)
+            rest = b""
+            while block := f.read(chunk_bytes):
+                block = rest + block
+                cut = block.rfind(b"\n") + 1
+                if cut:
+                    yield block[:cut]
+                rest = block[cut:]
+            if rest:
+                yield rest
+            return
+
+        size = path.stat().st_size
+        if size <= offset:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = offset
+            while start < size:
+                end = mapped.rfind(b"\n", start, start + chunk_bytes) + 1
+                if end <= start or start + chunk_bytes >= size:
+                    # a line longer than the chunk, or the end of the file
+                    end = mapped.find(b"\n", min(start + chunk_bytes, size - 1)) + 1
+                    end = end or size
+                yield mapped[start:end]
+                released = start - start % mmap.PAGESIZE
+                mapped.madvise(mmap.MADV_DONTNEED, released, end - released)
+                start = end
+
+
+def known_types(schema: "pa.Schema | None") -> "pa.Schema | None":
+    """The fields of ``schema`` whose type is known, leaving out the ones that were only nulls"""
+    import pyarrow as pa
+
+    if schema is None:
+        return None
+    return pa.schema([field for field in schema if not pa.types.is_null(field.type)])
+
+
+def widen(
+    schema: "pa.Schema | None", table: "pa.Table"
+) -> "tuple[pa.Schema, pa.Table]":
+    """Widens ``schema`` to the types of ``table`` and casts ``table`` to it"""
+    import pyarrow as pa
+
+    if schema is None:
+        return table.schema, table
+    schema = pa.unify_schemas([schema, table.schema], promote_options="permissive")
+    if table.schema == schema:
+        return schema, table
+    columns = [
+        (
+            table.column(field.name).cast(field.type)
+            if field.name in table.column_names
+            else pa.nulls(len(table), field.type)
+        )
+        for field in schema
+    ]
+    return schema, pa.Table.from_arrays(columns, schema=schema)
+
+
+def read_jsonl(
+    path: Path,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    use_mmap: bool = False,
+    parser: str = "orjson",
+) -> Iterator[Any]:
+    """Yields a list of dicts (``orjson``) or a pyarrow table (``arrow``) per chunk"""
+    if parser == "orjson":
+        import orjson
+
+        for chunk in read_chunks(path, chunk_bytes, use_mmap):
+            yield [orjson.loads(line) for line in chunk.splitlines() if line.strip()]
+        return
+
+    import pyarrow as pa
+    from pyarrow import json as pa_json
+
+    from utils.flatten import flatten_table
+
+    def parse(chunk: bytes, schema: "pa.Schema | None") -> "pa.Table":
+        return pa_json.read_json(
+            pa.BufferReader(chunk),
+            read_options=pa_json.ReadOptions(block_size=len(chunk) + 1),
+            parse_options=pa_json.ParseOptions(explicit_schema=schema),
+        )
+
+    schema = None
+    for chunk in read_chunks(path, chunk_bytes, use_mmap):
+        try:
+            table = parse(chunk, known_types(schema))
+        except pa.ArrowInvalid:
+            table = parse(chunk, None)
+        schema, table = widen(schema, table)
+        # the nested metadata object becomes the same columns as in the dict path
+        yield flatten_table(table)
+
+
+def read_csv(
+    path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES, use_mmap: bool = False
+) -> Iterator[Any]:
+    """Yields a pyarrow table per chunk"""
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    with open(path, "rb") as f:
+        header = f.readline()
+    column_names = next(csv.reader([header.decode()]))
+
+    def parse(chunk: bytes, column_types: "pa.Schema | None") -> "pa.Table":
+        return pa_csv.read_csv(
+            pa.BufferReader(chunk),
+            read_options=pa_csv.ReadOptions(
+                column_names=column_names, block_size=len(chunk) + 1
+            ),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types),
+        )
+
+    schema = None
+    for chunk in read_chunks(path, chunk_bytes, use_mmap, offset=len(header)):
+        try:
+            table = parse(chunk, known_types(schema))
+        except pa.ArrowInvalid:
+            table = parse(chunk, None)
+        schema, table = widen(schema, table)
+        yield table
+
+
+def read_file(
+    path: Path,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    use_mmap: bool = False,
+    parser: str = "orjson",
+) -> Iterator[Any]:
+    """``read_jsonl`` or ``read_csv``, depending on the extension of ``path``"""
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser {parser}, expected one of {PARSERS}")
+    if file_format_of(path) == "csv":
+        return read_csv(path, chunk_bytes, use_mmap)
+    return read_jsonl(path, chunk_bytes, use_mmap, parser)
+
+
+def write_sample_file(path: Path, synthetic: SyntheticData) -> int:
+    """Writes the records of ``synthetic`` to ``path`` as JSONL or CSV. Returns its size"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if file_format_of(path) == "jsonl":
+        import orjson
+
+        with open(path, "wb") as f:
+            for record in synthetic.records():
+                f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        return path.stat().st_size
+
+    from dataclasses import replace
+
+    from pyarrow import csv as pa_csv
+
+    pages = replace(synthetic, arrow_page_size=synthetic.arrow_page_size or 100_000)
+    writer = None
+    try:
+        for table in pages.records():
+            if writer is None:
+                writer = pa_csv.CSVWriter(str(path), table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path.stat().st_size
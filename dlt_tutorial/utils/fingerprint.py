@@ -0,0 +1,194 @@
+"""Skips the normalize and load steps of a run whose extracted data is the same as the last one.
+
+A scheduled run on a source that did not change still extracts, normalizes and loads every row, and
+adds a row to ``_dlt_loads``. ``run_if_changed`` extracts the data, hashes the rows of every table
+in the extracted package and keeps the hashes in the local state of the pipeline. When all of them
+match the hashes of the last run, the package is dropped and the run ends before the normalize
+step:
+
+    fingerprint = Fingerprint(exclude=("metadata",))
+    load_info = run_if_changed(pipeline, sample_data(), fingerprint, table_name="samples")
+    print(load_info)  # the load info, or ``Unchanged`` when nothing changed
+
+The package holds the rows an ``incremental`` cursor let through, and a table without rows, like
+the one of a cursor with nothing new, counts as unchanged. Every row is hashed on its own and the
+hashes are added up, so the fingerprint takes constant memory and does not depend on the order of
+the rows, which a paginated API does not always keep. pyarrow tables are hashed a batch at a time,
+so their pages must be the same from one run to the next. Columns that change on every run, such
+as an ingestion timestamp, must be left out with ``exclude``, or the fingerprint never matches.
+The hashes are not stored in the destination, so the first run on a new machine is never skipped.
+"""
+
+import argparse
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+import dlt
+import orjson
+from dlt.common.pipeline import ExtractInfo
+from dlt.common.schema.typing import C_DLT_LOAD_ID, PIPELINE_STATE_TABLE_NAME
+
+STATE_KEY = "fingerprints"
+
+_MODULUS = 2**128
+
+
+def _hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=16).digest())
+
+
+def _rows(
+    path: str, file_format: str, exclude: tuple[str, ...]
+) -> Iterator[tuple[int, int]]:
+    """Yields the number of rows and the hash of every row, or batch, of an extracted file"""
+    if file_format == "parquet":
+        import pyarrow as pa
+        from pyarrow import parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches():
+            # flattened columns of an excluded struct are named ``<key>__<field>``
+            batch = batch.drop_columns(
+                [name for name in batch.schema.names if name.split("__")[0] in exclude]
+            )
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, batch.schema) as writer:
+                writer.write(batch)
+            yield batch.num_rows, _hash(sink.getvalue())
+        return
+
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    # a line holds a dict, or the list of dicts of a page
+    with (gzip.open if compressed else open)(path, "rb") as f:
+        for line in f:
+            rows = orjson.loads(line)
+            for row in rows if isinstance(rows, list) else [rows]:
+                row = {k: v for k, v in row.items() if k not in exclude}
+                yield 1, _hash(orjson.dumps(row, option=orjson.OPT_SORT_KEYS))
+
+
+def package_fingerprints(
+    pipeline: dlt.Pipeline, load_ids: list[str], exclude: tuple[str, ...]
+) -> dict[str, dict]:
+    """The number of rows and the hash of every table in the extracted packages of ``pipeline``"""
+    totals: dict[str, tuple[int, int]] = {}
+    # the extract step may add the load id of the package to the arrow tables
+    exclude = (*exclude, C_DLT_LOAD_ID)
+    for load_id in load_ids:
+        for job in pipeline.get_load_package_info(load_id).jobs["new_jobs"]:
+            table_name = job.job_file_info.table_name
+            # the state changes with the cursors, not with the data
+            if table_name == PIPELINE_STATE_TABLE_NAME:
+                continue
+            rows, total = totals.get(table_name, (0, 0))
+            for count, value in _rows(
+                job.file_path, job.job_file_info.file_format, exclude
+            ):
+                rows, total = rows + count, (total + value) % _MODULUS
+            totals[table_name] = rows, total
+    return {
+        table_name: {"rows": rows, "hash": f"{total:032x}"}
+        for table_name, (rows, total) in totals.items()
+        if rows
+    }
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Which columns to leave out of the fingerprint of the extracted rows"""
+
+    exclude: tuple[str, ...] = ("metadata",)
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "Fingerprint | None":
+        """Returns the options on the command line, or None without ``--skip-unchanged``"""
+        if not args.skip_unchanged:
+            return None
+        return cls(exclude=tuple(args.fingerprint_exclude))
+
+
+@dataclass(frozen=True)
+class Unchanged:
+    """What ``run_if_changed`` returns for a run whose data did not change"""
+
+    pipeline_name: str
+    extract_info: ExtractInfo
+
+    def __str__(self) -> str:
+        return (
+            f"No changes since the last run of {self.pipeline_name}, "
+            "skipped the normalize and load steps"
+        )
+
+
+def run_if_changed(
+    pipeline: dlt.Pipeline,
+    data: Any,
+    fingerprint: Fingerprint | None = None,
+    **kwargs: Any,
+) -> Any:
+    """Runs ``data`` like ``pipeline.run(data, **kwargs)``, unless it did not change.
+
+    Returns the load info, or ``Unchanged`` if every table got the same rows as in the last run.
+    Without a ``fingerprint`` it is ``pipeline.run``.
+    """
+    if fingerprint is None or pipeline.has_pending_data:
+        # the packages of a failed run are loaded first
+        return pipeline.run(data, **kwargs)
+    if (
+        pipeline.first_run
+        and pipeline.config.restore_from_destination
+        and not pipeline.dev_mode
+    ):
+        # like ``pipeline.run``, the state comes from the destination if there is none here
+        pipeline.sync_destination()
+
+    extract_info = pipeline.extract(data, **kwargs)
+    fingerprints = package_fingerprints(
+        pipeline, extract_info.loads_ids, fingerprint.exclude
+    )
+    try:
+        previous = pipeline.get_local_state_val(STATE_KEY)
+    except KeyError:
+        previous = {}
+    changed = any(
+        previous.get(table_name) != digest
+        for table_name, digest in fingerprints.items()
+    )
+    # a refresh drops the tables in the load step, so it is never skipped
+    if changed or kwargs.get("refresh"):
+        pipeline.normalize()
+        load_info = pipeline.load()
+        pipeline.set_local_state_val(STATE_KEY, {**previous, **fingerprints})
+        return load_info
+
+    # the cursors did not move either, so rolling the state back with the package loses nothing.
+    # ``abort_packages`` replaced ``drop_pending_packages`` in dlt 1.30
+    abort_packages = getattr(pipeline, "abort_packages", None)
+    (abort_packages or pipeline.drop_pending_packages)()
+    return Unchanged(pipeline.pipeline_name, extract_info)
+
+
+def add_fingerprint_arguments(
+    parser: argparse.ArgumentParser, exclude: tuple[str, ...] = ("metadata",)
+) -> None:
+    """Adds the options that skip the runs whose data did not change"""
+    group = parser.add_argument_group(
+        "fingerprint",
+        "Hash the extracted rows and stop before normalizing if they match the last run",
+    )
+    group.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="End the run after the extract if the data did not change",
+    )
+    group.add_argument(
+        "--fingerprint-exclude",
+        nargs="*",
+        default=list(exclude),
+        metavar="COLUMN",
+        help="Columns that change on every run and are not hashed "
+        f"(default: {' '.join(exclude)})",
+    )
@@ -0,0 +1,92 @@
+"""Extract-time flattening of nested dicts into the columns of their parent table.
+
+During normalization dlt walks every row, folds nested dicts into ``parent__child`` columns and
+moves nested lists into child tables, which are joined back through ``_dlt_parent_id``.
+``flatten_nested`` does the folding while extracting instead, and keeps everything in one table:
+
+    flatten_nested(sample_data(), mode="prefix", max_depth=1)
+
+With ``mode="prefix"``, nested dicts become ``metadata__ingested_at`` and
+``metadata__script_name`` columns, down to ``max_depth`` levels (all of them if ``None``). With
+``mode="json"``, every nested value is kept in a single JSON column, ``metadata``. In both modes,
+whatever is left nested below ``max_depth``, lists included, is hinted as a ``json`` column the
+first time it shows up, so dlt stores it as is instead of in a child table: one table, one load
+job per file and no joins. Pyarrow tables are flattened too, struct columns being their nested
+dicts, and dlt already loads the struct and list columns that are left as JSON.
+"""
+
+from typing import Any
+
+import dlt
+
+FLATTEN_MODES = ("prefix", "json")
+SEPARATOR = "__"
+
+
+def flatten_record(record: dict, max_depth: int | None = None) -> dict:
+    """Folds the nested dicts of ``record`` into prefixed keys, down to ``max_depth`` levels"""
+    flat: dict = {}
+
+    def fold(prefix: str, value: Any, depth: int) -> None:
+        if isinstance(value, dict) and (max_depth is None or depth < max_depth):
+            for key, nested in value.items():
+                fold(f"{prefix}{SEPARATOR}{key}", nested, depth + 1)
+        else:
+            flat[prefix] = value
+
+    for key, value in record.items():
+        fold(key, value, 0)
+    return flat
+
+
+def flatten_table(table: Any, max_depth: int | None = None) -> Any:
+    """``flatten_record`` for a pyarrow table, folding struct columns instead of dicts"""
+    import pyarrow as pa
+
+    depth = 0
+    while max_depth is None or depth < max_depth:
+        if not any(pa.types.is_struct(field.type) for field in table.schema):
+            break
+        table = table.flatten()
+        depth += 1
+    # pyarrow joins the names of flattened fields with "."
+    return table.rename_columns(
+        [name.replace(".", SEPARATOR) for name in table.schema.names]
+    )
+
+
+def flatten_nested(
+    resource: Any, mode: str = "prefix", max_depth: int | None = None
+) -> Any:
+    """Adds the flattening stage to ``resource`` and stores what is left nested as JSON"""
+    if mode not in FLATTEN_MODES:
+        raise ValueError(f"Unknown mode {mode}, expected one of {FLATTEN_MODES}")
+    depth = 0 if mode == "json" else max_depth
+    json_columns: set[str] = set()
+
+    def flatten(items: Any) -> Any:
+        if not isinstance(items, (dict, list)):
+            return flatten_table(items, depth)
+        rows = [items] if isinstance(items, dict) else items
+        if depth != 0:
+            rows = [flatten_record(row, depth) for row in rows]
+        nested = {
+            name
+            for row in rows
+            for name, value in row.items()
+            if isinstance(value, (dict, list))
+        }
+        page = rows[0] if isinstance(items, dict) else rows
+        if nested <= json_columns:
+            return page
+        # ``max_table_nesting`` would do the same, but dlt drops it on new tables
+        # with a frozen column contract
+        columns = [
+            {"name": name, "data_type": "json"} for name in nested - json_columns
+        ]
+        json_columns.update(nested)
+        return dlt.mark.with_hints(page, dlt.mark.make_hints(columns=columns))
+
+    # ``add_map`` would get the rows of a page one by one, and dlt does not take hints from
+    # the rows of a list, a plain step gets the whole page
+    return resource.add_step(flatten)
@@ -0,0 +1,166 @@
+"""Frozen table schemas, compiled into a coercion plan that turns pages of rows into arrow tables.
+
+dlt normalizes dicts one row at a time: it flattens them, infers the type of every value and
+checks it against the schema, even when the table schema never changes. A reviewed schema file,
+like ``schemas/samples.schema.yaml``, fixes the columns and their types instead:
+
+    name: samples
+    columns:
+      id:
+        data_type: bigint
+        nullable: false
+      metadata__ingested_at:
+        data_type: timestamp
+      ...
+
+``load_plan`` reads it once and compiles it into a ``CoercionPlan``: the path of every column in
+the nested rows and the arrow type it is converted to. ``with_frozen_schema`` sets the columns of
+the file on a resource, freezes its contract and converts every page of rows it yields into an
+arrow table with the plan, column by column. Arrow tables skip the per-row normalizer entirely,
+and since they always match the stored schema, dlt finds nothing to update and keeps its version.
+Pages that do not fit the plan are passed on as dicts, so dlt enforces the contract on them.
+
+Plans are cached by the hash of the file, so editing it is the only way to get a new one.
+"""
+
+import functools
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import yaml
+
+FROZEN_SCHEMAS_DIR = Path(__file__).resolve().parents[1] / "schemas"
+
+# dlt data types that map to a single arrow type
+ARROW_TYPES = {
+    "bigint": pa.int64(),
+    "double": pa.float64(),
+    "bool": pa.bool_(),
+    "text": pa.string(),
+    "timestamp": pa.timestamp("us", tz="UTC"),
+    "date": pa.date32(),
+}
+
+FROZEN_CONTRACT = {"tables": "evolve", "columns": "freeze", "data_type": "freeze"}
+
+
+@dataclass(frozen=True)
+class CoercionPlan:
+    """The columns of a frozen table and how to build each of them from nested rows"""
+
+    table_name: str
+    version: str
+    columns: dict
+    paths: tuple[tuple[str, ...], ...]
+    arrow_schema: pa.Schema
+
+    def apply(self, rows: list[dict]) -> pa.Table:
+        """Builds an arrow table from ``rows``, raising if a value does not fit its column"""
+        fields = {path[0] for path in self.paths}
+        if any(row.keys() - fields for row in rows):
+            raise ValueError(f"Rows have fields that are not in {self.table_name}")
+        arrays = []
+        for path, field in zip(self.paths, self.arrow_schema):
+            values = [_lookup(row, path) for row in rows]
+            arrays.append(_coerce(pa.array(values), field.type))
+        return pa.Table.from_arrays(arrays, schema=self.arrow_schema)
+
+
+def _lookup(row: dict, path: tuple[str, ...]) -> Any:
+    for key in path:
+        if row is None:
+            return None
+        row = row.get(key)
+    return row
+
+
+def _coerce(array: pa.Array, to: pa.DataType) -> pa.Array:
+    if array.type == to:
+        return array
+    if pa.types.is_timestamp(to) and pa.types.is_string(array.type):
+        try:
+            return array.cast(to)
+        except pa.ArrowInvalid:
+            # timestamps without an offset are UTC, like in dlt
+            return array.cast(pa.timestamp(to.unit)).cast(to)
+    return array.cast(to)
+
+
+def compile_plan(schema: dict, version: str) -> CoercionPlan:
+    """Compiles a table schema, as found in a frozen schema file, into a ``CoercionPlan``"""
+    fields, paths = [], []
+    for name, column in schema["columns"].items():
+        data_type = column["data_type"]
+        if data_type not in ARROW_TYPES:
+            raise ValueError(
+                f"Column {name} of {schema['name']} has data type {data_type}, "
+                f"expected one of {list(ARROW_TYPES)}"
+            )
+        fields.append(
+            pa.field(name, ARROW_TYPES[data_type], column.get("nullable", True))
+        )
+        # flattened nested fields are joined with `__`, like dlt does
+        paths.append(tuple(name.split("__")))
+    columns = {
+        name: {"name": name, **column} for name, column in schema["columns"].items()
+    }
+    return CoercionPlan(
+        table_name=schema["name"],
+        version=version,
+        columns=columns,
+        paths=tuple(paths),
+        arrow_schema=pa.schema(fields),
+    )
+
+
+@functools.cache
+def _load_plan(path: Path, version: str) -> CoercionPlan:
+    return compile_plan(yaml.safe_load(path.read_text()), version)
+
+
+def load_plan(table_name: str, schemas_dir: Path = FROZEN_SCHEMAS_DIR) -> CoercionPlan:
+    """Reads ``<table_name>.schema.yaml`` and compiles it, unless it did not change"""
+    path = schemas_dir / f"{table_name}.schema.yaml"
+    version = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+    return _load_plan(path, version)
+
+
+def export_frozen_schema(
+    pipeline: Any, table_name: str, schemas_dir: Path = FROZEN_SCHEMAS_DIR
+) -> Path:
+    """Writes the columns of ``table_name`` in the pipeline schema to a file to review"""
+    table = pipeline.default_schema.get_table(table_name)
+    columns = {
+        name: {
+            hint: value
+            for hint, value in column.items()
+            if hint in ("data_type", "nullable", "primary_key")
+        }
+        for name, column in table["columns"].items()
+        if not name.startswith("_dlt")
+    }
+    path = schemas_dir / f"{table_name}.schema.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        yaml.safe_dump({"name": table_name, "columns": columns}, sort_keys=False)
+    )
+    return path
+
+
+def with_frozen_schema(resource: Any, plan: CoercionPlan) -> Any:
+    """Freezes the columns of ``resource`` to ``plan`` and converts its pages with it"""
+
+    def to_arrow(items: Any) -> Any:
+        if not isinstance(items, list) or not items:
+            return items
+        try:
+            return plan.apply(items)
+        except (ValueError, pa.ArrowTypeError):
+            return items
+
+    resource.apply_hints(columns=plan.columns, schema_contract=FROZEN_CONTRACT)
+    # ``add_map`` would get the rows of a page one by one, a plain step gets the whole page
+    return resource.add_step(to_arrow)
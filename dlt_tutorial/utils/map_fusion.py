@@ -0,0 +1,252 @@
+"""Fusion of chained ``add_map`` steps into a single pass over each record.
+
+Every ``add_map`` adds one step to the resource pipe, and dlt calls each of them separately for
+every item, so a chain of ten small record functions costs ten trips through the pipe per row.
+``fuse`` takes the same chain, described as steps, and composes it into one function that runs
+all of them in a single pass:
+
+    sample_data.add_map(
+        fuse(
+            AddColumn("my_transformed_field", normalize_name, source="name"),
+            Drop("random_field"),
+        )
+    )
+
+Drops are moved in front of the steps that do not need the dropped columns, and steps whose only
+output is dropped later on are removed, so no work is spent on values that are thrown away.
+Besides single dicts, the fused function accepts lists of dicts and pyarrow tables, which are
+transformed column by column.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+@dataclass(frozen=True)
+class AddColumn:
+    """Sets ``name`` to ``func(record[source])``.
+
+    ``vectorized`` is used on pyarrow tables instead of calling ``func`` for every value: it gets
+    the ``source`` column and returns the new one.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    source: str
+    vectorized: Callable[[Any], Any] | None = None
+
+
+@dataclass(frozen=True, init=False)
+class Drop:
+    """Removes ``columns``, ignoring the ones that are not present"""
+
+    columns: tuple[str, ...]
+
+    def __init__(self, *columns: str) -> None:
+        object.__setattr__(self, "columns", columns)
+
+
+@dataclass(frozen=True)
+class Rename:
+    """Renames ``old`` to ``new``"""
+
+    old: str
+    new: str
+
+
+@dataclass(frozen=True)
+class Cast:
+    """Converts ``name`` to one of ``int``, ``float``, ``str`` or ``bool``"""
+
+    name: str
+    to: type
+
+
+@dataclass(frozen=True)
+class Map:
+    """Any other record function. Nothing is moved across it, since it may use any column"""
+
+    func: Callable[[Any], Any]
+
+
+Step = AddColumn | Drop | Rename | Cast | Map
+
+CAST_TYPES = (int, float, str, bool)
+
+
+def _reads(step: Step) -> set[str]:
+    if isinstance(step, AddColumn):
+        return {step.source}
+    if isinstance(step, Rename):
+        return {step.old}
+    if isinstance(step, Cast):
+        return {step.name}
+    return set()
+
+
+def _writes(step: Step) -> set[str]:
+    if isinstance(step, AddColumn):
+        return {step.name}
+    if isinstance(step, Rename):
+        return {step.old, step.new}
+    if isinstance(step, Cast):
+        return {step.name}
+    if isinstance(step, Drop):
+        return set(step.columns)
+    return set()
+
+
+def plan(steps: tuple[Step, ...]) -> list[Step]:
+    """Orders ``steps`` so drops come as early as possible and removes dead steps.
+
+    A drop of a column moves in front of any step that neither reads nor writes it. Once it
+    reaches an ``AddColumn`` or ``Cast`` that only produces that column, the step is removed,
+    since its result would be dropped anyway. It stops at a ``Map`` and at any other step that
+    reads the column or renames it.
+    """
+    planned: list[Step] = []
+    for step in steps:
+        if not isinstance(step, Drop):
+            planned.append(step)
+            continue
+        for column in step.columns:
+            position = len(planned)
+            while position > 0:
+                previous = planned[position - 1]
+                if isinstance(previous, Map):
+                    break
+                if isinstance(previous, (AddColumn, Cast)) and _writes(previous) == {
+                    column
+                }:
+                    del planned[position - 1]
+                    position -= 1
+                    continue
+                if column in _reads(previous) | _writes(previous):
+                    break
+                position -= 1
+            planned.insert(position, Drop(column))
+
+    # merge neighbouring drops back together
+    merged: list[Step] = []
+    for step in planned:
+        if merged and isinstance(step, Drop) and isinstance(merged[-1], Drop):
+            merged[-1] = Drop(*merged[-1].columns, *step.columns)
+        else:
+            merged.append(step)
+    return merged
+
+
+def _record_step(step: Step) -> Callable[[dict], dict]:
+    """A function that runs ``step`` on one record"""
+    if isinstance(step, AddColumn):
+        name, func, source = step.name, step.func, step.source
+
+        def add_column(record: dict) -> dict:
+            record[name] = func(record[source])
+            return record
+
+        return add_column
+    if isinstance(step, Drop):
+        columns = step.columns
+
+        def drop(record: dict) -> dict:
+            for column in columns:
+                record.pop(column, None)
+            return record
+
+        return drop
+    if isinstance(step, Rename):
+        old, new = step.old, step.new
+
+        def rename(record: dict) -> dict:
+            record[new] = record.pop(old)
+            return record
+
+        return rename
+    if isinstance(step, Cast):
+        name, to = step.name, step.to
+
+        def cast(record: dict) -> dict:
+            record[name] = to(record[name])
+            return record
+
+        return cast
+    return step.func
+
+
+def _compose_record_function(steps: list[Step]) -> Callable[[dict], dict]:
+    """A single function running ``steps`` one after the other"""
+    functions = tuple(_record_step(step) for step in steps)
+
+    def fused(record: dict) -> dict:
+        for function in functions:
+            record = function(record)
+        return record
+
+    return fused
+
+
+def _apply_to_table(steps: list[Step], table: "pa.Table") -> "pa.Table":
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    arrow_types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        bool: pa.bool_(),
+    }
+
+    def set_column(table: "pa.Table", name: str, column: Any) -> "pa.Table":
+        if name in table.schema.names:
+            return table.set_column(table.schema.get_field_index(name), name, column)
+        return table.append_column(name, column)
+
+    for step in steps:
+        if isinstance(step, AddColumn):
+            source = table.column(step.source)
+            if step.vectorized:
+                column = step.vectorized(source)
+            else:
+                column = pa.array([step.func(value) for value in source.to_pylist()])
+            table = set_column(table, step.name, column)
+        elif isinstance(step, Drop):
+            table = table.drop_columns(
+                [column for column in step.columns if column in table.schema.names]
+            )
+        elif isinstance(step, Rename):
+            table = table.rename_columns(
+                [step.new if name == step.old else name for name in table.schema.names]
+            )
+        elif isinstance(step, Cast):
+            column = pc.cast(table.column(step.name), arrow_types[step.to])
+            table = set_column(table, step.name, column)
+        else:
+            table = step.func(table)
+    return table
+
+
+def fuse(*steps: Step) -> Callable[[Any], Any]:
+    """Composes ``steps`` into one function to pass to ``add_map``"""
+    for step in steps:
+        if isinstance(step, Cast) and step.to not in CAST_TYPES:
+            raise ValueError(
+                f"Cannot cast {step.name} to {step.to}, expected one of {CAST_TYPES}"
+            )
+    planned = plan(steps)
+    record_function = _compose_record_function(planned)
+
+    def fused(items: Any) -> Any:
+        if isinstance(items, dict):
+            return record_function(items)
+        if isinstance(items, list):
+            return [record_function(item) for item in items]
+        if hasattr(items, "drop_columns"):
+            return _apply_to_table(planned, items)
+        raise TypeError(f"Cannot apply fused maps to {type(items).__name__}")
+
+    fused.steps = planned  # type: ignore[attr-defined]
+    return fused
@@ -0,0 +1,215 @@
+"""Per-stage metrics of pipeline runs, exported as a Prometheus text file and JSON lines.
+
+Metrics are opt-in: ``python -m dlt_tutorial run <pipeline> --metrics`` (and ``serve``) runs the
+script inside a ``ResourceSampler`` and, when it ends, exports the last trace of every pipeline
+it created. The scripts themselves do not change:
+
+    with ResourceSampler() as sampler:
+        load_info = pipeline.run(...)
+    export_metrics(pipeline, sampler)
+
+Every stage (extract, normalize and load) of ``pipeline.last_trace`` records its wall time, the
+CPU time of the process and of the worker processes it waited for, and the peak RSS, which is the
+high-water mark of the process at the end of the stage. The sampler reads the last two in a
+thread, and they are split by stage with the start and end times of the steps of the trace. The
+rows per table are taken from the normalize info, and the bytes per table and the jobs per package
+from the load info.
+
+Each run is appended as a JSON line to ``.metrics/runs.jsonl``, and ``.metrics/<pipeline>.prom``
+is replaced with its metrics, ready for the textfile collector of the Prometheus node exporter.
+"""
+
+import bisect
+import datetime as dt
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+METRICS_DIR = Path(__file__).resolve().parents[2] / ".metrics"
+STAGES = ("extract", "normalize", "load")
+
+# name, help and the key of the value in the stages, tables or packages of a run
+STAGE_METRICS = (
+    ("dlt_stage_duration_seconds", "Wall time of the stage", "duration_s"),
+    ("dlt_stage_cpu_seconds", "CPU time of the stage", "cpu_s"),
+    ("dlt_stage_peak_rss_bytes", "Peak RSS at the end of the stage", "peak_rss_bytes"),
+)
+TABLE_METRICS = (
+    ("dlt_table_rows", "Rows normalized into the table", "rows"),
+    ("dlt_table_bytes", "Bytes of the load jobs of the table", "bytes"),
+)
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_bytes() -> int:
+    """The high-water mark of the resident memory of the process"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports KiB, macOS reports bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ResourceSampler:
+    """Samples the CPU time and the peak RSS of the process in a thread while it is entered"""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.samples: list[tuple[float, float, int]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        self.samples.append((time.time(), _cpu_seconds(), peak_rss_bytes()))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "ResourceSampler":
+        self._stop.clear()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+
+    def usage(self, started: float, finished: float) -> tuple[float, int]:
+        """The CPU seconds spent between two timestamps and the peak RSS at the second one"""
+        times = [sample[0] for sample in self.samples]
+        # the samples around the interval, so a short stage is never measured as zero
+        first = self.samples[max(0, bisect.bisect_right(times, started) - 1)]
+        last = self.samples[min(len(times) - 1, bisect.bisect_left(times, finished))]
+        return last[1] - first[1], last[2]
+
+
+def run_record(
+    trace: Any, pipeline: Any, sampler: ResourceSampler | None = None
+) -> dict:
+    """The metrics of ``trace`` as a dict, as written to ``runs.jsonl``.
+
+    Without a ``sampler``, the stages only have their wall time.
+    """
+    stages: dict[str, dict] = {}
+    tables: dict[str, dict] = {}
+    packages: dict[str, dict] = {}
+    for step in trace.steps:
+        if step.step not in STAGES or step.finished_at is None:
+            continue
+        # pending packages are normalized and loaded first, in steps of their own
+        stage = stages.setdefault(step.step, {"duration_s": 0.0})
+        stage["duration_s"] += (step.finished_at - step.started_at).total_seconds()
+        if sampler is not None:
+            cpu_s, peak = sampler.usage(
+                step.started_at.timestamp(), step.finished_at.timestamp()
+            )
+            stage["cpu_s"] = round(stage.get("cpu_s", 0.0) + cpu_s, 6)
+            stage["peak_rss_bytes"] = peak
+        if step.step == "normalize" and step.step_info:
+            for table_name, count in step.step_info.row_counts.items():
+                table = tables.setdefault(table_name, {"rows": 0, "bytes": 0})
+                table["rows"] += count
+        elif step.step == "load" and step.step_info:
+            for package in step.step_info.load_packages:
+                packages[package.load_id] = {
+                    state: len(jobs) for state, jobs in package.jobs.items()
+                }
+                for job in package.jobs["completed_jobs"]:
+                    table_name = job.job_file_info.table_name
+                    table = tables.setdefault(table_name, {"rows": 0, "bytes": 0})
+                    table["bytes"] += job.file_size
+    return {
+        "pipeline": pipeline.pipeline_name,
+        "destination": (
+            pipeline.destination.destination_name if pipeline.destination else None
+        ),
+        "dataset": pipeline.dataset_name,
+        "started_at": trace.started_at.isoformat(),
+        "finished_at": trace.finished_at.isoformat(),
+        "success": not any(step.step_exception for step in trace.steps),
+        "stages": stages,
+        "tables": tables,
+        "packages": packages,
+    }
+
+
+def to_prometheus(run: dict) -> str:
+    """Formats a run record in the Prometheus text exposition format"""
+    pipeline = f'pipeline="{_label(run["pipeline"])}"'
+    lines = []
+
+    def metric(name: str, help_: str, samples: list[tuple[str, Any]]) -> None:
+        lines.append(f"# HELP {name} {help_}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{{{labels}}} {value}" for labels, value in samples)
+
+    for name, help_, key in STAGE_METRICS:
+        samples = [
+            (f'{pipeline},stage="{stage}"', values[key])
+            for stage, values in run["stages"].items()
+            if key in values
+        ]
+        metric(name, help_, samples)
+    for name, help_, key in TABLE_METRICS:
+        samples = [
+            (f'{pipeline},table="{_label(table)}"', values[key])
+            for table, values in run["tables"].items()
+        ]
+        metric(name, help_, samples)
+    samples = [
+        (f'{pipeline},load_id="{load_id}",state="{state}"', count)
+        for load_id, jobs in run["packages"].items()
+        for state, count in jobs.items()
+    ]
+    metric("dlt_package_jobs", "Jobs of the load package per state", samples)
+    metric(
+        "dlt_run_success",
+        "Whether the last run succeeded",
+        [(pipeline, int(run["success"]))],
+    )
+    metric(
+        "dlt_run_finished_timestamp_seconds",
+        "When the last run finished",
+        [(pipeline, dt.datetime.fromisoformat(run["finished_at"]).timestamp())],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(
+    pipeline: Any,
+    sampler: ResourceSampler | None = None,
+    metrics_dir: Path = METRICS_DIR,
+) -> dict | None:
+    """Exports the last run of ``pipeline`` and returns its record, or None if it ran no stage"""
+    trace = pipeline.last_trace
+    if trace is None or trace.finished_at is None:
+        return None
+    run = run_record(trace, pipeline, sampler)
+    if not run["stages"]:
+        return None
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    with open(metrics_dir / "runs.jsonl", "a") as f:
+        f.write(json.dumps(run) + "\n")
+    path = metrics_dir / f"{pipeline.pipeline_name}.prom"
+    # the textfile collector may read it at any time, so it is replaced at once
+    tmp_path = path.with_suffix(".prom.tmp")
+    tmp_path.write_text(to_prometheus(run))
+    os.replace(tmp_path, path)
+    return run
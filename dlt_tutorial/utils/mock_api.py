@@ -0,0 +1,154 @@
+"""A local HTTP API that serves a synthetic data set with cursor pagination.
+
+It stands in for the REST APIs that production sources page through, with the same record shape
+as ``sample_data``:
+
+    GET /samples/range                        {"first_id": 1, "last_id": 1000000}
+    GET /samples?limit=1000&after=0           {"data": [...], "next_cursor": "1000"}
+    GET /samples?limit=1000&after=0&until=500 {"data": [...], "next_cursor": null}
+
+``after`` is the cursor, the last id of the previous page, and ``until`` optionally stops the
+pages at an id, so clients can walk several ranges of ids at once. Every request waits
+``latency`` seconds before answering, and ``failure_rate`` of them fail with ``503``, to exercise
+retries. Requests are answered in threads, so that many of them can be waiting at once:
+
+    api = start_mock_api(SyntheticData(rows=100_000), latency=0.05)
+    ...  # pages from api.url
+    api.shutdown()
+
+``add_mock_api_arguments`` adds the options of the pipelines that can read from it.
+"""
+
+import argparse
+import datetime as dt
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from utils.data_generator import SyntheticData
+
+DEFAULT_PAGE_SIZE = 1000
+
+
+class MockAPI(ThreadingHTTPServer):
+    """The server, with the data set it serves and how slow and unreliable it is"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+        self, synthetic: SyntheticData, latency: float, failure_rate: float
+    ) -> None:
+        super().__init__(("127.0.0.1", 0), MockAPIHandler)
+        self.synthetic = synthetic
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.metadata = {
+            "ingested_at": dt.datetime.now().isoformat(),
+            "script_name": "mock_api",
+        }
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    server: MockAPI
+
+    def do_GET(self) -> None:
+        api = self.server
+        api.requests += 1
+        time.sleep(api.latency)
+        if api.failure_rate and random.random() < api.failure_rate:
+            api.failures += 1
+            self.respond(503, {"error": "try again"})
+            return
+
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/samples/range":
+            self.respond(200, {"first_id": 1, "last_id": api.synthetic.rows})
+        elif url.path == "/samples":
+            self.respond(200, self.page(params))
+        else:
+            self.respond(404, {"error": f"{url.path} not found"})
+
+    def page(self, params: dict[str, str]) -> dict:
+        api = self.server
+        limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+        after = int(params.get("after", 0))
+        until = min(int(params.get("until", api.synthetic.rows)), api.synthetic.rows)
+        last_id = min(after + limit, until)
+        data = [
+            {**api.synthetic.record(id_), "metadata": dict(api.metadata)}
+            for id_ in range(after + 1, last_id + 1)
+        ]
+        return {
+            "data": data,
+            "next_cursor": str(last_id) if last_id < until else None,
+        }
+
+    def respond(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args) -> None:
+        # one line per request would drown the output of the pipeline
+        pass
+
+
+def start_mock_api(
+    synthetic: SyntheticData, latency: float = 0.05, failure_rate: float = 0.0
+) -> MockAPI:
+    """Starts serving ``synthetic`` on a free local port, in a background thread"""
+    api = MockAPI(synthetic, latency, failure_rate)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    return api
+
+
+def add_mock_api_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options that read the synthetic data set from the mock API"""
+    group = parser.add_argument_group(
+        "mock API",
+        "Page the synthetic data set from a local HTTP API, many pages at once",
+    )
+    group.add_argument(
+        "--mock-api",
+        action="store_true",
+        help="Read the records of --rows from the mock API",
+    )
+    group.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Requests in flight at once (default: %(default)s)",
+    )
+    group.add_argument(
+        "--page-size",
+        type=int,
+        default=DEFAULT_PAGE_SIZE,
+        help="Records per page (default: %(default)s)",
+    )
+    group.add_argument(
+        "--api-latency",
+        type=float,
+        default=0.05,
+        help="Seconds the API waits before answering (default: %(default)s)",
+    )
+    group.add_argument(
+        "--api-failure-rate",
+        type=float,
+        default=0.0,
+        help="Share of requests that fail and are retried (default: %(default)s)",
+    )
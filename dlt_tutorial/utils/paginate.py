@@ -0,0 +1,141 @@
+"""Concurrent, async pagination of the mock API in ``utils/mock_api.py``.
+
+Following a cursor is sequential: the next page can only be requested once the current one
+arrived, so a single cursor spends most of its time waiting on the network. ``paginate`` splits
+the ids of the API (``/samples/range``) into ``concurrency`` ranges and walks the cursor of every
+range at the same time, yielding pages in the order they arrive:
+
+    @dlt.resource
+    async def api_sample_data(base_url: str):
+        async for page in paginate(base_url, concurrency=16):
+            yield page
+
+dlt runs async generators on its own event loop, so there are up to ``concurrency`` requests in
+flight while the pages that already arrived are extracted. Requests that fail with a connection
+error, a timeout or a ``429``/``5xx`` are retried up to ``retries`` times, waiting ``backoff``
+seconds, doubled on every attempt. The HTTP client is a minimal ``GET`` over asyncio streams, so no
+HTTP library is needed.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator
+from urllib.parse import urlencode, urlparse
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_DONE = object()
+
+
+class APIError(Exception):
+    """A request that failed for good"""
+
+
+async def get_json(url: str) -> tuple[int, Any]:
+    """Sends a ``GET`` request to ``url`` and returns the status and the decoded JSON body"""
+    parsed = urlparse(url)
+    reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port or 80)
+    try:
+        target = f"{parsed.path}?{parsed.query}" if parsed.query else parsed.path
+        writer.write(
+            f"GET {target} HTTP/1.1\r\nHost: {parsed.netloc}\r\n"
+            "Connection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = None
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        body = await (
+            reader.readexactly(length) if length is not None else reader.read()
+        )
+        return status, json.loads(body)
+    finally:
+        writer.close()
+
+
+async def get_with_retries(
+    url: str,
+    semaphore: asyncio.Semaphore,
+    retries: int = 3,
+    backoff: float = 0.1,
+    timeout: float = 30.0,
+) -> Any:
+    """``get_json`` with at most as many requests in flight as ``semaphore`` allows"""
+    for attempt in range(retries + 1):
+        async with semaphore:
+            try:
+                status, body = await asyncio.wait_for(get_json(url), timeout)
+            except (OSError, asyncio.TimeoutError, ValueError) as ex:
+                error = repr(ex)
+            else:
+                if status == 200:
+                    return body
+                if status not in RETRY_STATUSES:
+                    raise APIError(f"GET {url} failed with status {status}")
+                error = f"status {status}"
+        if attempt < retries:
+            await asyncio.sleep(backoff * 2**attempt)
+    raise APIError(f"GET {url} failed after {retries + 1} attempts: {error}")
+
+
+def split_ids(first_id: int, last_id: int, parts: int) -> list[tuple[int, int]]:
+    """Splits ``first_id..last_id`` into ``(after, until)`` cursors of up to ``parts`` ranges"""
+    if last_id < first_id:
+        return []
+    size = -(-(last_id - first_id + 1) // max(parts, 1))
+    return [
+        (after, min(after + size, last_id))
+        for after in range(first_id - 1, last_id, size)
+    ]
+
+
+async def paginate(
+    base_url: str,
+    page_size: int = 1000,
+    concurrency: int = 8,
+    retries: int = 3,
+    backoff: float = 0.1,
+) -> AsyncIterator[list[dict]]:
+    """Yields the pages of ``/samples``, walking ``concurrency`` ranges of ids at once"""
+    semaphore = asyncio.Semaphore(concurrency)
+    bounds = await get_with_retries(
+        f"{base_url}/samples/range", semaphore, retries, backoff
+    )
+    ranges = split_ids(bounds["first_id"], bounds["last_id"], concurrency)
+    # walkers wait for the pages to be extracted instead of piling them up in memory
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+
+    async def walk(after: int, until: int) -> None:
+        try:
+            cursor = str(after)
+            while cursor is not None:
+                params = urlencode(
+                    {"limit": page_size, "after": cursor, "until": until}
+                )
+                page = await get_with_retries(
+                    f"{base_url}/samples?{params}", semaphore, retries, backoff
+                )
+                if page["data"]:
+                    await queue.put(page["data"])
+                cursor = page["next_cursor"]
+            await queue.put(_DONE)
+        except Exception as ex:
+            await queue.put(ex)
+
+    walkers = [asyncio.create_task(walk(after, until)) for after, until in ranges]
+    remaining = len(walkers)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is _DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for walker in walkers:
+            walker.cancel()
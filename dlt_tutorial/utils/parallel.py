@@ -0,0 +1,137 @@
+"""Process or thread pool execution of CPU-heavy record transformations.
+
+A ``@dlt.transformer`` runs inline on the extract thread, one item at a time, so a CPU-bound
+transformation caps the whole pipeline at one core. ``parallel_resource`` wraps a plain
+record function in a resource that reads the records of ``data_from``, ships them to a pool of
+workers in batches of ``batch_size`` and yields the transformed batches:
+
+    transform_data = parallel_resource(
+        transform_record, sample_data(rows=1_000_000), name="transform_data", workers=4
+    )
+
+It is a resource and not a transformer: dlt calls a transformer once per item of its parent,
+while the pool needs the whole stream of records to keep its workers busy. So it takes its
+parent as ``data_from`` instead of with ``|``, and transformers can still be piped from it.
+
+With ``executor="process"`` the function runs in worker processes, so it must be importable by
+them (a module level function, or a ``functools.partial`` of one). ``executor="thread"`` keeps
+everything in one process, which is enough for functions that release the GIL (``hashlib``,
+numpy, pyarrow...). Batches come back in input order unless ``ordered`` is ``False``, in which
+case they are yielded as soon as they are done. ``workers``, ``batch_size``, ``ordered`` and
+``executor`` are also arguments of the resource, so they can be set in ``config.toml`` as well,
+under ``[sources.parallel.<name>]``.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Iterable, Iterator
+
+import dlt
+
+EXECUTORS = ("process", "thread")
+
+
+def _transform_batch(func: Callable[[dict], dict], batch: list[dict]) -> list[dict]:
+    return [func(record) for record in batch]
+
+
+def _batches(items: Iterable[Any], batch_size: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for item in items:
+        # parents may yield single records or lists of them
+        if isinstance(item, list):
+            batch.extend(item)
+        else:
+            batch.append(item)
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    if batch:
+        yield batch
+
+
+def _collect(pending: deque[Future], ordered: bool, keep: int) -> Iterator[list[dict]]:
+    """Yields finished batches until at most ``keep`` are left in ``pending``"""
+    while len(pending) > keep:
+        if ordered:
+            yield pending.popleft().result()
+            continue
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            yield future.result()
+
+
+def make_executor(executor: str, workers: int | None) -> Executor:
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    raise ValueError(f"Unknown executor {executor}, expected one of {EXECUTORS}")
+
+
+def parallel_map(
+    func: Callable[[dict], dict],
+    items: Iterable[Any],
+    workers: int | None = None,
+    batch_size: int = 1000,
+    ordered: bool = True,
+    executor: str = "process",
+) -> Iterator[list[dict]]:
+    """Applies ``func`` to every record of ``items`` on a pool of workers, yielding batches.
+
+    At most two batches per worker are in flight, so the records are not all read into memory
+    when the workers fall behind.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+    workers = workers or os.cpu_count() or 1
+    with make_executor(executor, workers) as pool:
+        pending: deque[Future] = deque()
+        for batch in _batches(items, batch_size):
+            pending.append(pool.submit(_transform_batch, func, batch))
+            yield from _collect(pending, ordered, keep=2 * workers - 1)
+        yield from _collect(pending, ordered, keep=0)
+
+
+def parallel_resource(
+    func: Callable[[dict], dict],
+    data_from: Any,
+    name: str | None = None,
+    workers: int | None = None,
+    batch_size: int = 1000,
+    ordered: bool = True,
+    executor: str = "process",
+    **resource_kwargs: Any,
+) -> Any:
+    """Creates a resource that transforms the records of ``data_from`` with ``parallel_map``.
+
+    ``data_from`` is any iterable of records or lists of them, a resource included.
+    ``resource_kwargs`` are passed to ``dlt.resource`` (``primary_key``, ``write_disposition``...).
+    """
+
+    def transform(
+        workers: int | None = workers,
+        batch_size: int = batch_size,
+        ordered: bool = ordered,
+        executor: str = executor,
+    ) -> Iterator[list[dict]]:
+        yield from parallel_map(
+            func,
+            data_from,
+            workers=workers,
+            batch_size=batch_size,
+            ordered=ordered,
+            executor=executor,
+        )
+
+    return dlt.resource(transform, name=name or func.__name__, **resource_kwargs)
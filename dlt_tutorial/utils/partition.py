@@ -0,0 +1,197 @@
+"""Extracts one resource with several generators that run in parallel, one per range of keys.
+
+A resource that reads ids 1 to 10M with a single generator uses a single core, however large the
+source is. ``Partitioning`` splits the range of the key (an ``id`` or a ``created_at``) into
+``partitions`` ranges of the same size, runs one generator per range in its own thread or
+process, and yields their pages as they arrive, into the same resource and so the same table:
+
+    partitioning = Partitioning(partitions=8, executor="process")
+    for page in partitioning.run(synthetic.records_between, start=1, end=10_000_001):
+        ...  # a list of dicts or a pyarrow table, from any of the 8 ranges
+
+Threads suit generators that wait on I/O (an API, a database), processes the ones that spend their
+time in Python, since processes do not share the GIL. Pages made in a process are pickled to the
+resource, which is cheap for pyarrow tables and costs about as much as building them for lists of
+dicts. Every generator has up to ``queue_size`` pages waiting, so memory does not grow when the
+resource falls behind.
+
+The pages of different ranges are interleaved, so the rows do not come in order of the key. An
+``incremental`` cursor on the resource still ends with the largest value, since dlt keeps the
+maximum of every page and not the last one. The resource can start the ranges after the last
+value of its cursor so the rows loaded by earlier runs are not read again.
+"""
+
+import argparse
+import multiprocessing
+import queue
+import threading
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from utils.parallel import EXECUTORS
+
+PARTITION_KEYS = ("id", "created_at")
+
+
+def split_range(start: Any, end: Any, parts: int) -> list[tuple[Any, Any]]:
+    """Splits ``start..end`` (excluded) into up to ``parts`` ranges, of integers or datetimes"""
+    if end <= start:
+        return []
+    parts = max(parts, 1)
+    if isinstance(start, int):
+        size = -(-(end - start) // parts)
+        return [(low, min(low + size, end)) for low in range(start, end, size)]
+    step = (end - start) / parts
+    bounds = [start + step * i for i in range(parts)] + [end]
+    return [(low, high) for low, high in zip(bounds, bounds[1:]) if low < high]
+
+
+def _produce(
+    partition: Callable[[Any, Any], Iterable[Any]],
+    start: Any,
+    end: Any,
+    batch_size: int,
+    pages: Any,
+    stop: Any,
+) -> None:
+    """Puts the pages of one range in ``pages``, then a ``done`` or ``error`` message"""
+    try:
+        rows: list[dict] = []
+        for item in partition(start, end):
+            if stop.is_set():
+                break
+            # single rows are grouped, so there is one message per page and not per row
+            if isinstance(item, dict):
+                rows.append(item)
+                if len(rows) < batch_size:
+                    continue
+                item, rows = rows, []
+            pages.put(("page", item))
+        if rows and not stop.is_set():
+            pages.put(("page", rows))
+    except Exception:
+        pages.put(
+            ("error", f"Range {start} to {end} failed:\n{traceback.format_exc()}")
+        )
+        return
+    pages.put(("done", None))
+
+
+def run_partitions(
+    partition: Callable[[Any, Any], Iterable[Any]],
+    ranges: list[tuple[Any, Any]],
+    executor: str = "process",
+    queue_size: int = 2,
+    batch_size: int = 1000,
+) -> Iterator[Any]:
+    """Runs ``partition(start, end)`` for every range at once and yields the pages they make"""
+    if executor == "thread":
+        pages: Any = queue.Queue(maxsize=queue_size * max(len(ranges), 1))
+        stop: Any = threading.Event()
+        make_worker: Any = threading.Thread
+    elif executor == "process":
+        context = multiprocessing.get_context()
+        pages = context.Queue(maxsize=queue_size * max(len(ranges), 1))
+        stop = context.Event()
+        make_worker = context.Process
+    else:
+        raise ValueError(f"Unknown executor {executor}, expected one of {EXECUTORS}")
+
+    workers = [
+        make_worker(
+            target=_produce,
+            args=(partition, start, end, batch_size, pages, stop),
+            daemon=True,
+        )
+        for start, end in ranges
+    ]
+    for worker in workers:
+        worker.start()
+    running = len(workers)
+    try:
+        while running:
+            kind, item = pages.get()
+            if kind == "page":
+                yield item
+                continue
+            running -= 1
+            if kind == "error":
+                raise RuntimeError(item)
+    finally:
+        # on an error, or if the resource is closed early, the other ranges stop at their next
+        # page, which they can only put if the queue is drained
+        stop.set()
+        while running:
+            kind, _ = pages.get()
+            if kind != "page":
+                running -= 1
+        for worker in workers:
+            worker.join()
+
+
+@dataclass(frozen=True)
+class Partitioning:
+    """How to split the extract of a resource into ranges that run in parallel"""
+
+    by: str = "id"
+    partitions: int = 4
+    executor: str = "process"
+    queue_size: int = 2
+    batch_size: int = 1000
+
+    def __post_init__(self) -> None:
+        if self.by not in PARTITION_KEYS:
+            raise ValueError(f"Unknown key {self.by}, expected one of {PARTITION_KEYS}")
+        if self.partitions < 1:
+            raise ValueError(f"partitions must be at least 1, got {self.partitions}")
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "Partitioning | None":
+        """Returns the options on the command line, or None without ``--partitions``"""
+        if not args.partitions:
+            return None
+        return cls(
+            by=args.partition_by,
+            partitions=args.partitions,
+            executor=args.partition_executor,
+        )
+
+    def run(
+        self, partition: Callable[[Any, Any], Iterable[Any]], start: Any, end: Any
+    ) -> Iterator[Any]:
+        """Yields the pages of ``partition`` over ``start..end`` (excluded), split into ranges"""
+        return run_partitions(
+            partition,
+            split_range(start, end, self.partitions),
+            self.executor,
+            self.queue_size,
+            self.batch_size,
+        )
+
+
+def add_partition_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options that extract the synthetic data with generators running in parallel"""
+    group = parser.add_argument_group(
+        "partitioning",
+        "Split the synthetic data (--rows) into ranges that are extracted in parallel",
+    )
+    group.add_argument(
+        "--partitions",
+        type=int,
+        default=0,
+        help="Number of ranges, each read by its own generator (default: one generator)",
+    )
+    group.add_argument(
+        "--partition-by",
+        choices=PARTITION_KEYS,
+        default="id",
+        help="Key whose range is split (default: %(default)s)",
+    )
+    group.add_argument(
+        "--partition-executor",
+        choices=EXECUTORS,
+        default="process",
+        help="Run the ranges in processes, for CPU-bound generators, or threads, for I/O-bound "
+        "ones (default: %(default)s)",
+    )
@@ -0,0 +1,175 @@
+"""Runs the numbered tutorial scripts by name, importing only what the chosen one needs.
+
+    python -m dlt_tutorial list
+    python -m dlt_tutorial run 7 --destination duckdb -- --rows 100000 --flatten prefix
+    python -m dlt_tutorial serve 4 --interval 60 -- --rows 100000
+
+Pipelines are found by the file names of the numbered scripts (``7`` is
+``7_sample_pipeline_schema.py``), and the packages each of them imports are read from its
+source with ``ast``, so listing them or parsing the command line imports nothing else. ``run``
+imports the packages of the chosen script one by one, reporting the time of each in the format
+of ``python -X importtime`` (cumulative, in microseconds), and then runs the script as
+``__main__`` with the remaining arguments. ``--destination`` sets the default of the
+``--destination`` option of the scripts that build their command line with ``utils/cli.py``, and
+``--metrics`` exports the stages of its run, see ``utils/metrics.py``. ``serve`` keeps running
+the script in the same process, see ``utils/daemon.py``.
+"""
+
+import argparse
+import ast
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterator
+
+from utils.cli import DESTINATION_ENV, DESTINATIONS
+from utils.scripts import TUTORIAL_DIR, run_script
+
+
+def discover_pipelines(tutorial_dir: Path = TUTORIAL_DIR) -> dict[str, Path]:
+    """Maps the number of every script (``4b``) to its path"""
+    scripts = sorted(tutorial_dir.glob("[0-9]*_*.py"))
+    return {script.name.split("_", 1)[0]: script for script in scripts}
+
+
+def script_imports(script: Path) -> list[str]:
+    """The modules imported at the top of ``script``, except for the standard library"""
+    modules = []
+    for node in ast.parse(script.read_text()).body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if (
+                name.split(".")[0] not in sys.stdlib_module_names
+                and name not in modules
+            ):
+                modules.append(name)
+    return modules
+
+
+def import_timed(modules: list[str]) -> Iterator[tuple[str, int]]:
+    """Imports ``modules`` in order, yielding the microseconds each of them took"""
+    for name in modules:
+        start = time.perf_counter_ns()
+        importlib.import_module(name)
+        yield name, (time.perf_counter_ns() - start) // 1000
+
+
+def select_destination(script: Path, destination: str | None) -> None:
+    """Makes ``destination`` the default of the ``--destination`` option of ``script``"""
+    if not destination:
+        return
+    if "utils.cli" not in script_imports(script):
+        sys.exit(f"{script.name} loads into a fixed destination, drop --destination")
+    os.environ[DESTINATION_ENV] = destination
+
+
+def report_imports(script: Path) -> None:
+    """Imports what ``script`` needs and reports the time it took"""
+    total = 0
+    for name, microseconds in import_timed(script_imports(script)):
+        total += microseconds
+        print(f"import time: {microseconds:>10} | {name}", file=sys.stderr)
+    print(f"import time: {total:>10} | total ({script.name})", file=sys.stderr)
+
+
+def run_pipeline(
+    script: Path,
+    argv: list[str],
+    destination: str | None = None,
+    metrics: bool = False,
+) -> None:
+    """Imports what ``script`` needs, reports the time it took and runs it as ``__main__``"""
+    select_destination(script, destination)
+    report_imports(script)
+    run_script(script, argv, metrics)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m dlt_tutorial",
+        description="Run the tutorial pipelines by their number",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the pipelines")
+    run = commands.add_parser("run", help="Run a pipeline")
+    run.add_argument("pipeline", help="Number of the script, e.g. 4b")
+    run.add_argument(
+        "--destination",
+        choices=DESTINATIONS,
+        help="Load into this destination instead of the default of the script",
+    )
+    run.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Export the metrics of the run to .metrics/",
+    )
+    serve = commands.add_parser(
+        "serve", help="Keep a pipeline in memory and run it on every trigger"
+    )
+    serve.add_argument("pipeline", help="Number of the script, e.g. 4b")
+    serve.add_argument(
+        "--destination",
+        choices=DESTINATIONS,
+        help="Load into this destination instead of the default of the script",
+    )
+    serve.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Export the metrics of every run to .metrics/",
+    )
+    when = serve.add_mutually_exclusive_group()
+    when.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        help="Run every this many seconds (default: %(default)s)",
+    )
+    when.add_argument("--socket", help="Run on every connection to this Unix socket")
+    when.add_argument("--watch", help="Run whenever this file is touched")
+    serve.add_argument(
+        "--runs",
+        type=int,
+        default=0,
+        help="Stop after this many runs (default: never)",
+    )
+    trigger = commands.add_parser("trigger", help="Trigger a run of serve --socket")
+    trigger.add_argument("socket", help="Unix socket of the daemon")
+    # everything else is left to the script, e.g. ``-- --rows 1000``
+    args, args.script_args = parser.parse_known_args(argv)
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.command == "trigger":
+        from utils.daemon import trigger
+
+        print(trigger(Path(args.socket)))
+        return
+    pipelines = discover_pipelines()
+    if args.command == "list":
+        for name, script in pipelines.items():
+            print(f"{name:<4} {script.name}")
+        return
+
+    if args.pipeline not in pipelines:
+        sys.exit(
+            f"Unknown pipeline {args.pipeline}, expected one of {', '.join(pipelines)}"
+        )
+    script_args = [arg for arg in args.script_args if arg != "--"]
+    if args.command == "serve":
+        from utils.daemon import serve, triggers_from_args
+
+        script = pipelines[args.pipeline]
+        select_destination(script, args.destination)
+        report_imports(script)
+        serve(script, script_args, triggers_from_args(args), args.runs, args.metrics)
+        return
+    run_pipeline(pipelines[args.pipeline], script_args, args.destination, args.metrics)
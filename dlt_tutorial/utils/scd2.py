@@ -0,0 +1,162 @@
+"""Row hashes and indexes for the ``scd2`` merge strategy.
+
+``scd2`` detects changes by comparing a hash of every row against the hashes of the current rows
+in the destination. By default dlt computes it in the normalize step, over the whole row.
+``add_row_hash`` computes it during extraction instead, from the non-key fields only, and stores
+it in ``ROW_HASH_COLUMN``. Passing that column as ``row_version_column_name`` makes dlt use it
+instead of its own:
+
+    @dlt.resource(
+        primary_key="id",
+        write_disposition={
+            "disposition": "merge",
+            "strategy": "scd2",
+            "row_version_column_name": ROW_HASH_COLUMN,
+        },
+    )
+
+Fields that change on every run, like the ingestion time in ``metadata``, would retire every row
+on every run, so ``exclude`` leaves them out, ``VOLATILE_FIELDS`` by default. Nested fields are
+named by their path, ``metadata.ingested_at``, and the other nested fields are still hashed. Dicts
+and pyarrow tables are hashed in the same form, so a table can switch from one to the other.
+
+The merge looks up the current rows (``_dlt_valid_to IS NULL``) by hash, and closes the ones that
+are gone. Without indexes, Postgres scans the whole history in both statements, and it grows
+with every run. ``create_scd2_indexes`` adds them after a load.
+"""
+
+import datetime as dt
+import hashlib
+import json
+from typing import Any, Sequence
+
+ROW_HASH_COLUMN = "row_hash"
+VALID_TO_COLUMN = "_dlt_valid_to"
+# set from the clock and the command line, not from the source
+VOLATILE_FIELDS = ("metadata.ingested_at", "metadata.script_name")
+
+# the separator of the columns dlt flattens nested fields into
+_SEPARATOR = "__"
+
+
+def _flatten(record: dict, prefix: str = "") -> dict:
+    """The fields of ``record`` with the nested ones named by their path, like dlt names them"""
+    fields = {}
+    for name, value in record.items():
+        name = prefix + name
+        if isinstance(value, dict):
+            fields |= _flatten(value, name + _SEPARATOR)
+        else:
+            fields[name] = value
+    return fields
+
+
+def _is_excluded(name: str, skip: frozenset[str]) -> bool:
+    # leaving out a field leaves out the fields nested in it
+    parts = name.split(_SEPARATOR)
+    return any(_SEPARATOR.join(parts[:i]) in skip for i in range(1, len(parts) + 1))
+
+
+def _canonical(value: Any) -> str:
+    """Datetimes as UTC text, like the timestamps of the dict rows, anything else as ``str``"""
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def _skipped(key: Sequence[str], exclude: Sequence[str]) -> frozenset[str]:
+    names = (*key, *exclude, ROW_HASH_COLUMN)
+    return frozenset(name.replace(".", _SEPARATOR) for name in names)
+
+
+def _hash(fields: dict, skip: frozenset[str]) -> int:
+    values = {
+        name: value
+        for name, value in fields.items()
+        if value is not None and not _is_excluded(name, skip)
+    }
+    payload = json.dumps(values, sort_keys=True, default=_canonical).encode()
+    return int.from_bytes(
+        hashlib.blake2b(payload, digest_size=8).digest(), "big", signed=True
+    )
+
+
+def row_hash(
+    record: dict,
+    key: Sequence[str] = ("id",),
+    exclude: Sequence[str] = VOLATILE_FIELDS,
+) -> int:
+    """A 64-bit hash of the fields of ``record`` that are not in ``key`` or ``exclude``.
+
+    Nested fields are hashed one by one, so ``metadata`` and ``metadata__ingested_at`` columns
+    give the same hash, and missing fields hash like ``None``.
+    """
+    return _hash(_flatten(record), _skipped(key, exclude))
+
+
+def _row_hashes(table: Any, key: Sequence[str], exclude: Sequence[str]) -> Any:
+    """``row_hash`` of every row of a pyarrow table"""
+    import pyarrow as pa
+
+    skip = _skipped(key, exclude)
+    # struct columns, like ``metadata``, become one column per field
+    table = table.flatten()
+    table = table.rename_columns(
+        [name.replace(".", _SEPARATOR) for name in table.schema.names]
+    )
+    table = table.select(
+        [name for name in table.schema.names if not _is_excluded(name, skip)]
+    )
+    return pa.array([_hash(fields, skip) for fields in table.to_pylist()], pa.int64())
+
+
+def add_row_hash(
+    items: Any,
+    key: Sequence[str] = ("id",),
+    exclude: Sequence[str] = VOLATILE_FIELDS,
+) -> Any:
+    """Sets ``ROW_HASH_COLUMN`` on a dict, a list of dicts or a pyarrow table"""
+    if isinstance(items, dict):
+        items[ROW_HASH_COLUMN] = row_hash(items, key, exclude)
+        return items
+    if isinstance(items, list):
+        return [add_row_hash(item, key, exclude) for item in items]
+    if hasattr(items, "append_column"):
+        hashes = _row_hashes(items, key, exclude)
+        if ROW_HASH_COLUMN in items.schema.names:
+            index = items.schema.get_field_index(ROW_HASH_COLUMN)
+            return items.set_column(index, ROW_HASH_COLUMN, hashes)
+        return items.append_column(ROW_HASH_COLUMN, hashes)
+    raise TypeError(f"Cannot hash rows of {type(items).__name__}")
+
+
+def create_scd2_indexes(
+    pipeline: Any, table_name: str, key: Sequence[str] = ("id",)
+) -> list[str]:
+    """Creates the Postgres indexes used by the ``scd2`` merge, if they do not exist yet.
+
+    The natural key and the row hash are indexed for the current rows only, so those indexes
+    stay as small as the latest version of the table. Other destinations are skipped: duckdb
+    scans columns anyway and its indexes only slow down the inserts. Returns the statements
+    that were executed.
+    """
+    if pipeline.destination.destination_name != "postgres":
+        return []
+
+    with pipeline.sql_client() as client:
+        table = client.make_qualified_table_name(table_name)
+        where = f" WHERE {VALID_TO_COLUMN} IS NULL"
+        indexes = {
+            f"{table_name}_key_idx": (", ".join(key), where),
+            f"{table_name}_row_hash_idx": (ROW_HASH_COLUMN, where),
+            f"{table_name}_valid_to_idx": (VALID_TO_COLUMN, ""),
+        }
+        statements = [
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns}){condition}"
+            for name, (columns, condition) in indexes.items()
+        ]
+        for statement in statements:
+            client.execute_sql(statement)
+    return statements
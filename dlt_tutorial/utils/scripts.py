@@ -0,0 +1,66 @@
+"""Imports the numbered tutorial scripts as modules, or runs them as ``__main__``.
+
+Script names such as ``5_sample_pipeline_merge_upsert.py`` are not valid module names, so they
+cannot be imported with a regular ``import`` statement.
+"""
+
+import importlib.util
+import re
+import runpy
+import sys
+from pathlib import Path
+from types import ModuleType
+
+TUTORIAL_DIR = Path(__file__).resolve().parents[1]
+
+
+def module_name_for(script: str | Path) -> str:
+    """Returns a valid module name for a script path relative to `TUTORIAL_DIR`"""
+    relative = Path(script).with_suffix("")
+    return "tutorial_" + re.sub(r"\W", "_", relative.as_posix())
+
+
+def load_script(script: str | Path) -> ModuleType:
+    """Imports `script` (relative to `TUTORIAL_DIR`) without running its `__main__` block"""
+    name = module_name_for(script)
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.spec_from_file_location(name, TUTORIAL_DIR / script)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot import tutorial script {script}")
+    module = importlib.util.module_from_spec(spec)
+    # like when it runs directly, a script can import the modules next to it (``legacy/common.py``)
+    folder = str((TUTORIAL_DIR / script).parent)
+    if folder not in sys.path:
+        sys.path.append(folder)
+    # dlt decorators look the module up in sys.modules while the script is executed
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def run_script(script: Path, argv: list[str], metrics: bool = False) -> None:
+    """Runs ``script`` as ``__main__`` with ``argv``.
+
+    With ``metrics``, the last run of every pipeline the script keeps in a variable is exported,
+    see ``utils/metrics.py``.
+    """
+    sys.argv = [str(script), *argv]
+    if not metrics:
+        runpy.run_path(str(script), run_name="__main__")
+        return
+
+    import dlt
+
+    from utils.metrics import ResourceSampler, export_metrics
+
+    with ResourceSampler() as sampler:
+        namespace = runpy.run_path(str(script), run_name="__main__")
+    for value in namespace.values():
+        if isinstance(value, dlt.Pipeline):
+            export_metrics(value, sampler)
@@ -0,0 +1,65 @@
+"""Vectorized versions of the per-record transformation of the legacy scripts.
+
+``legacy/8`` and ``legacy/10`` compute ``my_transformed_field`` one dict at a time. The
+functions below do the same over whole pyarrow columns with ``pyarrow.compute``, so a page of
+rows costs a handful of calls instead of one Python call per row, and the result is byte for
+byte the same.
+"""
+
+from typing import Any, Iterable
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+TRANSFORMED_FIELD = "my_transformed_field"
+
+
+def normalize_name(name: str) -> str:
+    """The per-record transformation of the legacy scripts"""
+    return name.lower().replace(".", "_").replace(" ", "_")
+
+
+def normalize_names(names: "pa.Array | pa.ChunkedArray | Iterable[str]") -> pa.Array:
+    """``normalize_name`` over a whole column"""
+    if isinstance(names, pa.ChunkedArray):
+        names = names.combine_chunks()
+    elif not isinstance(names, pa.Array):
+        names = pa.array(names, pa.string())
+
+    normalized = pc.replace_substring(
+        pc.replace_substring(pc.ascii_lower(names), ".", "_"), " ", "_"
+    )
+    # ``ascii_lower`` leaves other characters alone and ``utf8_lower`` does not always agree
+    # with ``str.lower`` (which turns "İ" into two code points), so values that are not plain
+    # ascii go through ``normalize_name`` itself
+    is_ascii = pc.string_is_ascii(names)
+    if pc.all(is_ascii).as_py() is not False:
+        return normalized
+    non_ascii = pc.invert(is_ascii)
+    replacements = pa.array(
+        [normalize_name(name) for name in names.filter(non_ascii).to_pylist()],
+        pa.string(),
+    )
+    return pc.replace_with_mask(normalized, non_ascii, replacements)
+
+
+def add_transformed_field(items: Any) -> Any:
+    """Adds ``my_transformed_field``, computed from ``name``, to a batch of items.
+
+    Accepts what dlt passes to ``add_map`` and transformers: a pyarrow table or record batch (the
+    fast path), a list of dicts or a single dict. Returns the same kind of object.
+    """
+    if isinstance(items, dict):
+        items[TRANSFORMED_FIELD] = normalize_name(items["name"])
+        return items
+
+    if isinstance(items, (pa.Table, pa.RecordBatch)):
+        column = normalize_names(items.column("name"))
+        if TRANSFORMED_FIELD in items.schema.names:
+            items = items.drop_columns([TRANSFORMED_FIELD])
+        return items.append_column(TRANSFORMED_FIELD, column)
+
+    values = normalize_names([item["name"] for item in items]).to_pylist()
+    for item, value in zip(items, values):
+        item[TRANSFORMED_FIELD] = value
+    return items
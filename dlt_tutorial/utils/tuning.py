@@ -0,0 +1,95 @@
+"""Normalize and load workers and data writer sizes, from the command line or ``config.toml``.
+
+dlt reads these settings from its config, and they can be scoped to a pipeline name:
+
+    [sample_pipeline_postgres.normalize]
+    workers = 4
+
+    [sample_pipeline_postgres.normalize.data_writer]
+    file_max_items = 100000
+
+``add_tuning_arguments`` adds ``--normalize-workers``, ``--load-workers``, ``--buffer-max-items``,
+``--file-max-items`` and ``--file-max-bytes`` to a parser, and ``apply_tuning`` sets the ones that
+were given as environment variables for the pipeline. They are set on the most specific section
+(``<PIPELINE_NAME>__NORMALIZE__DATA_WRITER__FILE_MAX_ITEMS``) because dlt prefers the more
+specific section over the provider, so they override ``config.toml`` for that run. The data
+writer sizes apply to the files written by both extract and normalize.
+
+``benchmarks/tuning.py`` runs a pipeline over a grid of these values to find the fastest one.
+"""
+
+import argparse
+import os
+from typing import Any
+
+# option -> config sections, below the pipeline name, of the setting
+TUNING_OPTIONS: dict[str, tuple[tuple[str, ...], ...]] = {
+    "normalize_workers": (("normalize", "workers"),),
+    "load_workers": (("load", "workers"),),
+    "buffer_max_items": (
+        ("extract", "data_writer", "buffer_max_items"),
+        ("normalize", "data_writer", "buffer_max_items"),
+    ),
+    "file_max_items": (
+        ("extract", "data_writer", "file_max_items"),
+        ("normalize", "data_writer", "file_max_items"),
+    ),
+    "file_max_bytes": (
+        ("extract", "data_writer", "file_max_bytes"),
+        ("normalize", "data_writer", "file_max_bytes"),
+    ),
+}
+
+
+def add_tuning_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options that override the workers and data writer sizes in ``config.toml``"""
+    group = parser.add_argument_group(
+        "tuning",
+        "Override the workers and data writer sizes of the pipeline in config.toml",
+    )
+    group.add_argument(
+        "--normalize-workers",
+        type=int,
+        help="Processes that normalize the extracted files (dlt default: 1)",
+    )
+    group.add_argument(
+        "--load-workers",
+        type=int,
+        help="Threads that load the normalized files (dlt default: 20)",
+    )
+    group.add_argument(
+        "--buffer-max-items",
+        type=int,
+        help="Items buffered in memory before writing to a file (dlt default: 5000)",
+    )
+    group.add_argument(
+        "--file-max-items",
+        type=int,
+        help="Items per file, which is also a load job (dlt default: no limit)",
+    )
+    group.add_argument(
+        "--file-max-bytes",
+        type=int,
+        help="Bytes per file, which is also a load job (dlt default: no limit)",
+    )
+
+
+def tuning_env(pipeline_name: str, settings: dict[str, Any]) -> dict[str, str]:
+    """The environment variables that set ``settings`` for ``pipeline_name``"""
+    env = {}
+    for option, value in settings.items():
+        if value is None:
+            continue
+        for sections in TUNING_OPTIONS[option]:
+            env["__".join((pipeline_name, *sections)).upper()] = str(value)
+    return env
+
+
+def apply_tuning(pipeline_name: str, args: Any) -> dict[str, str]:
+    """Sets the tuning options given in ``args`` (a namespace or a dict) for ``pipeline_name``"""
+    settings = args if isinstance(args, dict) else vars(args)
+    env = tuning_env(
+        pipeline_name, {option: settings.get(option) for option in TUNING_OPTIONS}
+    )
+    os.environ.update(env)
+    return env
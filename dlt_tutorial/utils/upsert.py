@@ -0,0 +1,36 @@
+"""A unique index on the primary key for the ``upsert`` merge strategy.
+
+On Postgres, dlt loads the changed rows into a staging table and merges them with
+``MERGE INTO ... ON d.id = s.id``. The ``primary_key`` hint alone does not create any index,
+so every merge has to scan the whole target table to find the matching rows, and its cost grows
+with the table instead of with the changes. ``create_primary_key_index`` adds a unique index on
+the key after a load, so the next merges look each row up instead.
+
+A ``unique`` column hint is not enough: dlt only adds the constraint when it creates the table,
+not to a table that already exists. The index also refuses duplicate keys, so the table must not
+be shared with an append pipeline, which is why pipeline 5 loads into its own table.
+"""
+
+from typing import Any, Sequence
+
+
+def create_primary_key_index(
+    pipeline: Any, table_name: str, key: Sequence[str] = ("id",)
+) -> list[str]:
+    """Creates a unique index on ``key`` in Postgres, if it does not exist yet.
+
+    Other destinations are skipped, like in ``create_scd2_indexes``. Returns the statements that
+    were executed.
+    """
+    if pipeline.destination.destination_name != "postgres":
+        return []
+
+    with pipeline.sql_client() as client:
+        table = client.make_qualified_table_name(table_name)
+        columns = ", ".join(client.escape_column_name(name) for name in key)
+        statements = [
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_key_idx ON {table} ({columns})"
+        ]
+        for statement in statements:
+            client.execute_sql(statement)
+    return statements
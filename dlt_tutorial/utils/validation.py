@@ -0,0 +1,112 @@
+"""Batch validation of pages of rows with a Pydantic model.
+
+With ``columns=SampleDataModel``, dlt validates every item it gets with the model and replaces it
+with ``model_dump()`` of the result, so each row costs a model instance and a dump. Arrow tables
+are not validated at all. ``batch_validator`` checks whole pages instead, with one cached
+``TypeAdapter(list[model])`` call per page, and yields the rows as they came in:
+
+    data = validate_in_batches(
+        sample_data(synthetic=synthetic, batch_size=10_000), SampleDataModel, "freeze"
+    )
+
+``contract`` is the schema contract mode applied to both the columns and the data types, like
+dlt does with its validator: ``freeze`` raises on the first invalid row, ``discard_row`` drops
+the invalid rows and ``evolve`` accepts any row. With ``trusted_sample``, only that many rows
+of each page, evenly spaced, are validated. This is meant for sources that are already known to
+produce valid rows, where a broken page still shows up but a single bad row may not.
+
+The destination columns are derived from the model once, by ``model_columns``, and set as
+plain column hints, so dlt does not put its own validator back.
+"""
+
+import functools
+from typing import Any
+
+CONTRACT_MODES = ("freeze", "evolve", "discard_row")
+
+
+@functools.cache
+def list_adapter(model: type, contract: str = "freeze") -> Any:
+    """A ``TypeAdapter`` for lists of ``model``, with ``contract`` applied to it"""
+    from dlt.common.libs.pydantic import apply_schema_contract_to_model
+    from pydantic import TypeAdapter
+
+    if contract not in CONTRACT_MODES:
+        raise ValueError(
+            f"Unknown contract {contract}, expected one of {CONTRACT_MODES}"
+        )
+    contract_model = apply_schema_contract_to_model(model, contract, contract)
+    return TypeAdapter(list[contract_model])
+
+
+@functools.cache
+def model_columns(model: type) -> dict:
+    """The column schema of ``model``, computed once per model"""
+    from dlt.common.libs.pydantic import pydantic_to_table_schema_columns
+
+    return pydantic_to_table_schema_columns(model)
+
+
+def _sample_positions(size: int, trusted_sample: int) -> list[int]:
+    if not trusted_sample or trusted_sample >= size:
+        return list(range(size))
+    step = size / trusted_sample
+    return [int(i * step) for i in range(trusted_sample)]
+
+
+def validate_batch(
+    model: type, items: Any, contract: str = "freeze", trusted_sample: int = 0
+) -> Any:
+    """Validates a list of dicts or a pyarrow table with ``model``, returning the valid rows"""
+    from pydantic import ValidationError
+
+    adapter = list_adapter(model, contract)
+    is_table = hasattr(items, "to_pylist")
+    positions = _sample_positions(len(items), trusted_sample)
+    if is_table:
+        rows = items.take(positions).to_pylist()
+    elif len(positions) == len(items):
+        rows = items
+    else:
+        rows = [items[position] for position in positions]
+
+    try:
+        adapter.validate_python(rows)
+        return items
+    except ValidationError as ex:
+        if contract == "freeze":
+            raise
+        # discard_row, since `evolve` accepts any row. Errors are located as
+        # (<index in the list>, <field>, ...)
+        dropped = {positions[error["loc"][0]] for error in ex.errors()}
+
+    if is_table:
+        import pyarrow as pa
+
+        keep = [position not in dropped for position in range(len(items))]
+        return items.filter(pa.array(keep))
+    return [item for position, item in enumerate(items) if position not in dropped]
+
+
+def batch_validator(
+    model: type, contract: str = "freeze", trusted_sample: int = 0
+) -> Any:
+    """Creates a resource step that runs ``validate_batch`` on every page"""
+
+    def validate(items: Any) -> Any:
+        if isinstance(items, dict):
+            items = [items]
+        return validate_batch(model, items, contract, trusted_sample)
+
+    return validate
+
+
+def validate_in_batches(
+    resource: Any, model: type, contract: str = "freeze", trusted_sample: int = 0
+) -> Any:
+    """Replaces the per-row validator of ``resource`` with ``batch_validator``"""
+    # a model in ``columns`` creates a validator again whenever the hints change
+    resource.apply_hints(columns=model_columns(model))
+    resource.validator = None
+    # ``add_map`` would call it once per row of a list, a plain step gets the whole page
+    return resource.add_step(batch_validator(model, contract, trusted_sample))
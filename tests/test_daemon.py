@@ -0,0 +1,33 @@
+import dlt
+
+from utils.daemon import keep_pipelines
+
+
+def test_keep_pipelines_reuses_the_pipeline_and_the_configured_duckdb(
+    tmp_path, monkeypatch
+):
+    # ``keep_pipelines`` replaces ``dlt.pipeline``, which monkeypatch restores afterwards
+    monkeypatch.setattr(dlt, "pipeline", dlt.pipeline)
+    database = tmp_path / "configured.duckdb"
+    monkeypatch.setenv("DESTINATION__DUCKDB__CREDENTIALS", str(database))
+    pipelines = keep_pipelines()
+
+    kwargs = {"destination": "duckdb", "pipelines_dir": str(tmp_path / "pipelines")}
+    pipeline = dlt.pipeline("test_daemon", **kwargs)
+    assert dlt.pipeline("test_daemon", **kwargs) is pipeline
+    assert pipelines == {"test_daemon": pipeline}
+
+    for _ in range(2):
+        pipeline.run([{"id": 1}], table_name="samples")
+    assert database.exists()
+    with pipeline.sql_client() as client:
+        assert client.execute_sql("select count(*) from samples")[0][0] == 2
+
+
+def test_keep_pipelines_accepts_a_pipeline_without_destination(tmp_path, monkeypatch):
+    monkeypatch.setattr(dlt, "pipeline", dlt.pipeline)
+    keep_pipelines()
+    pipeline = dlt.pipeline(
+        "test_daemon_no_destination", pipelines_dir=str(tmp_path / "pipelines")
+    )
+    assert pipeline.destination is None
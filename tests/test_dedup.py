@@ -0,0 +1,95 @@
+import dlt
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from utils.data_generator import SyntheticData
+from utils.dedup import BloomFilter, DropSeenKeys, SortedKeys, state_size
+from utils.scripts import load_script
+
+
+def test_sorted_keys_survive_the_state():
+    seen = SortedKeys()
+    seen.add(np.array([5, 1, 3], dtype=np.int64))
+    seen.add(np.array([4], dtype=np.int64))
+    restored = SortedKeys.from_state(seen.to_state())
+    assert restored.keys.tolist() == [1, 3, 4, 5]
+    found = restored.contains(np.array([1, 2, 5, 6], dtype=np.int64))
+    assert found.tolist() == [True, False, True, False]
+
+
+def test_bloom_filter_finds_every_key_and_few_others():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    bloom.add(np.arange(10_000, dtype=np.int64))
+    restored = BloomFilter.from_state(bloom.to_state())
+    assert restored.contains(np.arange(10_000, dtype=np.int64)).all()
+    unseen = restored.contains(np.arange(10_000, 110_000, dtype=np.int64))
+    assert unseen.mean() < 0.02
+
+
+def test_sorted_keys_past_the_limit_are_saved_as_a_bloom_filter():
+    dedup = DropSeenKeys("sorted", capacity=1000, error_rate=0.01, max_state_mib=2**-8)
+    seen = SortedKeys()
+    # sparse keys hardly compress, 1000 of them take more than the 4 KiB of the limit
+    keys = np.unique(np.random.default_rng(0).integers(0, 2**40, 1000))
+    seen.add(keys)
+    assert state_size(seen.to_state()) > 2**12
+    state = dedup.save(seen)
+    assert state["kind"] == "bloom"
+    assert state_size(state) <= 2**12
+    assert dedup.load(state).contains(keys).all()
+
+
+def test_a_bloom_filter_larger_than_the_limit_is_refused():
+    with pytest.raises(ValueError):
+        DropSeenKeys("bloom", capacity=10_000_000, max_state_mib=8.0).new_structure()
+    assert DropSeenKeys().new_structure().kind == "bloom"
+
+
+def test_drop_seen_drops_the_keys_of_earlier_runs_and_batches(tmp_path):
+    dedup = DropSeenKeys("sorted", batch_size=2)
+
+    @dlt.resource
+    def rows(items):
+        yield from dedup.drop_seen(items, key="id")
+
+    pipeline = dlt.pipeline(
+        "test_dedup",
+        destination=dlt.destinations.duckdb(str(tmp_path / "test_dedup.duckdb")),
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    pipeline.run(rows([{"id": 1}, {"id": 2}, {"id": 2}]), table_name="samples")
+    pipeline.run(rows([{"id": 2}, {"id": 3}]), table_name="samples")
+    # pyarrow tables are filtered too, with the keys of the runs before
+    pipeline.run(rows([pa.table({"id": [3, 4, 4]})]), table_name="arrow_samples")
+    with pipeline.sql_client() as client:
+        ids = client.execute_sql("select id from samples order by id")
+        arrow_ids = client.execute_sql("select id from arrow_samples")
+    assert [id_ for (id_,) in ids] == [1, 2, 3]
+    assert [id_ for (id_,) in arrow_ids] == [4]
+
+
+def test_append_pipeline_loads_every_row_once(tmp_path):
+    sample_data = load_script("4_sample_pipeline_append.py").sample_data
+    synthetic = SyntheticData(rows=100)
+    pipeline = dlt.pipeline(
+        "test_dedup_append",
+        destination=dlt.destinations.duckdb(str(tmp_path / "test_dedup.duckdb")),
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    for _ in range(2):
+        data = sample_data(synthetic=synthetic, dedup=DropSeenKeys("bloom"))
+        pipeline.run(data, table_name="samples")
+    # a new pipeline instance reads the keys back from the destination
+    pipeline.drop()
+    pipeline = dlt.pipeline(
+        "test_dedup_append",
+        destination=dlt.destinations.duckdb(str(tmp_path / "test_dedup.duckdb")),
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    pipeline.sync_destination()
+    data = sample_data(synthetic=synthetic, dedup=DropSeenKeys("bloom"))
+    pipeline.run(data, table_name="samples")
+    with pipeline.sql_client() as client:
+        rows = client.execute_sql("select count(*), count(distinct id) from samples")
+    assert rows[0] == (100, 100)
@@ -0,0 +1,100 @@
+import dlt
+
+from utils.fanout import Target, fan_out
+
+
+@dlt.resource(write_disposition="replace")
+def samples(rows: int):
+    dlt.current.resource_state()["last_id"] = rows
+    yield [{"id": id_, "metadata": {"rows": rows}} for id_ in range(1, rows + 1)]
+
+
+@dlt.source
+def sample_source(rows: int = 10):
+    return samples(rows)
+
+
+def targets(tmp_path, *formats):
+    return [
+        Target(
+            dlt.destinations.duckdb(str(tmp_path / f"{i}.duckdb")), file_format, str(i)
+        )
+        for i, file_format in enumerate(formats)
+    ]
+
+
+def test_fan_out_loads_every_target_with_its_own_load_ids(tmp_path):
+    # the second target of each format loads the files normalized by the first one
+    formats = ("parquet", "jsonl", None, "parquet", "jsonl", None, "insert_values")
+    fanned_out = targets(tmp_path, *formats)
+    results = fan_out(
+        sample_source(),
+        "test_fan_out",
+        fanned_out,
+        dataset_name="sample_data",
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    assert list(results) == [target.name for target in fanned_out]
+    load_ids = {result.loads_ids[0] for result in results.values()}
+    assert len(load_ids) == len(fanned_out)
+    for target in fanned_out:
+        pipeline = dlt.pipeline(
+            f"test_fan_out_{target.name}",
+            destination=target.destination,
+            dataset_name="sample_data",
+            pipelines_dir=str(tmp_path / "pipelines"),
+        )
+        (load_id,) = results[target.name].loads_ids
+        with pipeline.sql_client() as client:
+            # the rows point to a load of their own destination
+            rows = client.execute_sql(
+                "select count(*) from samples s join _dlt_loads l "
+                "on s._dlt_load_id = l.load_id where l.load_id = %s",
+                load_id,
+            )
+        assert rows[0][0] == 10
+
+
+def test_fan_out_targets_are_restored_from_their_destination(tmp_path):
+    fan_out(
+        sample_source(rows=3),
+        "test_fan_out_state",
+        targets(tmp_path, "parquet", "insert_values"),
+        dataset_name="sample_data",
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    for i in range(2):
+        kwargs = {
+            "destination": dlt.destinations.duckdb(str(tmp_path / f"{i}.duckdb")),
+            "dataset_name": "sample_data",
+            # a machine that never ran the pipeline
+            "pipelines_dir": str(tmp_path / "restored"),
+        }
+        pipeline = dlt.pipeline(f"test_fan_out_state_{i}", **kwargs)
+        pipeline.sync_destination()
+        resources = pipeline.state["sources"]["sample_source"]["resources"]
+        assert resources["samples"] == {"last_id": 3}
+        with pipeline.sql_client() as client:
+            names = client.execute_sql("select pipeline_name from _dlt_pipeline_state")
+        assert names == [(f"test_fan_out_state_{i}",)]
+
+
+def test_fan_out_leaves_the_package_of_a_failed_target_pending(tmp_path):
+    broken = Target(
+        dlt.destinations.duckdb(str(tmp_path / "missing" / "broken.duckdb")),
+        name="broken",
+    )
+    results = fan_out(
+        sample_source(),
+        "test_fan_out_retry",
+        [*targets(tmp_path, "parquet"), broken],
+        dataset_name="sample_data",
+        retries=0,
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    assert not isinstance(results["0"], Exception)
+    assert isinstance(results["broken"], Exception)
+    pipeline = dlt.pipeline(
+        "test_fan_out_retry_broken", pipelines_dir=str(tmp_path / "pipelines")
+    )
+    assert pipeline.list_normalized_load_packages()
@@ -0,0 +1,34 @@
+import pyarrow as pa
+
+from utils.file_source import read_csv, read_jsonl
+
+
+def test_read_jsonl_widens_columns_that_are_null_or_integer_in_the_first_chunk(
+    tmp_path,
+):
+    path = tmp_path / "samples.jsonl"
+    lines = [f'{{"id": {i}, "name": null, "score": {i}}}' for i in range(10)]
+    lines += [f'{{"id": {i}, "name": "mario", "score": {i}.5}}' for i in range(10, 20)]
+    path.write_text("\n".join(lines) + "\n")
+
+    tables = list(read_jsonl(path, chunk_bytes=64, parser="arrow"))
+    assert len(tables) > 2
+    assert tables[-1].schema.field("name").type == pa.string()
+    assert tables[-1].schema.field("score").type == pa.float64()
+    rows = pa.concat_tables(tables, promote_options="permissive").to_pylist()
+    assert [row["name"] for row in rows] == [None] * 10 + ["mario"] * 10
+    assert rows[-1]["score"] == 19.5
+
+
+def test_read_csv_widens_columns_that_are_empty_in_the_first_chunk(tmp_path):
+    path = tmp_path / "samples.csv"
+    lines = ["id,name,score"] + [f"{i},,{i}" for i in range(10)]
+    lines += [f"{i},mario,{i}.5" for i in range(10, 20)]
+    path.write_text("\n".join(lines) + "\n")
+
+    tables = list(read_csv(path, chunk_bytes=32))
+    assert len(tables) > 2
+    assert tables[-1].schema.field("name").type == pa.string()
+    assert tables[-1].schema.field("score").type == pa.float64()
+    rows = pa.concat_tables(tables, promote_options="permissive").to_pylist()
+    assert rows[-1] == {"id": 19, "name": "mario", "score": 19.5}
@@ -0,0 +1,87 @@
+import dlt
+import pyarrow as pa
+
+from utils.fingerprint import STATE_KEY, Fingerprint, Unchanged, run_if_changed
+
+
+def make_pipeline(tmp_path, name):
+    return dlt.pipeline(
+        name,
+        destination=dlt.destinations.duckdb(str(tmp_path / f"{name}.duckdb")),
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+
+
+def count(pipeline, table_name):
+    with pipeline.sql_client() as client:
+        return client.execute_sql(f"select count(*) from {table_name}")[0][0]
+
+
+def rows(ingested_at):
+    return [
+        {"id": i, "name": f"name {i}", "metadata": {"ingested_at": ingested_at}}
+        for i in range(10)
+    ]
+
+
+def test_run_if_changed_skips_the_same_rows(tmp_path):
+    pipeline = make_pipeline(tmp_path, "test_fingerprint")
+    load_info = run_if_changed(
+        pipeline, rows("first"), Fingerprint(), table_name="samples"
+    )
+    assert not isinstance(load_info, Unchanged)
+    # the excluded column changes, and the rows come in another order
+    unchanged = run_if_changed(
+        pipeline, list(reversed(rows("second"))), Fingerprint(), table_name="samples"
+    )
+    assert isinstance(unchanged, Unchanged)
+    assert str(unchanged) == (
+        "No changes since the last run of test_fingerprint, "
+        "skipped the normalize and load steps"
+    )
+    assert not pipeline.has_pending_data
+    assert count(pipeline, "samples") == 10
+    assert pipeline.get_local_state_val(STATE_KEY)["samples"]["rows"] == 10
+
+    changed = rows("third") + [{"id": 10, "name": "name 10"}]
+    load_info = run_if_changed(pipeline, changed, Fingerprint(), table_name="samples")
+    assert not isinstance(load_info, Unchanged)
+    assert count(pipeline, "samples") == 21
+
+
+def test_run_if_changed_skips_a_cursor_with_nothing_new(tmp_path):
+    pipeline = make_pipeline(tmp_path, "test_fingerprint_cursor")
+
+    @dlt.resource(name="samples", write_disposition="merge", primary_key="id")
+    def samples(updated_at=dlt.sources.incremental("id")):
+        # like pipeline 5, the last row is read again
+        yield from (r for r in rows("now") if r["id"] >= (updated_at.last_value or 0))
+
+    assert not isinstance(run_if_changed(pipeline, samples(), Fingerprint()), Unchanged)
+    assert isinstance(run_if_changed(pipeline, samples(), Fingerprint()), Unchanged)
+    assert isinstance(run_if_changed(pipeline, samples(), Fingerprint()), Unchanged)
+    resources = pipeline.state["sources"][pipeline.default_schema_name]["resources"]
+    assert resources["samples"]["incremental"]["id"]["last_value"] == 9
+
+
+def test_run_if_changed_hashes_arrow_tables(tmp_path):
+    pipeline = make_pipeline(tmp_path, "test_fingerprint_arrow")
+
+    def table(ingested_at):
+        return pa.table(
+            {"id": list(range(10)), "metadata__ingested_at": [ingested_at] * 10}
+        )
+
+    loads = [
+        run_if_changed(pipeline, table(at), Fingerprint(), table_name="samples")
+        for at in ("first", "second")
+    ]
+    assert [isinstance(load, Unchanged) for load in loads] == [False, True]
+    assert count(pipeline, "samples") == 10
+
+
+def test_run_if_changed_without_fingerprint_runs(tmp_path):
+    pipeline = make_pipeline(tmp_path, "test_fingerprint_none")
+    for _ in range(2):
+        run_if_changed(pipeline, rows("now"), None, table_name="samples")
+    assert count(pipeline, "samples") == 20
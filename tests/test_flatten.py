@@ -0,0 +1,80 @@
+import dlt
+import pyarrow as pa
+import pytest
+
+from utils.flatten import flatten_nested, flatten_record, flatten_table
+
+RECORD = {
+    "id": 1,
+    "metadata": {"script_name": "a.py", "source": {"kind": "api", "page": 2}},
+    "tags": ["x", "y"],
+}
+
+
+def test_flatten_record_folds_every_level_by_default():
+    assert flatten_record(RECORD) == {
+        "id": 1,
+        "metadata__script_name": "a.py",
+        "metadata__source__kind": "api",
+        "metadata__source__page": 2,
+        "tags": ["x", "y"],
+    }
+
+
+def test_flatten_record_stops_at_max_depth():
+    assert flatten_record(RECORD, max_depth=1) == {
+        "id": 1,
+        "metadata__script_name": "a.py",
+        "metadata__source": {"kind": "api", "page": 2},
+        "tags": ["x", "y"],
+    }
+    assert flatten_record(RECORD, max_depth=0) == RECORD
+
+
+@pytest.mark.parametrize("max_depth", [None, 1, 0])
+def test_flatten_table_matches_flatten_record(max_depth):
+    table = flatten_table(pa.Table.from_pylist([RECORD]), max_depth)
+    assert table.to_pylist() == [flatten_record(RECORD, max_depth)]
+
+
+def extract(tmp_path, resource):
+    pipeline = dlt.pipeline(
+        "test_flatten",
+        destination=dlt.destinations.duckdb(str(tmp_path / "test_flatten.duckdb")),
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    pipeline.extract(resource)
+    pipeline.normalize()
+    return pipeline.default_schema
+
+
+@dlt.resource(name="samples")
+def samples(pages: bool = True):
+    rows = [{**RECORD, "id": id_} for id_ in range(3)]
+    if pages:
+        yield rows
+    else:
+        yield from rows
+
+
+@pytest.mark.parametrize("pages", [True, False])
+@pytest.mark.parametrize(
+    "mode, max_depth, json_columns",
+    [
+        ("prefix", None, {"tags"}),
+        ("prefix", 1, {"metadata__source", "tags"}),
+        ("json", None, {"metadata", "tags"}),
+    ],
+)
+def test_flatten_nested_keeps_one_table(tmp_path, mode, max_depth, json_columns, pages):
+    schema = extract(tmp_path, flatten_nested(samples(pages), mode, max_depth))
+    assert schema.data_table_names() == ["samples"]
+    columns = schema.get_table("samples")["columns"]
+    assert {
+        name for name, column in columns.items() if column["data_type"] == "json"
+    } == json_columns
+
+
+def test_flatten_nested_refuses_unknown_modes():
+    with pytest.raises(ValueError, match="Unknown mode"):
+        flatten_nested(samples(), mode="tables")
@@ -0,0 +1,91 @@
+import datetime as dt
+
+import dlt
+import pyarrow as pa
+import pytest
+
+from utils.data_generator import SyntheticData
+from utils.frozen_schema import compile_plan, load_plan, with_frozen_schema
+
+SCHEMA = {
+    "name": "samples",
+    "columns": {
+        "id": {"data_type": "bigint", "nullable": False},
+        "created_at": {"data_type": "timestamp"},
+        "metadata__script_name": {"data_type": "text"},
+    },
+}
+
+
+def test_compile_plan_builds_nested_columns_of_the_schema_types():
+    plan = compile_plan(SCHEMA, "v1")
+    table = plan.apply(
+        [
+            {
+                "id": 1,
+                "created_at": "2025-10-01 00:01:00",
+                "metadata": {"script_name": "a"},
+            },
+            {"id": 2, "created_at": "2025-10-01 02:00:00", "metadata": None},
+        ]
+    )
+    assert table.schema == plan.arrow_schema
+    assert table.schema.field("id").nullable is False
+    # timestamps without an offset are UTC
+    assert table.column("created_at").to_pylist() == [
+        dt.datetime(2025, 10, 1, 0, 1, tzinfo=dt.timezone.utc),
+        dt.datetime(2025, 10, 1, 2, 0, tzinfo=dt.timezone.utc),
+    ]
+    assert table.column("metadata__script_name").to_pylist() == ["a", None]
+    offsets = plan.apply([{"id": 3, "created_at": "2025-10-01T02:00:00+02:00"}])
+    assert offsets.column("created_at").to_pylist() == [
+        dt.datetime(2025, 10, 1, 0, 0, tzinfo=dt.timezone.utc)
+    ]
+    assert plan.columns["id"] == {
+        "name": "id",
+        "data_type": "bigint",
+        "nullable": False,
+    }
+
+
+def test_compile_plan_refuses_data_types_without_an_arrow_type():
+    schema = {"name": "samples", "columns": {"payload": {"data_type": "json"}}}
+    with pytest.raises(
+        ValueError, match="Column payload of samples has data type json"
+    ):
+        compile_plan(schema, "v1")
+
+
+def test_plan_apply_refuses_rows_with_unknown_fields():
+    with pytest.raises(ValueError, match="not in samples"):
+        compile_plan(SCHEMA, "v1").apply([{"id": 1, "random_field": "x"}])
+
+
+def test_load_plan_compiles_the_file_again_only_when_it_changes(tmp_path):
+    path = tmp_path / "samples.schema.yaml"
+    path.write_text("name: samples\ncolumns:\n  id:\n    data_type: bigint\n")
+    plan = load_plan("samples", tmp_path)
+    assert load_plan("samples", tmp_path) is plan
+    path.write_text("name: samples\ncolumns:\n  id:\n    data_type: text\n")
+    changed = load_plan("samples", tmp_path)
+    assert changed.version != plan.version
+    assert changed.arrow_schema.field("id").type == pa.string()
+
+
+def test_with_frozen_schema_converts_pages_and_passes_misfits_as_dicts():
+    plan = load_plan("samples")
+    records = list(SyntheticData(rows=10).records())
+    misfits = [{**records[0], "random_field": "x"}]
+
+    @dlt.resource
+    def samples():
+        yield records
+        yield misfits
+
+    resource = with_frozen_schema(samples(), plan)
+    assert resource.columns == plan.columns
+    table, *rows = list(resource)
+    assert isinstance(table, pa.Table)
+    assert table.schema == plan.arrow_schema
+    assert table.column("id").to_pylist() == list(range(1, 11))
+    assert rows == misfits
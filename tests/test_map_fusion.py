@@ -0,0 +1,84 @@
+import pyarrow as pa
+import pytest
+
+from utils.map_fusion import AddColumn, Cast, Drop, Map, Rename, fuse, plan
+
+
+def upper(value: str) -> str:
+    return value.upper()
+
+
+def test_plan_moves_drops_in_front_of_unrelated_steps():
+    steps = (AddColumn("upper", upper, source="name"), Drop("random_field"))
+    assert plan(steps) == [
+        Drop("random_field"),
+        AddColumn("upper", upper, source="name"),
+    ]
+
+
+def test_plan_removes_steps_whose_output_is_dropped():
+    steps = (AddColumn("upper", upper, source="name"), Cast("id", str), Drop("upper"))
+    assert plan(steps) == [Drop("upper"), Cast("id", str)]
+
+
+def test_plan_keeps_drops_after_steps_that_read_the_column():
+    steps = (AddColumn("upper", upper, source="name"), Drop("name"))
+    assert plan(steps) == list(steps)
+
+
+def test_plan_keeps_drops_after_renames_and_maps():
+    renamed = (Rename("name", "full_name"), Drop("full_name"))
+    assert plan(renamed) == list(renamed)
+    mapped = (Map(dict), Drop("name"))
+    assert plan(mapped) == list(mapped)
+
+
+def test_plan_merges_neighbouring_drops():
+    steps = (Drop("a"), Drop("b"), AddColumn("upper", upper, source="name"))
+    drop, add_column = plan(steps)
+    assert sorted(drop.columns) == ["a", "b"]
+    assert add_column == AddColumn("upper", upper, source="name")
+
+
+def test_fuse_matches_chained_maps_on_dicts():
+    steps = (
+        AddColumn("upper", upper, source="name"),
+        Rename("id", "key"),
+        Cast("key", str),
+        Map(lambda record: {**record, "mapped": True}),
+        Drop("random_field"),
+    )
+    fused = fuse(*steps)
+    record = {"id": 1, "name": "mario", "random_field": "x"}
+    expected = {"name": "mario", "upper": "MARIO", "key": "1", "mapped": True}
+    assert fused(dict(record)) == expected
+    assert fused([dict(record), dict(record)]) == [expected, expected]
+
+
+def test_fuse_applies_steps_to_pyarrow_tables():
+    fused = fuse(
+        AddColumn("upper", upper, source="name"),
+        Cast("id", str),
+        Rename("id", "key"),
+        Drop("random_field"),
+    )
+    table = pa.table(
+        {"id": [1, 2], "name": ["mario", "luigi"], "random_field": ["x", "y"]}
+    )
+    result = fused(table)
+    assert result.schema.names == ["key", "name", "upper"]
+    assert result.column("upper").to_pylist() == ["MARIO", "LUIGI"]
+    assert result.column("key").to_pylist() == ["1", "2"]
+
+
+def test_fuse_uses_the_vectorized_function_on_tables():
+    fused = fuse(
+        AddColumn("upper", upper, source="name", vectorized=lambda column: column)
+    )
+    table = pa.table({"name": ["mario"]})
+    assert fused(table).column("upper").to_pylist() == ["mario"]
+
+
+def test_fuse_refuses_unknown_casts():
+    with pytest.raises(ValueError):
+        fuse(Cast("id", list))
@@ -0,0 +1,66 @@
+import json
+
+import dlt
+
+from utils.metrics import ResourceSampler, export_metrics, to_prometheus
+
+
+def test_sampler_splits_usage_by_the_samples_around_the_interval():
+    sampler = ResourceSampler()
+    sampler.samples = [(0.0, 1.0, 100), (1.0, 1.5, 200), (2.0, 3.0, 300)]
+    assert sampler.usage(0.5, 1.5) == (2.0, 300)
+    assert sampler.usage(1.0, 1.0) == (0.0, 200)
+    # a stage that ends after the last sample is measured up to it
+    assert sampler.usage(1.0, 5.0) == (1.5, 300)
+
+
+def test_sampler_samples_while_entered():
+    with ResourceSampler(interval=0.001) as sampler:
+        sum(range(100_000))
+    assert len(sampler.samples) >= 2
+    assert sampler.samples[-1][1] >= sampler.samples[0][1]
+
+
+def test_export_metrics_reads_the_last_trace(tmp_path):
+    pipeline = dlt.pipeline(
+        "test_metrics",
+        destination=dlt.destinations.duckdb(str(tmp_path / "test_metrics.duckdb")),
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    with ResourceSampler() as sampler:
+        pipeline.run([{"id": 1}, {"id": 2}], table_name="samples")
+
+    run = export_metrics(pipeline, sampler, tmp_path / "metrics")
+    assert set(run["stages"]) == {"extract", "normalize", "load"}
+    assert run["stages"]["load"]["peak_rss_bytes"] > 0
+    assert run["tables"]["samples"]["rows"] == 2
+    assert run["success"]
+    with open(tmp_path / "metrics" / "runs.jsonl") as f:
+        assert json.loads(f.readline()) == run
+    prom = (tmp_path / "metrics" / "test_metrics.prom").read_text()
+    assert prom == to_prometheus(run)
+    assert 'dlt_table_rows{pipeline="test_metrics",table="samples"} 2' in prom
+
+
+def test_export_metrics_skips_a_pipeline_that_did_not_run(tmp_path):
+    pipeline = dlt.pipeline(
+        "test_metrics_idle",
+        destination="duckdb",
+        pipelines_dir=str(tmp_path / "pipelines"),
+    )
+    assert export_metrics(pipeline, metrics_dir=tmp_path / "metrics") is None
+    assert not (tmp_path / "metrics").exists()
+
+
+def test_to_prometheus_leaves_out_the_values_a_stage_does_not_have():
+    run = {
+        "pipeline": "p",
+        "stages": {"extract": {"duration_s": 1.0}},
+        "tables": {},
+        "packages": {},
+        "success": True,
+        "finished_at": "2026-01-01T00:00:00+00:00",
+    }
+    prom = to_prometheus(run)
+    assert 'dlt_stage_duration_seconds{pipeline="p",stage="extract"} 1.0' in prom
+    assert "dlt_stage_cpu_seconds{" not in prom
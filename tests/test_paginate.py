@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from utils import paginate as paginate_module
+from utils.data_generator import SyntheticData
+from utils.mock_api import start_mock_api
+from utils.paginate import APIError, get_with_retries, paginate, split_ids
+
+
+@pytest.fixture
+def unreliable_api():
+    api = start_mock_api(SyntheticData(rows=2500), latency=0.001, failure_rate=0.3)
+    yield api
+    api.shutdown()
+
+
+def collect(base_url: str, **kwargs) -> list[list[dict]]:
+    async def pages():
+        return [page async for page in paginate(base_url, **kwargs)]
+
+    return asyncio.run(pages())
+
+
+def test_split_ids_covers_every_id_once():
+    assert split_ids(1, 10, 3) == [(0, 4), (4, 8), (8, 10)]
+    assert split_ids(1, 2, 8) == [(0, 1), (1, 2)]
+    assert split_ids(1, 10, 0) == [(0, 10)]
+    assert split_ids(1, 0, 4) == []
+
+
+def test_paginate_yields_every_id_once_through_failures(unreliable_api):
+    retries = 10
+    pages = collect(
+        unreliable_api.url, page_size=100, concurrency=4, retries=retries, backoff=0
+    )
+    assert all(len(page) <= 100 for page in pages)
+    assert sorted(row["id"] for page in pages for row in page) == list(range(1, 2501))
+    # the bounds, then 7 pages of each of the 4 ranges of 625 ids, each tried at most
+    # retries + 1 times
+    assert unreliable_api.failures > 0
+    assert unreliable_api.requests <= (1 + 4 * 7) * (retries + 1)
+
+
+def test_paginate_keeps_at_most_concurrency_requests_in_flight(monkeypatch):
+    api = start_mock_api(SyntheticData(rows=2000), latency=0.01)
+    in_flight = peak = 0
+    get_json = paginate_module.get_json
+
+    async def counting_get_json(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await get_json(url)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(paginate_module, "get_json", counting_get_json)
+    try:
+        pages = collect(api.url, page_size=50, concurrency=4)
+    finally:
+        api.shutdown()
+    assert sum(len(page) for page in pages) == 2000
+    assert peak == 4
+
+
+def test_get_with_retries_gives_up_after_the_retries():
+    api = start_mock_api(SyntheticData(rows=10), latency=0, failure_rate=1.0)
+    try:
+        with pytest.raises(APIError, match="failed after 3 attempts: status 503"):
+            asyncio.run(
+                get_with_retries(
+                    f"{api.url}/samples/range", asyncio.Semaphore(1), 2, backoff=0
+                )
+            )
+        assert api.requests == 3
+    finally:
+        api.shutdown()
+
+
+def test_get_with_retries_does_not_retry_a_client_error():
+    api = start_mock_api(SyntheticData(rows=10), latency=0)
+    try:
+        with pytest.raises(APIError, match="failed with status 404"):
+            asyncio.run(
+                get_with_retries(f"{api.url}/nowhere", asyncio.Semaphore(1), backoff=0)
+            )
+        assert api.requests == 1
+    finally:
+        api.shutdown()
@@ -0,0 +1,81 @@
+import time
+
+import dlt
+import pytest
+
+from utils.parallel import EXECUTORS, parallel_map, parallel_resource
+
+
+def slow_first_batches(record: dict) -> dict:
+    # the first batches finish last, so only the ordered runs keep them first
+    time.sleep(0.005 if record["id"] < 40 else 0)
+    return {**record, "double": record["id"] * 2}
+
+
+def fail_on_42(record: dict) -> dict:
+    if record["id"] == 42:
+        raise ValueError("no 42")
+    return record
+
+
+def records(rows: int):
+    yield from ({"id": id_} for id_ in range(rows))
+
+
+@pytest.mark.parametrize("executor", EXECUTORS)
+def test_parallel_map_keeps_the_order_of_the_batches(executor):
+    batches = list(
+        parallel_map(
+            slow_first_batches,
+            records(200),
+            workers=4,
+            batch_size=10,
+            executor=executor,
+        )
+    )
+    assert [len(batch) for batch in batches] == [10] * 20
+    assert [row["id"] for batch in batches for row in batch] == list(range(200))
+    assert all(row["double"] == row["id"] * 2 for batch in batches for row in batch)
+
+
+@pytest.mark.parametrize("executor", EXECUTORS)
+def test_parallel_map_unordered_yields_every_record_once(executor):
+    batches = parallel_map(
+        slow_first_batches,
+        records(200),
+        workers=4,
+        batch_size=10,
+        ordered=False,
+        executor=executor,
+    )
+    ids = [row["id"] for batch in batches for row in batch]
+    assert sorted(ids) == list(range(200))
+
+
+@pytest.mark.parametrize("executor", EXECUTORS)
+def test_parallel_map_raises_the_error_of_a_worker(executor):
+    with pytest.raises(ValueError, match="no 42"):
+        list(
+            parallel_map(
+                fail_on_42, records(100), workers=2, batch_size=10, executor=executor
+            )
+        )
+
+
+def test_parallel_map_batches_lists_of_records():
+    pages = ([{"id": id_} for id_ in range(start, start + 7)] for start in (0, 7, 14))
+    batches = list(parallel_map(fail_on_42, pages, batch_size=5, executor="thread"))
+    assert [len(batch) for batch in batches] == [5, 5, 5, 5, 1]
+
+
+def test_parallel_resource_can_be_piped_into_a_transformer():
+    resource = parallel_resource(
+        slow_first_batches, records(50), name="doubled", executor="thread"
+    )
+
+    @dlt.transformer
+    def ids(batch):
+        yield [{"id": row["double"]} for row in batch]
+
+    assert resource.name == "doubled"
+    assert [row["id"] for row in resource | ids] == [id_ * 2 for id_ in range(50)]
@@ -0,0 +1,81 @@
+import datetime as dt
+import threading
+
+import pytest
+
+from utils.data_generator import SyntheticData
+from utils.partition import Partitioning, run_partitions, split_range
+
+
+def ids_between(start: int, end: int):
+    for id_ in range(start, end):
+        yield {"id": id_}
+
+
+def fail_in_the_second_range(start: int, end: int):
+    if start == 25001:
+        raise ValueError("source is down")
+    yield from ids_between(start, end)
+
+
+def test_split_range_covers_integers_without_gaps():
+    assert split_range(1, 11, 3) == [(1, 5), (5, 9), (9, 11)]
+    assert split_range(1, 3, 8) == [(1, 2), (2, 3)]
+    assert split_range(1, 11, 0) == [(1, 11)]
+    assert split_range(5, 5, 4) == []
+
+
+def test_split_range_splits_datetimes_into_equal_ranges():
+    start = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    ranges = split_range(start, start + dt.timedelta(days=4), 4)
+    assert len(ranges) == 4
+    assert ranges[0] == (start, start + dt.timedelta(days=1))
+    assert all(high == low for (_, high), (low, _) in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_partitions_yields_every_row_once_in_pages(executor):
+    pages = list(
+        run_partitions(ids_between, split_range(1, 1001, 4), executor, batch_size=100)
+    )
+    assert all(len(page) <= 100 for page in pages)
+    assert sorted(row["id"] for page in pages for row in page) == list(range(1, 1001))
+
+
+def test_run_partitions_passes_pyarrow_tables_as_they_are():
+    synthetic = SyntheticData(rows=1000, arrow_page_size=100)
+    partitioning = Partitioning(partitions=4, executor="thread")
+    pages = list(partitioning.run(synthetic.records_between, 1, 1001))
+    assert len(pages) == 12  # 250 ids per range, in pages of up to 100
+    assert sorted(id_ for page in pages for id_ in page["id"].to_pylist()) == list(
+        range(1, 1001)
+    )
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_partitions_raises_the_error_of_a_range_and_stops_the_others(executor):
+    ranges = split_range(1, 100_001, 4)
+    threads = threading.active_count()
+    with pytest.raises(RuntimeError, match="Range 25001 to 50001 failed") as error:
+        for _ in run_partitions(fail_in_the_second_range, ranges, executor):
+            pass
+    assert "source is down" in str(error.value)
+    assert threading.active_count() == threads
+
+
+def test_run_partitions_stops_the_ranges_when_closed_early():
+    threads = threading.active_count()
+    pages = run_partitions(ids_between, split_range(1, 1_000_001, 4), "thread")
+    next(pages)
+    assert threading.active_count() == threads + 4
+    pages.close()
+    assert threading.active_count() == threads
+
+
+def test_partitioning_refuses_unknown_keys_and_executors():
+    with pytest.raises(ValueError):
+        Partitioning(by="name")
+    with pytest.raises(ValueError):
+        Partitioning(partitions=0)
+    with pytest.raises(ValueError):
+        list(run_partitions(ids_between, [(1, 2)], executor="fiber"))
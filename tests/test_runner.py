@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from utils.cli import DESTINATION_ENV, pipeline_parser
+from utils.runner import discover_pipelines, script_imports, select_destination
+
+
+def test_discover_pipelines_maps_numbers_to_scripts():
+    pipelines = discover_pipelines()
+    assert pipelines["4b"].name == "4b_sample_pipeline_append_pk.py"
+    assert "legacy" not in {script.parent.name for script in pipelines.values()}
+
+
+def test_script_imports_leaves_out_the_standard_library():
+    imports = script_imports(discover_pipelines()["4"])
+    assert "dlt" in imports
+    assert "utils.cli" in imports
+    assert "argparse" not in imports and "datetime" not in imports
+
+
+def test_select_destination_sets_the_default_of_the_scripts(monkeypatch):
+    monkeypatch.delenv(DESTINATION_ENV, raising=False)
+    select_destination(discover_pipelines()["4"], "duckdb")
+    assert os.environ[DESTINATION_ENV] == "duckdb"
+    assert pipeline_parser("test").parse_args([]).destination == "duckdb"
+    assert (
+        pipeline_parser("test").parse_args(["--destination", "postgres"]).destination
+        == "postgres"
+    )
+
+
+def test_select_destination_refuses_scripts_with_a_fixed_destination(monkeypatch):
+    monkeypatch.delenv(DESTINATION_ENV, raising=False)
+    with pytest.raises(SystemExit):
+        select_destination(discover_pipelines()["0"], "postgres")
+    assert DESTINATION_ENV not in os.environ
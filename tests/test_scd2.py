@@ -0,0 +1,61 @@
+import datetime as dt
+
+import pyarrow as pa
+
+from utils.data_generator import SyntheticData
+from utils.scd2 import ROW_HASH_COLUMN, add_row_hash, row_hash
+
+
+def record(ingested_at, script_name="6_sample_pipeline_merge_scd2.py", **fields):
+    return {
+        "id": 1,
+        "name": "Mr. Mario",
+        "metadata": {"ingested_at": ingested_at, "script_name": script_name},
+        **fields,
+    }
+
+
+def test_row_hash_leaves_out_the_volatile_metadata():
+    assert row_hash(record("2026-01-01")) == row_hash(record("2026-01-02", "other.py"))
+    assert row_hash(record("2026-01-01")) != row_hash(
+        record("2026-01-01", name="Jumpman")
+    )
+    # the key is not hashed either
+    assert row_hash(record("2026-01-01")) == row_hash(record("2026-01-01", id=2))
+
+
+def test_row_hash_keeps_the_stable_nested_fields():
+    first = {"id": 1, "metadata": {"ingested_at": "now", "source": "api"}}
+    second = {"id": 1, "metadata": {"ingested_at": "now", "source": "file"}}
+    assert row_hash(first) != row_hash(second)
+    assert row_hash(first, exclude=("metadata",)) == row_hash(
+        second, exclude=("metadata",)
+    )
+
+
+def test_add_row_hash_is_the_same_for_dicts_and_arrow_tables():
+    synthetic = SyntheticData(rows=20)
+    dicts = [add_row_hash(row) for row in synthetic.records()]
+    for metadata_as_struct in (False, True):
+        pages = SyntheticData(rows=20, arrow_page_size=8).records(
+            metadata_as_struct=metadata_as_struct
+        )
+        hashes = pa.concat_tables(add_row_hash(page) for page in pages)
+        assert hashes.column(ROW_HASH_COLUMN).to_pylist() == [
+            row[ROW_HASH_COLUMN] for row in dicts
+        ]
+
+
+def test_add_row_hash_replaces_the_column_of_a_table():
+    table = pa.table(
+        {
+            "id": [1, 2],
+            "updated_at": [dt.datetime(2025, 10, 1, tzinfo=dt.timezone.utc)] * 2,
+            ROW_HASH_COLUMN: [0, 0],
+        }
+    )
+    hashed = add_row_hash(table)
+    assert hashed.schema.names == table.schema.names
+    assert hashed.column(ROW_HASH_COLUMN).to_pylist() == [
+        row_hash({"id": id_, "updated_at": "2025-10-01 00:00:00"}) for id_ in (1, 2)
+    ]
@@ -0,0 +1,66 @@
+import dlt
+import pyarrow as pa
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from utils.validation import list_adapter, validate_batch, validate_in_batches
+
+
+class Row(BaseModel):
+    id: int
+    name: str
+
+
+def rows():
+    return [
+        {"id": 1, "name": "Mario"},
+        {"id": "one", "name": "Luigi"},
+        {"id": 3, "name": "Peach", "extra": True},
+        {"id": 4, "name": "Toad"},
+    ]
+
+
+def test_freeze_raises_on_an_invalid_row():
+    with pytest.raises(ValidationError):
+        validate_batch(Row, rows(), "freeze")
+
+
+def test_discard_row_drops_the_invalid_rows_of_lists_and_tables():
+    valid = [{"id": 1, "name": "Mario"}, {"id": 4, "name": "Toad"}]
+    assert validate_batch(Row, rows(), "discard_row") == valid
+    table = pa.Table.from_pylist(
+        [{"id": 1, "name": "Mario"}, {"id": 2, "name": None}, {"id": 4, "name": "Toad"}]
+    )
+    assert validate_batch(Row, table, "discard_row").to_pylist() == valid
+
+
+def test_evolve_keeps_every_row():
+    page = rows()
+    assert validate_batch(Row, page, "evolve") is page
+
+
+def test_trusted_sample_only_validates_evenly_spaced_rows():
+    page = [{"id": id_, "name": "Mario"} for id_ in range(10)]
+    page[4]["id"] = "four"
+    # rows 0 and 5 are validated, the invalid row 4 only with 5 of them
+    assert validate_batch(Row, page, "freeze", trusted_sample=2) is page
+    with pytest.raises(ValidationError):
+        validate_batch(Row, page, "freeze", trusted_sample=5)
+
+
+def test_list_adapter_is_built_once_per_model_and_contract():
+    assert list_adapter(Row, "freeze") is list_adapter(Row, "freeze")
+    assert list_adapter(Row, "freeze") is not list_adapter(Row, "discard_row")
+    with pytest.raises(ValueError, match="Unknown contract"):
+        list_adapter(Row, "discard_value")
+
+
+def test_validate_in_batches_replaces_the_validator_of_the_resource():
+    @dlt.resource(columns=Row)
+    def samples():
+        yield rows()
+
+    resource = validate_in_batches(samples(), Row, "discard_row")
+    assert resource.validator is None
+    assert set(resource.columns) == {"id", "name"}
+    assert list(resource) == [{"id": 1, "name": "Mario"}, {"id": 4, "name": "Toad"}]